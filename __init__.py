@@ -3,13 +3,17 @@
 __version__ = "0.1.0"
 __author__ = "Empathy System Team"
 
+import sys
+
 from .config import config
 from .utils.logger import setup_logger, get_logger
 
-# Initialize logging
+# Initialize logging (pytest imports this package while collecting
+# tests/, which must not leave log files in the working tree)
 setup_logger(
     log_level=config.get('system.log_level', 'INFO'),
-    log_dir=config.get('system.log_dir', './logs')
+    log_dir=config.get('system.log_dir', './logs'),
+    enable_file_logging='pytest' not in sys.modules
 )
 
 __all__ = ['config', 'setup_logger', 'get_logger']
@@ -4,19 +4,26 @@ Brings together perception, fusion, memory, LLM, and TTS
 into a unified conversational agent.
 """
 
+import time
+import uuid
 import asyncio
 import numpy as np
-from typing import Dict, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
 from datetime import datetime
 from loguru import logger
 
 from models.vision import VideoPipeline
 from models.audio import AudioPipeline
-from models.fusion import FusionEngine, TemporalSmoother
-from llm import LlamaClient, MockLlamaClient, PromptBuilder
-from memory import SessionMemory, UserProfile
-from models.tts import CosyVoiceTTS, MockTTS
+from models.fusion import FusionEngine, TemporalSmootherBank, FusionScheduler
+from llm import PromptBuilder, ContextBudget, LLMService, RequestCancelled, ConversationSummarizer
+from llm.llm_service import PRIORITY_USER_REPLY, PRIORITY_INTERVENTION, PRIORITY_BACKGROUND
+from memory import SessionMemory, UserProfile, InterventionResponseCache
+from memory.storage import profile_store_from_config, session_store_from_config
+from models.tts import CosyVoiceTTS, MockTTS, TTSAudioCache
 from utils.helpers import LatencyTracker
+from utils.text_segmenter import SentenceSegmenter
 from config import config
 
 
@@ -35,7 +42,8 @@ class EmpathyAgent:
         self,
         user_id: str,
         persona: str = 'remote_worker',
-        use_mock: bool = False
+        use_mock: bool = False,
+        llm_service: Optional[LLMService] = None
     ):
         """
         Initialize empathy agent.
@@ -44,6 +52,7 @@ class EmpathyAgent:
             user_id: User identifier
             persona: User persona (remote_worker, student, young_professional)
             use_mock: Use mock models for testing
+            llm_service: LLM service to use (defaults to the worker-wide one)
         """
         self.user_id = user_id
         self.persona = persona
@@ -63,32 +72,67 @@ class EmpathyAgent:
         import torch
         device = 'cpu' if (use_mock or not torch.cuda.is_available()) else 'cuda'
         self.fusion_engine = FusionEngine(device=device)
-        self.temporal_smoother = TemporalSmoother(window_size=30, alpha=0.2)
+        # Smoothing state lives in one row of the worker-wide bank; results
+        # fused in the same loop iteration are smoothed as one batch
+        self.smoother_bank = TemporalSmootherBank.shared(config)
+        self._smoother_key = f"{user_id}:{uuid.uuid4().hex}"
+        self.fusion_scheduler = FusionScheduler(
+            rate_hz=config.get('models.fusion.scheduler.rate_hz', 10),
+            jitter_delay_ms=config.get('models.fusion.scheduler.jitter_delay_ms', 100),
+            max_staleness_ms=config.get('models.fusion.scheduler.max_staleness_ms', 1000),
+            buffer_size=config.get('models.fusion.scheduler.buffer_size', 32)
+        )
         
         # Memory
-        self.session_memory = SessionMemory()
+        self.session_memory = SessionMemory(
+            max_duration_hours=config.get('memory.session.max_duration_hours', 8),
+            timeline_capacity=config.get('memory.session.timeline_capacity', 1000),
+            spill_dir=config.get('memory.session.spill_dir'),
+            store=session_store_from_config(config)
+        )
         self.user_profile = UserProfile(
             user_id,
-            storage_path=config.get('memory.user_profiles_path', './data/profiles')
+            storage_path=config.get('memory.user_profiles_path', './data/profiles'),
+            store=profile_store_from_config(config)
         )
         
-        # LLM
-        try:
-            if use_mock:
-                raise ImportError("Using mock")
-            
-            model_path = config.get('models.llm.model_path')
-            self.llm = LlamaClient(
-                model_path=model_path,
-                context_length=config.get('models.llm.context_length', 8192),
-                n_gpu_layers=config.get('models.llm.n_gpu_layers', 40),
-                temperature=config.get('models.llm.temperature', 0.7)
+        # Reusable intervention responses (text + audio), shared by the worker
+        self.response_cache: Optional[InterventionResponseCache] = None
+        if config.get('intervention.response_cache.enabled', True):
+            self.response_cache = InterventionResponseCache.shared(config)
+        
+        # LLM: one model per worker process, shared by all sessions;
+        # generation runs on the service's inference thread
+        self.llm_service = llm_service or LLMService.shared(config, use_mock=use_mock)
+        self.llm = self.llm_service.client
+        
+        self.prompt_builder = PromptBuilder(
+            persona=persona,
+            budget=ContextBudget(
+                self.llm.count_tokens,
+                max_prompt_tokens=config.get('models.llm.prompt_budget.max_prompt_tokens', 2048),
+                history_tokens=config.get('models.llm.prompt_budget.history_tokens', 512),
+                context_tokens=config.get('models.llm.prompt_budget.context_tokens', 256),
+                user_tokens=config.get('models.llm.prompt_budget.user_tokens', 384)
             )
-        except:
-            logger.warning("Using MockLlamaClient")
-            self.llm = MockLlamaClient()
+        )
+        # Not from this thread: the model may be decoding for another session
+        self.llm_service.warm_prefix(self.prompt_builder.get_static_prefix())
+        
+        # Older turns are folded into a rolling summary while the LLM is idle
+        self.summarizer = ConversationSummarizer(
+            keep_recent_turns=config.get('models.llm.summarizer.keep_recent_turns', 3),
+            min_turns=config.get('models.llm.summarizer.min_turns', 4),
+            max_words=config.get('models.llm.summarizer.max_words', 80)
+        )
+        self._summary_task: Optional[asyncio.Task] = None
+        self._prefill_task: Optional[asyncio.Task] = None
         
-        self.prompt_builder = PromptBuilder(persona=persona)
+        # Barge-in: the user starting to speak interrupts the response
+        self.barge_in_enabled = config.get('models.audio.silero_vad.barge_in', True)
+        self._response_interrupt: Optional[asyncio.Event] = None
+        self._playback_until = 0.0  # time.monotonic() when handed-out audio ends
+        self.barge_ins = 0
         
         # TTS
         try:
@@ -96,11 +140,23 @@ class EmpathyAgent:
                 raise ImportError("Using mock")
             
             device = 'cpu' if not torch.cuda.is_available() else 'cuda'
-            self.tts = CosyVoiceTTS(device=device)
+            tts_cache = None
+            if config.get('models.tts.cache.enabled', True):
+                tts_cache = TTSAudioCache.shared(config)
+            self.tts = CosyVoiceTTS(
+                device=device,
+                cache=tts_cache,
+                native_speed=config.get('models.tts.native_speed', False),
+                native_emotion=config.get('models.tts.native_emotion', False)
+            )
+            self.tts.warm_up(config.get('models.tts.cache.warmup_phrases', []))
         except:
             logger.warning("Using MockTTS")
             self.tts = MockTTS()
         
+        # One synthesis at a time per TTS model, off the event loop
+        self._tts_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+        
         # State
         self.current_emotional_state: Optional[Dict] = None
         self.last_intervention_time: Optional[datetime] = None
@@ -109,8 +165,12 @@ class EmpathyAgent:
     
     async def start_session(self, session_id: str):
         """Start a new session."""
-        self.session_memory.start_session(session_id, self.user_id, self.persona)
-        self.user_profile.record_session_start()
+        # Both may load stored state; keep that off the event loop
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(
+            None, self.session_memory.start_session, session_id, self.user_id, self.persona
+        )
+        await loop.run_in_executor(None, self.user_profile.record_session_start)
         logger.info(f"Session {session_id} started")
     
     async def process_video_frame(
@@ -124,11 +184,12 @@ class EmpathyAgent:
         Args:
             frame: RGB image frame
             timestamp: Frame timestamp
-            
+        
         Returns:
             Visual state
         """
         result = await self.video_pipeline.process_frame(frame, timestamp)
+        self.fusion_scheduler.push_visual(result['visual_state'], timestamp)
         return result['visual_state']
     
     async def process_audio_chunk(
@@ -142,13 +203,95 @@ class EmpathyAgent:
         Args:
             audio: Audio samples
             timestamp: Audio timestamp
-            
+        
         Returns:
-            Audio result with transcription if available
+            Audio result with transcription if available, plus a
+            'barge_in' event if the user interrupted the agent
         """
         result = await self.audio_pipeline.process_audio(audio, timestamp)
+        self.fusion_scheduler.push_audio(result['audio_state'], timestamp)
+        
+        if result['vad'].get('event') == 'start':
+            if self.barge_in_enabled:
+                event = self._barge_in(timestamp)
+                if event is not None:
+                    result['barge_in'] = event
+            self._start_early_prefill()
+        
         return result
     
+    def _barge_in(self, timestamp: float) -> Optional[Dict]:
+        """
+        Interrupt the response in progress because the user started speaking.
+        
+        Pending LLM tokens of the response being generated are cancelled
+        on the inference thread and segments waiting for synthesis are
+        dropped, freeing the CPU for the new utterance. Playback is owned
+        by the caller, which should stop it when the returned event says so.
+        
+        Args:
+            timestamp: Audio timestamp of the speech start
+        
+        Returns:
+            Barge-in event, or None if the agent was not responding
+        """
+        responding = self._response_interrupt is not None and not self._response_interrupt.is_set()
+        llm_cancelled = False
+        if responding:
+            self._response_interrupt.set()
+            llm_cancelled = self.llm_service.cancel_session(self._llm_session_key, reason='interrupted')
+        
+        stop_playback = time.monotonic() < self._playback_until
+        self._playback_until = 0.0
+        
+        if not (responding or stop_playback):
+            return None
+        
+        self.barge_ins += 1
+        logger.info(
+            f"Barge-in at {timestamp:.2f}s (response={responding}, "
+            f"llm={llm_cancelled}, playback={stop_playback})"
+        )
+        return {
+            'type': 'barge_in',
+            'timestamp': timestamp,
+            'response_cancelled': responding,
+            'llm_cancelled': llm_cancelled,
+            'stop_playback': stop_playback
+        }
+    
+    def _note_playback(self, audio: np.ndarray):
+        """Track when audio handed to the caller will have finished playing."""
+        duration = len(audio) / self.tts.sample_rate
+        self._playback_until = max(self._playback_until, time.monotonic()) + duration
+    
+    def _start_early_prefill(self):
+        """
+        Prefill the next reply prompt while the user is still speaking.
+        
+        System prompt, history and emotional context are known at speech
+        start; once the transcript arrives only the user text and the
+        instruction (plus any context that changed) remain to evaluate.
+        """
+        if not self.current_emotional_state:
+            return
+        if self._prefill_task is not None and not self._prefill_task.done():
+            return
+        
+        head = self.prompt_builder.get_reply_head(self.current_emotional_state, datetime.now())
+        self._prefill_task = asyncio.get_running_loop().create_task(self._prefill_reply(head))
+    
+    async def _prefill_reply(self, head: str):
+        """Evaluate the reply prompt head on the inference thread."""
+        try:
+            await self.llm_service.prefill(
+                self._llm_session_key,
+                head,
+                prefix=self.prompt_builder.get_static_prefix()
+            )
+        except RequestCancelled as e:
+            logger.debug(f"Early prefill skipped ({e.reason})")
+    
     async def process_multimodal(
         self,
         visual_state: Dict,
@@ -160,7 +303,7 @@ class EmpathyAgent:
         Args:
             visual_state: From video pipeline
             audio_result: From audio pipeline
-            
+        
         Returns:
             Fused emotional state
         """
@@ -170,8 +313,9 @@ class EmpathyAgent:
         # Fuse
         fused = self.fusion_engine.fuse(visual_state, audio_state)
         
-        # Temporal smoothing
-        smoothed = self.temporal_smoother.smooth(fused)
+        # Temporal smoothing runs every frame, also when fusion reused its
+        # last result, so the EMA and the trend windows keep advancing
+        smoothed = await self.smoother_bank.submit(self._smoother_key, fused)
         
         # Record in memory
         self.session_memory.add_emotional_snapshot(
@@ -196,10 +340,44 @@ class EmpathyAgent:
         
         return self.current_emotional_state
     
+    async def fuse_scheduled(self, now: Optional[float] = None) -> Optional[Dict]:
+        """
+        Fuse time-aligned inputs if the fusion scheduler says one is due.
+        
+        Video and audio outputs are buffered by process_video_frame and
+        process_audio_chunk; this fuses at most once per scheduler period
+        and only when new input arrived. A worker serving several sessions
+        should gather their calls for each tick, so that smoothing runs as
+        one batch across the sessions.
+        
+        Args:
+            now: Current time on the pipelines' clock (defaults to the
+                newest buffered timestamp)
+        
+        Returns:
+            Fused emotional state with per-modality staleness, or None
+            if no fusion was due
+        """
+        aligned = self.fusion_scheduler.poll(now)
+        if aligned is None:
+            return None
+        
+        state = await self.process_multimodal(
+            aligned.visual_state,
+            {'audio_state': aligned.audio_state}
+        )
+        state['visual_staleness'] = aligned.visual_staleness
+        state['audio_staleness'] = aligned.audio_staleness
+        state['visual_stale'] = aligned.visual_stale
+        state['audio_stale'] = aligned.audio_stale
+        
+        return state
+    
     async def generate_response(
         self,
         user_text: Optional[str] = None,
-        intervention_type: Optional[str] = None
+        intervention_type: Optional[str] = None,
+        include_history: bool = True
     ) -> str:
         """
         Generate contextual response.
@@ -207,7 +385,9 @@ class EmpathyAgent:
         Args:
             user_text: User's spoken text (if any)
             intervention_type: Proactive intervention type (if any)
-            
+            include_history: Put the conversation history in the prompt
+                (False for responses cached across users)
+        
         Returns:
             Generated text response
         """
@@ -215,17 +395,85 @@ class EmpathyAgent:
             logger.warning("No emotional state available for response generation")
             return "I'm here for you."
         
-        # Build prompt
-        prompt = self.prompt_builder.build_prompt(
+        prompt = self._build_response_prompt(user_text, intervention_type, include_history)
+        
+        # Queue on the shared service (the static persona prefix is
+        # restored from cache)
+        interrupt = asyncio.Event()
+        self._response_interrupt = interrupt
+        try:
+            response = await self.llm_service.generate(
+                self._llm_session_key,
+                prompt,
+                priority=self._llm_priority(user_text),
+                prefix=self.prompt_builder.get_static_prefix(),
+                **self._generation_budget(user_text, intervention_type)
+            )
+        except RequestCancelled as e:
+            logger.info(f"Response generation cancelled ({e.reason})")
+            return ""
+        finally:
+            if self._response_interrupt is interrupt:
+                self._response_interrupt = None
+        
+        self._record_response(response, user_text, intervention_type)
+        
+        return response
+    
+    @property
+    def _llm_session_key(self) -> str:
+        """Key identifying this agent's requests on the LLM service."""
+        return self.session_memory.session_id or self.user_id
+    
+    def _llm_priority(self, user_text: Optional[str]) -> int:
+        """User replies are served before proactive interventions."""
+        return PRIORITY_USER_REPLY if user_text else PRIORITY_INTERVENTION
+    
+    def _generation_budget(
+        self,
+        user_text: Optional[str],
+        intervention_type: Optional[str]
+    ) -> Dict:
+        """
+        Get decoding limits for a request type.
+        
+        Responses are spoken in a few sentences, so decoding stops after
+        the last sentence used instead of running to a generic token limit.
+        """
+        if intervention_type:
+            request_type = 'intervention'
+        elif user_text:
+            request_type = 'reply'
+        else:
+            request_type = 'check_in'
+        
+        return {
+            'max_tokens': config.get(f'models.llm.generation_budget.{request_type}.max_tokens', 160),
+            'max_sentences': config.get(f'models.llm.generation_budget.{request_type}.max_sentences', 3)
+        }
+    
+    def _build_response_prompt(
+        self,
+        user_text: Optional[str],
+        intervention_type: Optional[str],
+        include_history: bool = True
+    ) -> str:
+        """Build the LLM prompt for the current emotional state."""
+        return self.prompt_builder.build_prompt(
             emotional_state=self.current_emotional_state,
             user_text=user_text,
             intervention_type=intervention_type,
-            time_of_day=datetime.now()
+            time_of_day=datetime.now(),
+            include_history=include_history
         )
-        
-        # Generate
-        response = self.llm.generate(prompt)
-        
+    
+    def _record_response(
+        self,
+        response: str,
+        user_text: Optional[str],
+        intervention_type: Optional[str]
+    ):
+        """Add a generated response to history and intervention records."""
         # Add to history
         if user_text:
             self.prompt_builder.add_to_history('user', user_text)
@@ -240,7 +488,133 @@ class EmpathyAgent:
             )
             self.last_intervention_time = datetime.now()
         
-        return response
+        self._schedule_summary()
+    
+    def _schedule_summary(self):
+        """Start a background summarization if enough turns aged out."""
+        if self._summary_task is not None and not self._summary_task.done():
+            return
+        if not self.summarizer.should_summarize(self.prompt_builder):
+            return
+        self._summary_task = asyncio.get_running_loop().create_task(self._summarize_history())
+    
+    async def _summarize_history(self):
+        """Fold older turns into the conversation summary."""
+        async def generate(prompt: str) -> str:
+            # Lowest priority: queued behind, and preempted by, real requests
+            return await self.llm_service.generate(
+                f"{self._llm_session_key}:summary",
+                prompt,
+                priority=PRIORITY_BACKGROUND,
+                max_tokens=160
+            )
+        
+        try:
+            await self.summarizer.summarize(self.prompt_builder, generate)
+        except RequestCancelled as e:
+            logger.debug(f"Conversation summary deferred ({e.reason})")
+    
+    async def stream_response(
+        self,
+        user_text: Optional[str] = None,
+        intervention_type: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, np.ndarray]]:
+        """
+        Generate and synthesize a response segment by segment.
+        
+        LLM tokens are streamed from the inference thread and cut at sentence
+        or clause boundaries; each segment is synthesized while the next
+        one is still being generated.
+        
+        Args:
+            user_text: User's spoken text (if any)
+            intervention_type: Proactive intervention type (if any)
+        
+        Yields:
+            (segment_text, segment_audio) in response order
+        """
+        if not self.current_emotional_state:
+            logger.warning("No emotional state available for response generation")
+            text = "I'm here for you."
+            yield text, await self.synthesize_speech(text)
+            return
+        
+        prompt = self._build_response_prompt(user_text, intervention_type)
+        prefix = self.prompt_builder.get_static_prefix()
+        
+        loop = asyncio.get_running_loop()
+        tokens = self.llm_service.stream(
+            self._llm_session_key,
+            prompt,
+            priority=self._llm_priority(user_text),
+            prefix=prefix,
+            **self._generation_budget(user_text, intervention_type)
+        )
+        segmenter = SentenceSegmenter()
+        pending: Deque[Tuple[str, asyncio.Future]] = deque()
+        parts = []
+        
+        interrupt = asyncio.Event()
+        self._response_interrupt = interrupt
+        interrupted = asyncio.ensure_future(interrupt.wait())
+        
+        def schedule(segment: str):
+            parts.append(segment)
+            pending.append((
+                segment,
+                loop.run_in_executor(self._tts_executor, self._synthesize_blocking, segment)
+            ))
+        
+        next_token = asyncio.ensure_future(tokens.__anext__())
+        try:
+            while next_token is not None or pending:
+                waiting = [f for f in (next_token, pending[0][1] if pending else None, interrupted) if f]
+                await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                
+                if interrupt.is_set():
+                    # Barge-in: drop segments not yet synthesized or spoken
+                    logger.info("Response stream interrupted by user speech")
+                    return
+                
+                # Emit finished segments in order
+                while pending and pending[0][1].done():
+                    segment, future = pending.popleft()
+                    audio = future.result()
+                    self._note_playback(audio)
+                    yield segment, audio
+                    if interrupt.is_set():
+                        logger.info("Response stream interrupted by user speech")
+                        return
+                
+                if next_token is not None and next_token.done():
+                    try:
+                        token = next_token.result()
+                    except RequestCancelled as e:
+                        # Superseded or preempted: drop what is not yet spoken
+                        logger.info(f"Response stream cancelled ({e.reason})")
+                        next_token = None
+                        return
+                    except StopAsyncIteration:
+                        next_token = None
+                        tail = segmenter.flush()
+                        if tail:
+                            schedule(tail)
+                    else:
+                        for segment in segmenter.feed(token):
+                            schedule(segment)
+                        next_token = asyncio.ensure_future(tokens.__anext__())
+        finally:
+            if next_token is not None:
+                next_token.cancel()
+                await asyncio.wait([next_token])  # Let the token stream unwind
+            for _, future in pending:
+                future.cancel()
+            interrupted.cancel()
+            if self._response_interrupt is interrupt:
+                self._response_interrupt = None
+            await tokens.aclose()
+        
+        self._record_response(" ".join(parts), user_text, intervention_type)
     
     async def synthesize_speech(self, text: str) -> np.ndarray:
         """
@@ -248,10 +622,15 @@ class EmpathyAgent:
         
         Args:
             text: Text to synthesize
-            
+        
         Returns:
             Audio samples
         """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._tts_executor, self._synthesize_blocking, text)
+    
+    def _synthesize_blocking(self, text: str) -> np.ndarray:
+        """Synthesize speech for the current emotional state (blocking)."""
         if not self.current_emotional_state:
             return self.tts.synthesize(text)
         
@@ -267,23 +646,30 @@ class EmpathyAgent:
     async def handle_user_speech(
         self,
         transcribed_text: str
-    ) -> tuple[str, np.ndarray]:
+    ) -> Optional[tuple[str, np.ndarray]]:
         """
         Handle user speech end-to-end.
         
+        The reply is synthesized sentence by sentence while the rest is
+        still being generated (see stream_response); callers that can
+        play audio as it arrives should iterate stream_response instead.
+        
         Args:
             transcribed_text: Transcribed user speech
-            
+        
         Returns:
-            (response_text, response_audio)
+            (response_text, response_audio), or None if the response was
+            cancelled or interrupted before any of it was synthesized
         """
-        # Generate response
-        response_text = await self.generate_response(user_text=transcribed_text)
-        
-        # Synthesize
-        response_audio = await self.synthesize_speech(response_text)
+        texts = []
+        audio = []
+        async for segment, segment_audio in self.stream_response(user_text=transcribed_text):
+            texts.append(segment)
+            audio.append(segment_audio)
         
-        return response_text, response_audio
+        if not texts:
+            return None
+        return " ".join(texts), np.concatenate(audio)
     
     async def check_intervention_triggers(self) -> Optional[str]:
         """
@@ -302,14 +688,16 @@ class EmpathyAgent:
         
         # Prolonged negative state
         if self.current_emotional_state['valence'] < -0.4:
-            sustained = self.temporal_smoother.get_sustained_emotion(duration_frames=30)
+            sustained = self.smoother_bank.get_sustained_emotion(self._smoother_key, duration_frames=30)
             if sustained in ['sad', 'stressed', 'anxious']:
                 if self.user_profile.should_intervene('prolonged_negative_state'):
                     return 'prolonged_negative_state'
         
         # Declining trend
         if self.current_emotional_state['trend'] == 'declining':
-            summary = self.session_memory.get_emotional_summary(window_minutes=15)
+            # A resumed session reads the store's rollups; keep that I/O off the loop
+            loop = asyncio.get_event_loop()
+            summary = await loop.run_in_executor(None, self.session_memory.get_emotional_summary, 15)
             if summary['avg_valence'] < -0.3:
                 if self.user_profile.should_intervene('declining_mood'):
                     return 'declining_mood'
@@ -330,28 +718,71 @@ class EmpathyAgent:
         
         logger.info(f"Triggering proactive intervention: {intervention_type}")
         
-        # Generate intervention
+        # Serve a cached response for this persona/type/mood/time bucket
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = self.response_cache.make_key(
+                self.persona,
+                intervention_type,
+                self.current_emotional_state['valence'],
+                self.current_emotional_state['arousal'],
+                datetime.now()
+            )
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self._record_response(cached.text, None, intervention_type)
+                self._note_playback(cached.audio)
+                return cached.text, cached.audio
+        
+        # Generate intervention (without this user's conversation if the
+        # response goes into the cache shared with other users)
         intervention_text = await self.generate_response(
-            intervention_type=intervention_type
+            intervention_type=intervention_type,
+            include_history=cache_key is None
         )
+        if not intervention_text:
+            return None  # Superseded or preempted: nothing to say
         
         # Synthesize
         intervention_audio = await self.synthesize_speech(intervention_text)
         
+        if cache_key is not None:
+            self.response_cache.put(cache_key, intervention_text, intervention_audio)
+        
+        self._note_playback(intervention_audio)
         return intervention_text, intervention_audio
     
+    def get_fusion_stats(self) -> Dict:
+        """Get fusion scheduling and change-tracking counters."""
+        stats = self.fusion_scheduler.get_stats()
+        for key, value in self.fusion_engine.get_cache_stats().items():
+            stats[f'cache_{key}'] = value
+        return stats
+    
     def get_session_summary(self) -> Dict:
         """Get current session summary."""
         return self.session_memory.get_emotional_summary(window_minutes=60)
     
     def save_profile(self):
-        """Save user profile to disk."""
+        """Save user profile (writes pending changes of a profile store)."""
         self.user_profile.save()
     
     async def cleanup(self):
         """Cleanup resources."""
         self.video_pipeline.cleanup()
         self.audio_pipeline.reset()
+        self.fusion_scheduler.reset()
+        self.fusion_engine.reset_cache()
+        self.smoother_bank.remove_session(self._smoother_key)
+        self.llm_service.cancel_session(self._llm_session_key)
+        for task in (self._summary_task, self._prefill_task):
+            if task is not None:
+                task.cancel()
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.session_memory.flush)
         self.session_memory.clear()
-        self.save_profile()
+        await loop.run_in_executor(None, self.save_profile)
+        if self.response_cache is not None and self.response_cache.storage_dir:
+            await loop.run_in_executor(None, self.response_cache.save)
+        self._tts_executor.shutdown(wait=False)
         logger.info("EmpathyAgent cleanup complete")
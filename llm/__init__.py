@@ -1,10 +1,21 @@
 """LLM package."""
 
 from .llama_client import LlamaClient, MockLlamaClient
+from .server_client import LlamaServerClient
 from .prompt_builder import PromptBuilder
+from .context_budget import ContextBudget
+from .summarizer import ConversationSummarizer
+from .async_client import AsyncLlamaClient
+from .llm_service import LLMService, RequestCancelled
 
 __all__ = [
     'LlamaClient',
     'MockLlamaClient',
-    'PromptBuilder'
+    'LlamaServerClient',
+    'PromptBuilder',
+    'ContextBudget',
+    'ConversationSummarizer',
+    'AsyncLlamaClient',
+    'LLMService',
+    'RequestCancelled'
 ]
@@ -0,0 +1,163 @@
+"""Non-blocking asyncio wrapper around the LLM clients.
+
+Runs generation on a dedicated inference thread so that the event
+loop (and with it audio/video processing) keeps running while the
+model decodes.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import AsyncIterator, Optional, Set
+from loguru import logger
+
+from utils.text_segmenter import SentenceLimiter
+
+
+class AsyncLlamaClient:
+    """
+    Async facade over a blocking LlamaClient (or MockLlamaClient).
+    
+    By default all model calls run on one dedicated thread because
+    llama.cpp contexts are not thread-safe. Clients that serve several
+    requests at once (``supports_parallel``, e.g. an inference server)
+    can be given one thread per request slot. Generation is
+    token-streamed internally so that cancellation takes effect between
+    tokens.
+    """
+    
+    def __init__(self, client, thread_name: str = "llm-inference", max_workers: int = 1):
+        """
+        Initialize async client.
+        
+        Args:
+            client: Blocking client exposing generate_stream()
+            thread_name: Name prefix of the inference threads
+            max_workers: Inference threads; values above 1 require a client
+                with ``supports_parallel``
+        """
+        if max_workers > 1 and not getattr(client, 'supports_parallel', False):
+            raise ValueError(f"{type(client).__name__} cannot run calls in parallel")
+        
+        self.client = client
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name)
+        self._active: Set[threading.Event] = set()
+        self.early_stops = 0  # Generations ended by the sentence budget
+        
+        logger.info(f"AsyncLlamaClient initialized ({type(client).__name__}, threads={max_workers})")
+    
+    async def generate(self, prompt: str, **kwargs) -> str:
+        """
+        Generate a full completion without blocking the event loop.
+        
+        Args:
+            prompt: Input prompt
+            **kwargs: Passed to stream()
+        
+        Returns:
+            Generated text
+        """
+        tokens = []
+        async for token in self.stream(prompt, **kwargs):
+            tokens.append(token)
+        return "".join(tokens).strip()
+    
+    async def stream(
+        self,
+        prompt: str,
+        max_sentences: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream tokens from the inference thread.
+        
+        Cancelling the consuming task (or closing the iterator) stops
+        decoding at the next token.
+        
+        Args:
+            prompt: Input prompt
+            max_sentences: Stop decoding after this many complete sentences
+            **kwargs: Passed to the client's generate_stream()
+        
+        Yields:
+            Generated tokens
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        done = object()
+        
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                pass  # Event loop already closed
+        
+        def produce():
+            limiter = SentenceLimiter(max_sentences) if max_sentences else None
+            try:
+                stream = self.client.generate_stream(prompt, **kwargs)
+                try:
+                    for token in stream:
+                        if cancelled.is_set():
+                            break
+                        if limiter:
+                            token, limit_reached = limiter.feed(token)
+                            if token:
+                                put(token)
+                            if limit_reached:
+                                self.early_stops += 1
+                                break
+                        else:
+                            put(token)
+                finally:
+                    # Stops llama.cpp decoding if we broke out early
+                    close = getattr(stream, 'close', None)
+                    if close:
+                        close()
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+        
+        self._active.add(cancelled)
+        worker = loop.run_in_executor(self._executor, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+            self._active.discard(cancelled)
+            if not worker.done():
+                # Don't wait for the thread; it exits at the next token
+                worker.add_done_callback(lambda f: f.exception())
+    
+    async def run(self, func, *args):
+        """Run any other blocking client call on the inference thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    def submit(self, func, *args) -> Future:
+        """Queue a blocking client call on the inference thread without awaiting it."""
+        return self._executor.submit(func, *args)
+    
+    def cancel_all(self):
+        """Stop every in-flight generation at its next token."""
+        for event in list(self._active):
+            event.set()
+    
+    @property
+    def busy(self) -> bool:
+        """Whether a generation is in flight."""
+        return bool(self._active)
+    
+    def shutdown(self):
+        """Cancel generations and stop the inference thread."""
+        self.cancel_all()
+        self._executor.shutdown(wait=False)
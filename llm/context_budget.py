@@ -0,0 +1,189 @@
+"""Token budgeting for LLM prompts.
+
+Measures prompt sections with the model's tokenizer and trims the
+lowest-priority sections so that every prompt fits a fixed token
+budget, keeping prefill cost predictable.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from loguru import logger
+
+
+ELLIPSIS = "…"
+
+
+class ContextBudget:
+    """
+    Fits prompt sections into per-section and total token budgets.
+    
+    Sections are trimmed in priority order when the prompt is too long:
+    oldest history turns first, then the emotion/time context, and the
+    user's text last. Token counts are cached (LRU) because most
+    segments (system prefix, history turns, context lines) repeat from
+    one prompt to the next; one-off texts (truncation candidates, whole
+    prompts) are counted without entering the cache.
+    """
+    
+    def __init__(
+        self,
+        count_tokens: Callable[[str], int],
+        max_prompt_tokens: int = 2048,
+        history_tokens: int = 512,
+        context_tokens: int = 256,
+        user_tokens: int = 384,
+        cache_size: int = 1024
+    ):
+        """
+        Initialize context budget.
+        
+        Args:
+            count_tokens: Tokenizer-backed counter (e.g. LlamaClient.count_tokens)
+            max_prompt_tokens: Budget for the whole prompt
+            history_tokens: Budget for conversation history
+            context_tokens: Budget for emotion/time context
+            user_tokens: Budget for the user's text
+            cache_size: Number of cached token counts
+        """
+        self._count_tokens = count_tokens
+        self.max_prompt_tokens = max_prompt_tokens
+        self.history_tokens = history_tokens
+        self.context_tokens = context_tokens
+        self.user_tokens = user_tokens
+        
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+        logger.info(
+            f"ContextBudget initialized (max={max_prompt_tokens}, history={history_tokens}, "
+            f"context={context_tokens}, user={user_tokens})"
+        )
+    
+    def count(self, text: str, cache: bool = True) -> int:
+        """
+        Token count of ``text``.
+        
+        Args:
+            text: Text to count
+            cache: Look up and store the count in the LRU (False for text
+                that won't repeat, so it doesn't evict reusable entries)
+        """
+        if not text:
+            return 0
+        if not cache:
+            return self._count_tokens(text)
+        
+        cached = self._cache.get(text)
+        if cached is not None:
+            self._cache.move_to_end(text)
+            self.cache_hits += 1
+            return cached
+        
+        tokens = self._count_tokens(text)
+        self._cache[text] = tokens
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        self.cache_misses += 1
+        return tokens
+    
+    def truncate(self, text: str, max_tokens: int, keep: str = 'head') -> str:
+        """
+        Shorten text to at most ``max_tokens`` tokens at a word boundary.
+        
+        Args:
+            text: Text to shorten
+            max_tokens: Token budget
+            keep: 'head' keeps the beginning, 'tail' keeps the end
+        
+        Returns:
+            Text (marked with an ellipsis if shortened), or "" if nothing fits
+        """
+        total = self.count(text)
+        if total <= max_tokens:
+            return text
+        
+        words = text.split()
+        
+        def candidate(n: int) -> str:
+            if keep == 'tail':
+                return ELLIPSIS + " ".join(words[len(words) - n:])
+            return " ".join(words[:n]) + ELLIPSIS
+        
+        # Estimate the cut from the text's tokens per word, then verify it
+        # (usually one uncached count), shrinking in proportion if over
+        n = min(len(words) - 1, len(words) * max_tokens // total)
+        while n > 0:
+            shortened = candidate(n)
+            tokens = self.count(shortened, cache=False)
+            if tokens <= max_tokens:
+                return shortened
+            n = min(n - 1, n * max_tokens // tokens)
+        
+        return ""
+    
+    def _fit_history(self, history: List[str], max_tokens: int) -> List[str]:
+        """Drop the oldest turns until the history fits."""
+        kept = []
+        used = 0
+        for line in reversed(history):
+            tokens = self.count(line) + 1  # Plus the joining newline
+            if used + tokens > max_tokens:
+                break
+            kept.append(line)
+            used += tokens
+        return kept[::-1]
+    
+    def _history_size(self, history: List[str]) -> int:
+        return sum(self.count(line) + 1 for line in history)
+    
+    def fit(
+        self,
+        fixed: str,
+        history: List[str],
+        context: str,
+        user_text: Optional[str] = None
+    ) -> Tuple[List[str], str, Optional[str]]:
+        """
+        Fit prompt sections into the budget.
+        
+        Args:
+            fixed: Parts of the prompt that are never trimmed (system
+                prefix, instructions, chat markers)
+            history: History lines, oldest first
+            context: Emotion/time context
+            user_text: User's text (if any)
+        
+        Returns:
+            (history, context, user_text) trimmed to fit
+        """
+        # Per-section budgets
+        history = self._fit_history(history, self.history_tokens)
+        context = self.truncate(context, self.context_tokens)
+        if user_text:
+            user_text = self.truncate(user_text, self.user_tokens, keep='tail')
+        
+        # Total budget: trim lowest-priority sections first
+        available = self.max_prompt_tokens - self.count(fixed)
+        
+        def over() -> int:
+            used = self._history_size(history) + self.count(context) + self.count(user_text)
+            return used - available
+        
+        if over() > 0 and history:
+            history = self._fit_history(history, max(0, self._history_size(history) - over()))
+        if over() > 0 and context:
+            context = self.truncate(context, max(0, self.count(context) - over()))
+        if over() > 0 and user_text:
+            user_text = self.truncate(user_text, max(0, self.count(user_text) - over()), keep='tail')
+        
+        return history, context, user_text
+    
+    def get_stats(self) -> Dict:
+        """Get token count cache counters."""
+        return {
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'cached_counts': len(self._cache)
+        }
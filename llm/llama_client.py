@@ -3,7 +3,9 @@
 Provides empathetic text generation based on emotional context.
 """
 
+import time
 import torch
+from collections import OrderedDict
 from typing import Dict, Optional, Iterator, List
 from loguru import logger
 
@@ -26,7 +28,11 @@ class LlamaClient:
         top_p: float = 0.9,
         top_k: int = 40,
         max_tokens: int = 512,
-        streaming: bool = True
+        streaming: bool = True,
+        max_prefix_states: int = 4,
+        speculative: Optional[str] = None,
+        draft_model_path: Optional[str] = None,
+        num_draft_tokens: Optional[int] = None
     ):
         """
         Initialize Llama client.
@@ -40,6 +46,12 @@ class LlamaClient:
             top_k: Top-k sampling parameter
             max_tokens: Maximum tokens to generate
             streaming: Enable token streaming
+            max_prefix_states: Number of evaluated prompt prefixes (e.g. one
+                per persona) whose model state is kept for reuse
+            speculative: Speculative decoding mode: None, 'prompt_lookup'
+                or 'draft_model'
+            draft_model_path: Draft GGUF for 'draft_model' mode
+            num_draft_tokens: Tokens drafted per decode step
         """
         self.model_path = model_path
         self.context_length = context_length
@@ -49,14 +61,51 @@ class LlamaClient:
         self.max_tokens = max_tokens
         self.streaming = streaming
         
+        # Evaluated model state for static prompt prefixes (LRU)
+        self.max_prefix_states = max_prefix_states
+        self._prefix_states: "OrderedDict[str, object]" = OrderedDict()
+        self.prefix_stats = {
+            'hits': 0,
+            'misses': 0,
+            'prompt_tokens': 0,
+            'prefill_tokens': 0,
+            'early_prefill_tokens': 0
+        }
+        
+        # Decode throughput (and speculative acceptance) counters
+        self.speculative = speculative
+        self.draft_model = None
+        self.decode_stats = {
+            'requests': 0,
+            'tokens': 0,
+            'stream_tokens': 0,
+            'stream_seconds': 0.0
+        }
+        
         try:
             from llama_cpp import Llama
             
+            if speculative:
+                try:
+                    from .speculative import create_draft_model
+                    self.draft_model = create_draft_model(
+                        speculative,
+                        draft_model_path=draft_model_path,
+                        num_draft_tokens=num_draft_tokens,
+                        context_length=context_length,
+                        n_gpu_layers=n_gpu_layers
+                    )
+                    logger.info(f"Speculative decoding enabled ({speculative})")
+                except Exception as e:
+                    logger.warning(f"Speculative decoding unavailable, decoding normally: {e}")
+                    self.speculative = None
+            
             self.model = Llama(
                 model_path=model_path,
                 n_ctx=context_length,
                 n_gpu_layers=n_gpu_layers,
                 n_threads=8,
+                draft_model=self.draft_model,
                 verbose=False
             )
             
@@ -75,7 +124,8 @@ class LlamaClient:
         self,
         prompt: str,
         temperature: Optional[float] = None,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        prefix: Optional[str] = None
     ) -> str:
         """
         Generate text completion (blocking).
@@ -84,11 +134,15 @@ class LlamaClient:
             prompt: Input prompt
             temperature: Override default temperature
             max_tokens: Override default max tokens
+            prefix: Static leading part of ``prompt`` whose evaluated state
+                is cached and restored instead of being prefilled again
             
         Returns:
             Generated text
         """
         try:
+            self._prepare_prefix(prompt, prefix)
+            
             response = self.model(
                 prompt,
                 max_tokens=max_tokens or self.max_tokens,
@@ -99,6 +153,9 @@ class LlamaClient:
                 echo=False
             )
             
+            self.decode_stats['requests'] += 1
+            self.decode_stats['tokens'] += response.get('usage', {}).get('completion_tokens', 0)
+            
             text = response['choices'][0]['text'].strip()
             return text
             
@@ -110,7 +167,8 @@ class LlamaClient:
         self,
         prompt: str,
         temperature: Optional[float] = None,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        prefix: Optional[str] = None
     ) -> Iterator[str]:
         """
         Generate text completion (streaming).
@@ -119,11 +177,14 @@ class LlamaClient:
             prompt: Input prompt
             temperature: Override default temperature
             max_tokens: Override default max tokens
+            prefix: Static leading part of ``prompt`` to restore from cache
             
         Yields:
             Generated tokens
         """
         try:
+            self._prepare_prefix(prompt, prefix)
+            
             stream = self.model(
                 prompt,
                 max_tokens=max_tokens or self.max_tokens,
@@ -135,18 +196,162 @@ class LlamaClient:
                 stream=True
             )
             
-            for output in stream:
-                token = output['choices'][0]['text']
-                yield token
+            self.decode_stats['requests'] += 1
+            started = None
+            try:
+                for output in stream:
+                    # Time decoding only, from the first token on
+                    if started is None:
+                        started = time.perf_counter()
+                    else:
+                        self.decode_stats['stream_tokens'] += 1
+                    self.decode_stats['tokens'] += 1
+                    token = output['choices'][0]['text']
+                    yield token
+            finally:
+                if started is not None:
+                    self.decode_stats['stream_seconds'] += time.perf_counter() - started
                 
         except Exception as e:
             logger.error(f"Error in generate_stream: {e}")
             yield ""
     
+    def _tokenize(self, text: str) -> List[int]:
+        """Tokenize text the same way completion calls do."""
+        return self.model.tokenize(text.encode('utf-8'), special=True)
+    
+    def _prepare_prefix(self, prompt: str, prefix: Optional[str]):
+        """
+        Load the cached state for ``prefix`` before generating ``prompt``.
+        
+        llama.cpp reuses the longest common token prefix between its
+        current state and a new prompt, so after restoring the prefix state
+        only the dynamic suffix is prefilled. On a miss the prefix is
+        evaluated once and its state saved.
+        """
+        try:
+            prompt_tokens = self._tokenize(prompt)
+            self.prefix_stats['prompt_tokens'] += len(prompt_tokens)
+            
+            self._restore_prefix(prompt, prompt_tokens, prefix)
+            
+            # Tokens llama.cpp will still have to evaluate for this prompt
+            current = list(self.model.input_ids[:self.model.n_tokens])
+            cached = self._common_prefix_length(current, prompt_tokens)
+            self.prefix_stats['prefill_tokens'] += len(prompt_tokens) - cached
+            
+        except Exception as e:
+            # Fall back to a full prefill
+            logger.warning(f"Prefix cache unavailable: {e}")
+    
+    def _restore_prefix(self, prompt: str, prompt_tokens: List[int], prefix: Optional[str]):
+        """Restore (or evaluate and save) the state for ``prefix``."""
+        if not prefix or not prompt.startswith(prefix):
+            return
+        
+        prefix_tokens = self._tokenize(prefix)
+        current = list(self.model.input_ids[:self.model.n_tokens])
+        if self._common_prefix_length(current, prompt_tokens) >= len(prefix_tokens):
+            # Current state already covers the prefix (and maybe more,
+            # e.g. after an early prefill): keep it
+            self.prefix_stats['hits'] += 1
+            return
+        
+        state = self._prefix_states.get(prefix)
+        if state is not None:
+            self._prefix_states.move_to_end(prefix)
+            self.model.load_state(state)
+            self.prefix_stats['hits'] += 1
+        else:
+            self.model.reset()
+            self.model.eval(prefix_tokens)
+            self._prefix_states[prefix] = self.model.save_state()
+            if len(self._prefix_states) > self.max_prefix_states:
+                self._prefix_states.popitem(last=False)
+            self.prefix_stats['misses'] += 1
+    
+    def prefill(self, text: str, prefix: Optional[str] = None):
+        """
+        Evaluate the leading part of an upcoming prompt now.
+        
+        A following generate call whose prompt starts with ``text`` then
+        only evaluates the remainder.
+        
+        Args:
+            text: Known start of the next prompt
+            prefix: Static leading part of ``text`` to restore from cache
+        """
+        try:
+            tokens = self._tokenize(text)
+            self._restore_prefix(text, tokens, prefix)
+            
+            # Evaluate only what the current state does not cover yet
+            current = list(self.model.input_ids[:self.model.n_tokens])
+            cached = self._common_prefix_length(current, tokens)
+            self.model.n_tokens = cached
+            self.model.eval(tokens[cached:])
+            self.prefix_stats['early_prefill_tokens'] += len(tokens) - cached
+            
+        except Exception as e:
+            logger.warning(f"Early prefill failed: {e}")
+    
+    @staticmethod
+    def _common_prefix_length(a: List[int], b: List[int]) -> int:
+        """Length of the shared leading token run of two sequences."""
+        length = 0
+        for x, y in zip(a, b):
+            if x != y:
+                break
+            length += 1
+        # llama.cpp always re-evaluates at least the last prompt token
+        return min(length, len(b) - 1)
+    
+    def warm_prefix(self, prefix: str):
+        """Evaluate and cache a static prompt prefix ahead of time."""
+        self._prepare_prefix(prefix, prefix)
+    
+    def get_prefix_cache_stats(self) -> Dict:
+        """Get prefix cache hit/miss and prefill token counters."""
+        stats = dict(self.prefix_stats)
+        stats['cached_prefixes'] = len(self._prefix_states)
+        stats['reused_tokens'] = stats['prompt_tokens'] - stats['prefill_tokens']
+        return stats
+    
+    def get_speculative_stats(self) -> Dict:
+        """
+        Get decode throughput and speculative acceptance metrics.
+        
+        Each draft call is followed by one verification step that yields
+        the accepted draft tokens plus one sampled token, and the first
+        token of every request comes from the prompt itself, so accepted
+        tokens are estimated as generated - requests - draft calls.
+        """
+        stats = dict(self.decode_stats)
+        stats['mode'] = self.speculative or 'off'
+        stats['tokens_per_second'] = (
+            stats['stream_tokens'] / stats['stream_seconds'] if stats['stream_seconds'] > 0 else 0.0
+        )
+        
+        if self.draft_model is not None:
+            accepted = max(0, stats['tokens'] - stats['requests'] - self.draft_model.calls)
+            stats['draft_calls'] = self.draft_model.calls
+            stats['drafted_tokens'] = self.draft_model.drafted_tokens
+            stats['accepted_tokens'] = accepted
+            stats['acceptance_rate'] = (
+                min(1.0, accepted / self.draft_model.drafted_tokens)
+                if self.draft_model.drafted_tokens else 0.0
+            )
+        
+        return stats
+    
     def count_tokens(self, text: str) -> int:
-        """Estimate token count for text."""
-        # Rough estimate: ~4 characters per token
-        return len(text) // 4
+        """Count tokens in text with the model's tokenizer."""
+        try:
+            return len(self.model.tokenize(text.encode('utf-8'), add_bos=False, special=True))
+        except Exception as e:
+            # Rough estimate: ~4 characters per token
+            logger.warning(f"Tokenizer unavailable, estimating token count: {e}")
+            return len(text) // 4
 
 
 class MockLlamaClient:
@@ -164,5 +369,19 @@ class MockLlamaClient:
         for word in response.split():
             yield word + " "
     
+    def warm_prefix(self, prefix: str):
+        pass
+    
+    def prefill(self, text: str, prefix: Optional[str] = None):
+        pass
+    
+    def get_prefix_cache_stats(self) -> Dict:
+        return {'hits': 0, 'misses': 0, 'prompt_tokens': 0, 'prefill_tokens': 0,
+                'early_prefill_tokens': 0, 'cached_prefixes': 0, 'reused_tokens': 0}
+    
+    def get_speculative_stats(self) -> Dict:
+        return {'requests': 0, 'tokens': 0, 'stream_tokens': 0, 'stream_seconds': 0.0,
+                'mode': 'off', 'tokens_per_second': 0.0}
+    
     def count_tokens(self, text: str) -> int:
         return len(text) // 4
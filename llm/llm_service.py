@@ -0,0 +1,414 @@
+"""Shared LLM service with prioritized, preemptible request scheduling.
+
+One service (and one model copy) per worker process serves every
+session. Requests are queued by priority; a session's newer request
+supersedes its older one, and user replies preempt in-flight
+proactive interventions.
+"""
+
+import asyncio
+import functools
+import itertools
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, Optional, Set
+from loguru import logger
+
+from .llama_client import LlamaClient, MockLlamaClient
+from .server_client import LlamaServerClient
+from .async_client import AsyncLlamaClient
+
+
+# Request priorities (lower value = served first)
+PRIORITY_USER_REPLY = 0
+PRIORITY_CHECK_IN = 5
+PRIORITY_INTERVENTION = 10
+PRIORITY_BACKGROUND = 20  # Housekeeping such as summarization; runs when idle
+
+_DONE = object()
+_PREFILL = ":prefill"  # Key suffix of a session's early prefills
+
+
+class RequestCancelled(Exception):
+    """Raised to the caller of an LLM request that was cancelled."""
+    
+    def __init__(self, reason: str):
+        super().__init__(f"LLM request cancelled ({reason})")
+        self.reason = reason
+
+
+@dataclass(eq=False)
+class _Request:
+    """Queued LLM request."""
+    priority: int
+    seq: int
+    session_id: str
+    prompt: str
+    kwargs: Dict
+    preemptible: bool
+    output: asyncio.Queue
+    call: Optional[Callable] = None  # Blocking client call instead of generation
+    cancel_reason: Optional[str] = None
+    finished: bool = False
+
+
+class LLMService:
+    """
+    Shared, prioritized LLM request scheduler.
+    
+    Wraps one blocking client behind AsyncLlamaClient's inference
+    threads. llama-cpp-python's high-level API decodes one sequence per
+    context, so in-process models always run one request at a time.
+    Clients with ``supports_parallel`` (a llama.cpp server with several
+    slots, which batches decoding across them) get one inference thread
+    per request slot, up to ``max_concurrency``.
+    """
+    
+    _shared: Dict[bool, 'LLMService'] = {}
+    
+    def __init__(self, client, max_concurrency: int = 1):
+        """
+        Initialize LLM service.
+        
+        Args:
+            client: Blocking LLM client (LlamaClient, MockLlamaClient, ...)
+            max_concurrency: Requests decoded at the same time (capped at 1
+                for clients without ``supports_parallel``)
+        """
+        if max_concurrency > 1 and not getattr(client, 'supports_parallel', False):
+            logger.warning(
+                f"{type(client).__name__} runs one request at a time; "
+                f"ignoring max_concurrency={max_concurrency}"
+            )
+            max_concurrency = 1
+        
+        self.client = client
+        self.async_client = AsyncLlamaClient(client, max_workers=max_concurrency)
+        self.max_concurrency = max_concurrency
+        
+        self._seq = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers = []
+        self._running: Set[_Request] = set()
+        self._by_session: Dict[str, _Request] = {}
+        
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'superseded': 0,
+            'preempted': 0,
+            'abandoned': 0,
+            'interrupted': 0,
+            'failed': 0
+        }
+        
+        logger.info(f"LLMService initialized (concurrency={max_concurrency})")
+    
+    @classmethod
+    def from_config(cls, config, use_mock: bool = False) -> 'LLMService':
+        """
+        Create a service around a client built from configuration.
+        
+        ``models.llm.backend`` selects an in-process model ('local') or a
+        separate OpenAI-compatible inference server ('server').
+        """
+        try:
+            if use_mock:
+                raise ImportError("Using mock")
+            
+            if config.get('models.llm.backend', 'local') == 'server':
+                # At least one pooled connection per parallel request
+                pool_size = max(
+                    config.get('models.llm.server.pool_size', 4),
+                    config.get('models.llm.max_concurrency', 1)
+                )
+                client = LlamaServerClient(
+                    base_url=config.get('models.llm.server.url', 'http://localhost:8080/v1'),
+                    model=config.get('models.llm.server.model', 'llama-3.1-8b-instruct'),
+                    api_key=config.get('models.llm.server.api_key'),
+                    temperature=config.get('models.llm.temperature', 0.7),
+                    timeout=config.get('models.llm.server.timeout_seconds', 30),
+                    pool_size=pool_size
+                )
+                return cls(client, max_concurrency=config.get('models.llm.max_concurrency', 1))
+            
+            client = LlamaClient(
+                model_path=config.get('models.llm.model_path'),
+                context_length=config.get('models.llm.context_length', 8192),
+                n_gpu_layers=config.get('models.llm.n_gpu_layers', 40),
+                temperature=config.get('models.llm.temperature', 0.7),
+                speculative=config.get('models.llm.speculative.mode'),
+                draft_model_path=config.get('models.llm.speculative.draft_model_path'),
+                num_draft_tokens=config.get('models.llm.speculative.num_draft_tokens')
+            )
+        except Exception:
+            logger.warning("Using MockLlamaClient")
+            client = MockLlamaClient()
+        
+        return cls(client, max_concurrency=config.get('models.llm.max_concurrency', 1))
+    
+    @classmethod
+    def shared(cls, config, use_mock: bool = False) -> 'LLMService':
+        """Get the worker-wide service (one model copy per process)."""
+        if use_mock not in cls._shared:
+            cls._shared[use_mock] = cls.from_config(config, use_mock=use_mock)
+        return cls._shared[use_mock]
+    
+    def _ensure_workers(self):
+        """Start worker tasks on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        
+        # First use, or the previous loop is gone: rebuild loop-bound state
+        self._loop = loop
+        self._queue = asyncio.PriorityQueue()
+        self._running.clear()
+        self._by_session.clear()
+        self._workers = [loop.create_task(self._worker()) for _ in range(self.max_concurrency)]
+    
+    async def _worker(self):
+        """Serve queued requests in priority order."""
+        while True:
+            _, _, request = await self._queue.get()
+            if request.cancel_reason:
+                continue  # Cancelled while queued; caller already notified
+            
+            self._running.add(request)
+            try:
+                if request.call is not None:
+                    await self.async_client.run(request.call)
+                else:
+                    await self._generate(request)
+                if not request.cancel_reason:
+                    self.stats['completed'] += 1
+            except Exception as e:
+                if not request.cancel_reason:
+                    self.stats['failed'] += 1
+                request.output.put_nowait(e)
+            finally:
+                self._running.discard(request)
+                if request.cancel_reason:
+                    request.output.put_nowait(RequestCancelled(request.cancel_reason))
+                request.output.put_nowait(_DONE)
+    
+    async def _generate(self, request: _Request):
+        """Forward a request's tokens until done or cancelled."""
+        tokens = self.async_client.stream(request.prompt, **request.kwargs)
+        try:
+            async for token in tokens:
+                if request.cancel_reason:
+                    break
+                request.output.put_nowait(token)
+        finally:
+            await tokens.aclose()
+    
+    def _cancel(self, request: _Request, reason: str):
+        """Cancel a queued or running request."""
+        if request.cancel_reason or request.finished:
+            return
+        request.cancel_reason = reason
+        self.stats[reason] += 1
+        
+        if request not in self._running:
+            # Still queued: the worker will skip it
+            request.output.put_nowait(RequestCancelled(reason))
+            request.output.put_nowait(_DONE)
+        
+        logger.debug(f"LLM request for session {request.session_id} {reason}")
+    
+    def _submit(
+        self,
+        session_id: str,
+        prompt: str,
+        priority: int,
+        preemptible: Optional[bool],
+        kwargs: Dict,
+        call: Optional[Callable] = None
+    ) -> _Request:
+        self._ensure_workers()
+        
+        # A newer request from the same session makes the old one stale
+        previous = self._by_session.get(session_id)
+        if previous is not None:
+            self._cancel(previous, 'superseded')
+        
+        # Generation also drops the session's prefill if it has not started
+        if call is None:
+            prefill = self._by_session.get(f"{session_id}{_PREFILL}")
+            if prefill is not None and prefill not in self._running:
+                self._cancel(prefill, 'superseded')
+        
+        # Higher-priority work preempts running preemptible requests
+        for running in list(self._running):
+            if running.preemptible and running.priority > priority:
+                self._cancel(running, 'preempted')
+        
+        request = _Request(
+            priority=priority,
+            seq=next(self._seq),
+            session_id=session_id,
+            prompt=prompt,
+            kwargs=kwargs,
+            preemptible=priority > PRIORITY_USER_REPLY if preemptible is None else preemptible,
+            output=asyncio.Queue(),
+            call=call
+        )
+        self._by_session[session_id] = request
+        self._queue.put_nowait((request.priority, request.seq, request))
+        self.stats['submitted'] += 1
+        return request
+    
+    async def stream(
+        self,
+        session_id: str,
+        prompt: str,
+        priority: int = PRIORITY_USER_REPLY,
+        preemptible: Optional[bool] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Queue a request and stream its tokens.
+        
+        Args:
+            session_id: Session the request belongs to
+            prompt: Input prompt
+            priority: PRIORITY_* constant (lower = served first)
+            preemptible: Whether higher-priority requests may cancel it
+                (defaults to True for anything below user replies)
+            **kwargs: Passed to AsyncLlamaClient.stream() (max_tokens, max_sentences, ...)
+        
+        Yields:
+            Generated tokens
+        
+        Raises:
+            RequestCancelled: If superseded or preempted
+        """
+        request = self._submit(session_id, prompt, priority, preemptible, kwargs)
+        async for token in self._results(request):
+            yield token
+    
+    async def _results(self, request: _Request) -> AsyncIterator[str]:
+        """Yield a request's output until it finishes or is cancelled."""
+        try:
+            while True:
+                item = await request.output.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    # Failed or cancelled, already counted: not abandoned
+                    request.finished = True
+                    raise item
+                yield item
+            request.finished = True
+        finally:
+            if not request.finished:
+                # Caller stopped consuming: free the model
+                self._cancel(request, 'abandoned')
+            request.finished = True
+            if self._by_session.get(request.session_id) is request:
+                del self._by_session[request.session_id]
+    
+    async def generate(
+        self,
+        session_id: str,
+        prompt: str,
+        priority: int = PRIORITY_USER_REPLY,
+        preemptible: Optional[bool] = None,
+        **kwargs
+    ) -> str:
+        """
+        Queue a request and wait for the full completion.
+        
+        Args:
+            session_id: Session the request belongs to
+            prompt: Input prompt
+            priority: PRIORITY_* constant (lower = served first)
+            preemptible: Whether higher-priority requests may cancel it
+            **kwargs: Passed to AsyncLlamaClient.stream() (max_tokens, max_sentences, ...)
+        
+        Returns:
+            Generated text
+        
+        Raises:
+            RequestCancelled: If superseded or preempted
+        """
+        tokens = []
+        async for token in self.stream(session_id, prompt, priority, preemptible, **kwargs):
+            tokens.append(token)
+        return "".join(tokens).strip()
+    
+    async def prefill(
+        self,
+        session_id: str,
+        text: str,
+        priority: int = PRIORITY_USER_REPLY,
+        **kwargs
+    ):
+        """
+        Evaluate the known start of a session's next prompt ahead of time.
+        
+        Runs in order with generation on the inference thread. Prefills
+        are tracked apart from the session's generation requests, so a
+        prefill never cancels a reply that is still generating; the
+        session's next generation request supersedes a prefill still
+        waiting in the queue.
+        
+        Args:
+            session_id: Session the prompt belongs to
+            text: Leading part of the upcoming prompt
+            priority: PRIORITY_* constant
+            **kwargs: Passed to the client's prefill() (e.g. prefix)
+        
+        Raises:
+            RequestCancelled: If superseded before it ran
+        """
+        call = functools.partial(self.client.prefill, text, **kwargs)
+        request = self._submit(f"{session_id}{_PREFILL}", text, priority, False, {}, call=call)
+        async for _ in self._results(request):
+            pass
+    
+    def warm_prefix(self, prefix: str) -> Future:
+        """
+        Evaluate and cache a static prompt prefix on the inference thread.
+        
+        Callable without a running event loop (e.g. from a constructor);
+        the warm-up runs in order with any generation already in flight.
+        
+        Returns:
+            Future resolved once the prefix is cached
+        """
+        return self.async_client.submit(self.client.warm_prefix, prefix)
+    
+    def cancel_session(self, session_id: str, reason: str = 'abandoned') -> bool:
+        """
+        Cancel a session's queued or in-flight request.
+        
+        Args:
+            session_id: Session whose request is cancelled
+            reason: 'abandoned' (session ended) or 'interrupted' (user barge-in)
+        
+        Returns:
+            True if a request was cancelled
+        """
+        request = self._by_session.get(session_id)
+        if request is None or request.finished or request.cancel_reason:
+            return False
+        self._cancel(request, reason)
+        return True
+    
+    def get_stats(self) -> Dict:
+        """Get request counters and current queue depth."""
+        stats = dict(self.stats)
+        stats['queued'] = self._queue.qsize() if self._queue else 0
+        stats['running'] = len(self._running)
+        return stats
+    
+    def shutdown(self):
+        """Stop workers and the inference thread."""
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+        self._loop = None
+        self.async_client.shutdown()
@@ -8,6 +8,12 @@ from typing import Dict, List, Optional
 from datetime import datetime
 from loguru import logger
 
+from .context_budget import ContextBudget
+
+
+# Stands in for the user's text when building a reply prompt's head
+_USER_TEXT_MARK = "\x00"
+
 
 class PromptBuilder:
     """
@@ -46,15 +52,19 @@ Respond naturally and empathetically. Keep responses concise (2-3 sentences max)
 Respond naturally and empathetically. Keep responses concise (2-3 sentences max)."""
     }
     
-    def __init__(self, persona: str = 'remote_worker'):
+    def __init__(self, persona: str = 'remote_worker', budget: Optional[ContextBudget] = None):
         """
         Initialize prompt builder.
         
         Args:
             persona: User persona (remote_worker, student, young_professional)
+            budget: Token budget to fit prompts into (unbounded if None)
         """
         self.persona = persona
+        self.budget = budget
         self.conversation_history: List[Dict[str, str]] = []
+        self.conversation_summary = ""  # Rolling summary of folded-out turns
+        self.last_prompt_tokens: Optional[int] = None
         
         logger.info(f"PromptBuilder initialized for persona '{persona}'")
     
@@ -63,7 +73,8 @@ Respond naturally and empathetically. Keep responses concise (2-3 sentences max)
         emotional_state: Dict,
         user_text: Optional[str] = None,
         intervention_type: Optional[str] = None,
-        time_of_day: Optional[datetime] = None
+        time_of_day: Optional[datetime] = None,
+        include_history: bool = True
     ) -> str:
         """
         Build a prompt with emotional context.
@@ -73,16 +84,12 @@ Respond naturally and empathetically. Keep responses concise (2-3 sentences max)
             user_text: User's spoken text (if any)
             intervention_type: Type of proactive intervention (if any)
             time_of_day: Current time for context
+            include_history: Include the conversation summary and recent
+                turns (False for responses shared across users)
             
         Returns:
             Complete prompt for LLM
         """
-        # Get system prompt for persona
-        system_prompt = self.SYSTEM_PROMPTS.get(
-            self.persona,
-            self.SYSTEM_PROMPTS['remote_worker']
-        )
-        
         # Build emotional context
         emotion_context = self._build_emotion_context(emotional_state)
         
@@ -90,32 +97,110 @@ Respond naturally and empathetically. Keep responses concise (2-3 sentences max)
         time_context = self._build_time_context(time_of_day)
         
         # Build conversation history
-        history_context = self._build_history_context()
+        history_lines = self._build_history_lines() if include_history else []
         
-        # Determine response type
+        # Determine response type. Sections are ordered from most to least
+        # stable (history, situation, time, emotion, user text) after the
+        # static prefix
+        context = "\n".join(part for part in (time_context.strip(), emotion_context) if part)
+        
+        if self.budget:
+            # Trim the lowest-priority sections to fit the token budget
+            fixed = self.get_static_prefix() + self._instruction(intervention_type, user_text)
+            history_lines, context, user_text = self.budget.fit(
+                fixed, history_lines, context, user_text
+            )
+        
+        history_context = self._format_history(history_lines)
+        instruction = self._instruction(intervention_type, user_text)
         if intervention_type:
             # Proactive intervention
-            user_section = f"\n\nSituation: {intervention_type}\n{emotion_context}\n{time_context}"
-            instruction = "\n\nProvide a brief, supportive intervention based on the situation."
+            user_section = f"Situation: {intervention_type}\n{context}"
         elif user_text:
             # Reactive response
-            user_section = f"\n\nUser said: \"{user_text}\"\n{emotion_context}\n{time_context}"
-            instruction = "\n\nRespond empathetically to what the user said, considering their emotional state."
+            user_section = f"{context}\n\nUser said: \"{user_text}\""
         else:
             # Ambient check-in
-            user_section = f"\n{emotion_context}\n{time_context}"
+            user_section = context
+        
+        # Construct full prompt: static persona prefix + dynamic suffix
+        prompt = f"""{self.get_static_prefix()}{history_context}{user_section}{instruction}"""
+        
+        if self.budget:
+            # Whole prompts differ every turn: keep them out of the count cache
+            self.last_prompt_tokens = self.budget.count(prompt, cache=False)
+            if self.last_prompt_tokens > self.budget.max_prompt_tokens:
+                logger.debug(
+                    f"Prompt is {self.last_prompt_tokens} tokens "
+                    f"(budget {self.budget.max_prompt_tokens})"
+                )
+        
+        return prompt
+    
+    @staticmethod
+    def _instruction(intervention_type: Optional[str], user_text: Optional[str]) -> str:
+        """Get the closing instruction (and assistant header) for a request type."""
+        if intervention_type:
+            instruction = "\n\nProvide a brief, supportive intervention based on the situation."
+        elif user_text:
+            instruction = "\n\nRespond empathetically to what the user said, considering their emotional state."
+        else:
             instruction = "\n\nProvide a brief check-in based on their current state."
         
-        # Construct full prompt
-        prompt = f"""<|begin_of_text|><|start_header_id|>system<|end_header_id|>
+        return f"""{instruction}<|eot_id|><|start_header_id|>assistant<|end_header_id|>
 
-{system_prompt}<|eot_id|><|start_header_id|>user<|end_header_id|>
+"""
+    
+    def get_reply_head(
+        self,
+        emotional_state: Dict,
+        time_of_day: Optional[datetime] = None
+    ) -> str:
+        """
+        Get the part of a reply prompt that precedes the user's text.
+        
+        Known as soon as the user starts speaking, so it can be prefilled
+        while speech is still being transcribed.
+        
+        Args:
+            emotional_state: Fused emotional state from fusion engine
+            time_of_day: Current time for context
+            
+        Returns:
+            Leading part of build_prompt(emotional_state, user_text=...)
+        """
+        last_prompt_tokens = self.last_prompt_tokens
+        prompt = self.build_prompt(emotional_state, user_text=_USER_TEXT_MARK, time_of_day=time_of_day)
+        self.last_prompt_tokens = last_prompt_tokens
+        
+        cut = prompt.find(_USER_TEXT_MARK)
+        if cut < 0:
+            return self.get_static_prefix()  # User text trimmed away by the budget
+        return prompt[:cut]
+    
+    def get_static_prefix(self, persona: Optional[str] = None) -> str:
+        """
+        Get the persona's static prompt prefix.
+        
+        Every prompt for a persona starts with exactly this text, so the
+        LLM can cache its evaluated state and only prefill the rest.
+        
+        Args:
+            persona: Persona to use (defaults to the current persona)
+            
+        Returns:
+            Prompt prefix up to the start of the user message
+        """
+        system_prompt = self.SYSTEM_PROMPTS.get(
+            persona or self.persona,
+            self.SYSTEM_PROMPTS['remote_worker']
+        )
+        
+        return f"""<|begin_of_text|><|start_header_id|>system<|end_header_id|>
 
-{history_context}{user_section}{instruction}<|eot_id|><|start_header_id|>assistant<|end_header_id|>
+{system_prompt}<|eot_id|><|start_header_id|>user<|end_header_id|>
 
 """
-        
-        return prompt
     
     def _build_emotion_context(self, emotional_state: Dict) -> str:
         """Build emotional context string."""
@@ -185,21 +270,25 @@ Respond naturally and empathetically. Keep responses concise (2-3 sentences max)
         
         return context
     
-    def _build_history_context(self, max_turns: int = 3) -> str:
-        """Build recent conversation history."""
-        if not self.conversation_history:
-            return ""
-        
+    def _build_history_lines(self, max_turns: int = 3) -> List[str]:
+        """Build summary and recent conversation history lines, oldest first."""
         # Get last N turns
         recent = self.conversation_history[-max_turns:]
         
         history_lines = []
+        if self.conversation_summary:
+            history_lines.append(f"Earlier in this session: {self.conversation_summary}")
         for turn in recent:
             if turn['role'] == 'user':
                 history_lines.append(f"User: {turn['content']}")
             else:
                 history_lines.append(f"Assistant: {turn['content']}")
         
+        return history_lines
+    
+    @staticmethod
+    def _format_history(history_lines: List[str]) -> str:
+        """Format history lines as a prompt section."""
         if history_lines:
             return "Recent conversation:\n" + "\n".join(history_lines) + "\n\n"
         return ""
@@ -216,9 +305,30 @@ Respond naturally and empathetically. Keep responses concise (2-3 sentences max)
         if len(self.conversation_history) > 20:
             self.conversation_history = self.conversation_history[-20:]
     
+    def get_turns_to_summarize(self, keep_recent: int = 3) -> List[Dict]:
+        """Get turns older than the ``keep_recent`` most recent ones."""
+        if len(self.conversation_history) <= keep_recent:
+            return []
+        return self.conversation_history[:len(self.conversation_history) - keep_recent]
+    
+    def apply_summary(self, summary: str, folded_turns: List[Dict]):
+        """
+        Replace folded turns with an updated rolling summary.
+        
+        Args:
+            summary: Summary covering the previous summary and ``folded_turns``
+            folded_turns: Turns (from get_turns_to_summarize) now covered
+        """
+        folded = {id(turn) for turn in folded_turns}
+        self.conversation_history = [
+            turn for turn in self.conversation_history if id(turn) not in folded
+        ]
+        self.conversation_summary = summary
+    
     def clear_history(self):
         """Clear conversation history."""
         self.conversation_history.clear()
+        self.conversation_summary = ""
         logger.debug("Conversation history cleared")
     
     def set_persona(self, persona: str):
@@ -0,0 +1,294 @@
+"""Client for a local OpenAI-compatible LLM inference server.
+
+Talks to a separate inference process (e.g. llama.cpp's ``llama-server``)
+over HTTP so that agent workers do not each load the model.
+"""
+
+import json
+import time
+import threading
+from typing import Dict, Iterator, Optional
+from loguru import logger
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class LlamaServerClient:
+    """
+    LLM client backed by an OpenAI-compatible completions endpoint.
+    
+    Drop-in replacement for LlamaClient (same generate/generate_stream
+    interface). Requests go over a pooled keep-alive session, and
+    streamed completions are read as server-sent events. Prompt prefix
+    reuse happens server-side: llama.cpp keeps each slot's KV cache and
+    only evaluates the part of a prompt that changed. Calls may run from
+    several threads at once, one per server slot in use.
+    """
+    
+    STOP = ["<|eot_id|>", "\n\nUser:", "\n\nHuman:"]
+    supports_parallel = True  # Each request is an independent HTTP call
+    
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8080/v1",
+        model: str = "llama-3.1-8b-instruct",
+        api_key: Optional[str] = None,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        top_k: int = 40,
+        max_tokens: int = 512,
+        timeout: float = 30.0,
+        pool_size: int = 4
+    ):
+        """
+        Initialize server client.
+        
+        Args:
+            base_url: OpenAI-compatible API root (ending in /v1)
+            model: Model name sent with each request
+            api_key: Bearer token, if the server requires one
+            temperature: Sampling temperature
+            top_p: Nucleus sampling parameter
+            top_k: Top-k sampling parameter
+            max_tokens: Maximum tokens to generate
+            timeout: Connect/read timeout in seconds
+            pool_size: Pooled connections kept open to the server
+        """
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.temperature = temperature
+        self.top_p = top_p
+        self.top_k = top_k
+        self.max_tokens = max_tokens
+        self.timeout = timeout
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if api_key:
+            self.session.headers['Authorization'] = f"Bearer {api_key}"
+        
+        # Counters are updated from several inference threads
+        self._stats_lock = threading.Lock()
+        self.prefix_stats = {
+            'prompt_tokens': 0,
+            'prefill_tokens': 0,
+            'early_prefill_tokens': 0
+        }
+        self.decode_stats = {
+            'requests': 0,
+            'tokens': 0,
+            'stream_tokens': 0,
+            'stream_seconds': 0.0
+        }
+        
+        # Prompt characters/tokens the server reported, for count_tokens
+        self._calibration_chars = 0
+        self._calibration_tokens = 0
+        
+        logger.info(f"LlamaServerClient initialized ({self.base_url}, model={model})")
+    
+    def _payload(
+        self,
+        prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        stream: bool
+    ) -> Dict:
+        """Build a completions request body."""
+        return {
+            'model': self.model,
+            'prompt': prompt,
+            'max_tokens': max_tokens or self.max_tokens,
+            'temperature': temperature or self.temperature,
+            'top_p': self.top_p,
+            'top_k': self.top_k,
+            'stop': self.STOP,
+            'stream': stream,
+            'cache_prompt': True  # llama.cpp: reuse the slot's KV cache
+        }
+    
+    def _record_usage(self, data: Dict, prompt: str):
+        """Update counters from a response's usage/timings fields."""
+        usage = data.get('usage') or {}
+        timings = data.get('timings') or {}
+        prompt_tokens = usage.get('prompt_tokens', 0)
+        with self._stats_lock:
+            self._calibrate(prompt, prompt_tokens)
+            self.prefix_stats['prompt_tokens'] += prompt_tokens
+            # llama.cpp reports how many prompt tokens were actually evaluated
+            self.prefix_stats['prefill_tokens'] += timings.get('prompt_n', prompt_tokens)
+    
+    def _calibrate(self, prompt: str, prompt_tokens: int):
+        """Fold a prompt's reported token count into the estimate (hold _stats_lock)."""
+        if prompt and prompt_tokens:
+            self._calibration_chars += len(prompt)
+            self._calibration_tokens += prompt_tokens
+    
+    def generate(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        prefix: Optional[str] = None
+    ) -> str:
+        """
+        Generate text completion (blocking).
+        
+        Args:
+            prompt: Input prompt
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+            prefix: Unused; the server reuses prompt prefixes itself
+        
+        Returns:
+            Generated text
+        """
+        try:
+            response = self.session.post(
+                f"{self.base_url}/completions",
+                json=self._payload(prompt, temperature, max_tokens, stream=False),
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            data = response.json()
+            
+            self._record_usage(data, prompt)
+            with self._stats_lock:
+                self.decode_stats['requests'] += 1
+                self.decode_stats['tokens'] += (data.get('usage') or {}).get('completion_tokens', 0)
+            
+            return data['choices'][0]['text'].strip()
+        
+        except Exception as e:
+            logger.error(f"Error in generate: {e}")
+            return ""
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        prefix: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Generate text completion (streaming over server-sent events).
+        
+        Closing the generator closes the response, which makes the
+        server stop decoding.
+        
+        Args:
+            prompt: Input prompt
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+            prefix: Unused; the server reuses prompt prefixes itself
+        
+        Yields:
+            Generated tokens
+        """
+        try:
+            with self.session.post(
+                f"{self.base_url}/completions",
+                json=self._payload(prompt, temperature, max_tokens, stream=True),
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                with self._stats_lock:
+                    self.decode_stats['requests'] += 1
+                started = None
+                tokens = 0
+                
+                try:
+                    for line in response.iter_lines(decode_unicode=True):
+                        if not line or not line.startswith('data:'):
+                            continue
+                        payload = line[len('data:'):].strip()
+                        if payload == '[DONE]':
+                            break
+                        
+                        data = json.loads(payload)
+                        if data.get('usage') or data.get('timings'):
+                            self._record_usage(data, prompt)
+                        if not data.get('choices'):
+                            continue
+                        
+                        token = data['choices'][0].get('text', '')
+                        if not token:
+                            continue
+                        if started is None:
+                            started = time.perf_counter()
+                        tokens += 1
+                        yield token
+                finally:
+                    with self._stats_lock:
+                        self.decode_stats['tokens'] += tokens
+                        if started is not None:
+                            # Decode rate excludes the first token (prefill)
+                            self.decode_stats['stream_tokens'] += tokens - 1
+                            self.decode_stats['stream_seconds'] += time.perf_counter() - started
+        
+        except Exception as e:
+            logger.error(f"Error in generate_stream: {e}")
+            yield ""
+    
+    def prefill(self, text: str, prefix: Optional[str] = None):
+        """
+        Evaluate the leading part of an upcoming prompt now.
+        
+        The server keeps the evaluated tokens in the slot's KV cache, so a
+        following request starting with ``text`` only evaluates the rest.
+        """
+        try:
+            payload = self._payload(text, None, 1, stream=False)
+            response = self.session.post(
+                f"{self.base_url}/completions", json=payload, timeout=self.timeout
+            )
+            response.raise_for_status()
+            usage = response.json().get('usage') or {}
+            with self._stats_lock:
+                self._calibrate(text, usage.get('prompt_tokens', 0))
+                self.prefix_stats['early_prefill_tokens'] += usage.get('prompt_tokens', 0)
+        except Exception as e:
+            logger.warning(f"Early prefill failed: {e}")
+    
+    def warm_prefix(self, prefix: str):
+        """Evaluate a static prompt prefix ahead of time."""
+        self.prefill(prefix)
+    
+    def get_prefix_cache_stats(self) -> Dict:
+        """Get prompt and evaluated-prompt token counters."""
+        with self._stats_lock:
+            stats = dict(self.prefix_stats)
+        stats['reused_tokens'] = stats['prompt_tokens'] - stats['prefill_tokens']
+        return stats
+    
+    def get_speculative_stats(self) -> Dict:
+        """Get decode throughput counters (speculation is configured server-side)."""
+        with self._stats_lock:
+            stats = dict(self.decode_stats)
+        stats['mode'] = 'server'
+        stats['tokens_per_second'] = (
+            stats['stream_tokens'] / stats['stream_seconds'] if stats['stream_seconds'] > 0 else 0.0
+        )
+        return stats
+    
+    def count_tokens(self, text: str) -> int:
+        """
+        Estimate tokens in text without a server round trip.
+        
+        Prompt budgeting calls this on the event loop for every prompt,
+        so it never uses the server's /tokenize endpoint. The estimate
+        starts at ~4 characters per token and is calibrated from the
+        prompt token counts the server reports for completed requests.
+        """
+        with self._stats_lock:
+            chars, tokens = self._calibration_chars, self._calibration_tokens
+        chars_per_token = chars / tokens if tokens else 4.0
+        return int(len(text) / chars_per_token)
+    
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
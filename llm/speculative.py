@@ -0,0 +1,130 @@
+"""Draft models for speculative decoding with llama.cpp.
+
+A draft model proposes the next few tokens cheaply; the main model
+verifies all of them in one batched forward pass and keeps the longest
+matching run, so several tokens can be accepted per memory-bound
+decode step.
+"""
+
+import numpy as np
+from typing import Any, Optional
+from loguru import logger
+
+from llama_cpp.llama_speculative import LlamaDraftModel, LlamaPromptLookupDecoding
+
+
+class GGUFDraftModel(LlamaDraftModel):
+    """
+    Greedy drafts from a small GGUF model sharing the main model's vocabulary.
+    
+    The draft context keeps its evaluated tokens between calls and only
+    evaluates what changed, like the main model's prefix reuse.
+    """
+    
+    def __init__(
+        self,
+        model_path: str,
+        num_pred_tokens: int = 4,
+        context_length: int = 8192,
+        n_gpu_layers: int = 0
+    ):
+        """
+        Initialize draft model.
+        
+        Args:
+            model_path: Path to the draft GGUF (e.g. Llama 3.2 1B for Llama 3.1 8B)
+            num_pred_tokens: Tokens drafted per step
+            context_length: Draft context window (should match the main model)
+            n_gpu_layers: Number of layers to offload to GPU
+        """
+        from llama_cpp import Llama
+        
+        self.num_pred_tokens = num_pred_tokens
+        # Logits of the last evaluated token are needed for greedy drafting
+        self.model = Llama(
+            model_path=model_path,
+            n_ctx=context_length,
+            n_gpu_layers=n_gpu_layers,
+            logits_all=True,
+            verbose=False
+        )
+        
+        logger.info(f"Draft model loaded from {model_path}")
+    
+    def __call__(self, input_ids: np.ndarray, /, **kwargs: Any) -> np.ndarray:
+        tokens = input_ids.tolist()
+        
+        # Rewind to the longest prefix shared with the last call, keeping
+        # at least one token to evaluate for fresh logits
+        current = self.model.input_ids[:self.model.n_tokens].tolist()
+        common = 0
+        for a, b in zip(current, tokens):
+            if a != b:
+                break
+            common += 1
+        self.model.n_tokens = min(common, len(tokens) - 1)
+        self.model.eval(tokens[self.model.n_tokens:])
+        
+        draft = []
+        eos = self.model.token_eos()
+        for _ in range(self.num_pred_tokens):
+            token = int(np.argmax(self.model.scores[self.model.n_tokens - 1]))
+            if token == eos:
+                break
+            draft.append(token)
+            self.model.eval([token])
+        
+        return np.array(draft, dtype=np.intc)
+
+
+class CountingDraftModel(LlamaDraftModel):
+    """Wraps a draft model and counts draft calls and proposed tokens."""
+    
+    def __init__(self, draft_model: LlamaDraftModel):
+        self.draft_model = draft_model
+        self.calls = 0
+        self.drafted_tokens = 0
+    
+    def __call__(self, input_ids: np.ndarray, /, **kwargs: Any) -> np.ndarray:
+        draft = self.draft_model(input_ids, **kwargs)
+        self.calls += 1
+        self.drafted_tokens += len(draft)
+        return draft
+
+
+def create_draft_model(
+    mode: str,
+    draft_model_path: Optional[str] = None,
+    num_draft_tokens: Optional[int] = None,
+    context_length: int = 8192,
+    n_gpu_layers: int = 0
+) -> CountingDraftModel:
+    """
+    Create a draft model for speculative decoding.
+    
+    Args:
+        mode: 'prompt_lookup' (drafts by matching n-grams in the prompt and
+            history) or 'draft_model' (a small GGUF model)
+        draft_model_path: Draft GGUF path (for 'draft_model')
+        num_draft_tokens: Tokens drafted per step
+        context_length: Context window of the main model
+        n_gpu_layers: GPU layers for the draft model
+    
+    Returns:
+        Draft model wrapped with counters
+    """
+    if mode == 'prompt_lookup':
+        draft = LlamaPromptLookupDecoding(num_pred_tokens=num_draft_tokens or 10)
+    elif mode == 'draft_model':
+        if not draft_model_path:
+            raise ValueError("draft_model_path is required for draft_model speculation")
+        draft = GGUFDraftModel(
+            draft_model_path,
+            num_pred_tokens=num_draft_tokens or 4,
+            context_length=context_length,
+            n_gpu_layers=n_gpu_layers
+        )
+    else:
+        raise ValueError(f"Unknown speculative mode: {mode}")
+    
+    return CountingDraftModel(draft)
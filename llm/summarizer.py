@@ -0,0 +1,99 @@
+"""Incremental conversation summarization.
+
+Folds older conversation turns into a compact rolling summary so that
+prompts carry long-range context at a roughly constant token count.
+"""
+
+from typing import Awaitable, Callable, Dict, List
+from loguru import logger
+
+from .prompt_builder import PromptBuilder
+
+
+SUMMARY_SYSTEM_PROMPT = """You maintain a brief running summary of a conversation between a user and a supportive companion. Keep what matters for later: how the user has been feeling, what they are dealing with, and anything worth following up on. Reply with the updated summary only."""
+
+
+class ConversationSummarizer:
+    """
+    Maintains a PromptBuilder's rolling conversation summary.
+    
+    Once enough turns have aged out of the verbatim window they are
+    summarized together with the previous summary in one LLM call,
+    which callers schedule at background priority so that it only runs
+    when the model is otherwise idle.
+    """
+    
+    def __init__(self, keep_recent_turns: int = 3, min_turns: int = 4, max_words: int = 80):
+        """
+        Initialize summarizer.
+        
+        Args:
+            keep_recent_turns: Turns kept verbatim in the prompt
+            min_turns: Aged-out turns needed before summarizing
+            max_words: Maximum summary length
+        """
+        self.keep_recent_turns = keep_recent_turns
+        self.min_turns = min_turns
+        self.max_words = max_words
+        self.summaries = 0
+        
+        logger.info(
+            f"ConversationSummarizer initialized (keep_recent={keep_recent_turns}, "
+            f"min_turns={min_turns})"
+        )
+    
+    def should_summarize(self, prompt_builder: PromptBuilder) -> bool:
+        """Whether enough turns have aged out to fold them."""
+        turns = prompt_builder.get_turns_to_summarize(self.keep_recent_turns)
+        return len(turns) >= self.min_turns
+    
+    def build_prompt(self, summary: str, turns: List[Dict]) -> str:
+        """Build the prompt that folds ``turns`` into ``summary``."""
+        lines = []
+        for turn in turns:
+            speaker = "User" if turn['role'] == 'user' else "Assistant"
+            lines.append(f"{speaker}: {turn['content']}")
+        
+        return f"""<|begin_of_text|><|start_header_id|>system<|end_header_id|>
+
+{SUMMARY_SYSTEM_PROMPT} Use at most {self.max_words} words.<|eot_id|><|start_header_id|>user<|end_header_id|>
+
+Current summary: {summary or "(none)"}
+
+New turns:
+{chr(10).join(lines)}<|eot_id|><|start_header_id|>assistant<|end_header_id|>
+
+"""
+    
+    async def summarize(
+        self,
+        prompt_builder: PromptBuilder,
+        generate: Callable[[str], Awaitable[str]]
+    ) -> bool:
+        """
+        Fold aged-out turns into the builder's summary.
+        
+        Args:
+            prompt_builder: Builder whose history is summarized
+            generate: Coroutine function running the LLM on a prompt
+        
+        Returns:
+            True if the summary was updated
+        """
+        turns = prompt_builder.get_turns_to_summarize(self.keep_recent_turns)
+        if len(turns) < self.min_turns:
+            return False
+        
+        summary = await generate(self.build_prompt(prompt_builder.conversation_summary, turns))
+        
+        words = summary.split()
+        if not words:
+            logger.warning("Empty conversation summary, keeping turns")
+            return False
+        if len(words) > self.max_words:
+            summary = " ".join(words[:self.max_words])
+        
+        prompt_builder.apply_summary(summary, turns)
+        self.summaries += 1
+        logger.debug(f"Folded {len(turns)} turns into conversation summary")
+        return True
@@ -39,19 +39,19 @@ async def main():
     print("2. Testing audio processing...")
     test_audio = np.random.randn(16000).astype(np.float32) * 0.1
     
-    audio_result = await agent.process_audio_chunk(test_audio, timestamp=0.0)
+    await agent.process_audio_chunk(test_audio, timestamp=0.0)
     print(f"   ✓ Audio processed")
     
-    # Scenario 3: Fusion
+    # Scenario 3: Fusion (of the inputs buffered by the fusion scheduler)
     print("3. Testing multimodal fusion...")
-    fused_state = await agent.process_multimodal(visual_state, audio_result)
+    fused_state = await agent.fuse_scheduled()
     print(f"   ✓ Fused emotion: {fused_state['primary_emotion']}")
     print(f"   ✓ Valence: {fused_state['valence']:.2f}, Arousal: {fused_state['arousal']:.2f}")
     
-    # Scenario 4: Generate response
-    print("4. Testing LLM response generation...")
-    response = await agent.generate_response(user_text="Hello, how are you?")
-    print(f"   ✓ Response: \"{response}\"")
+    # Scenario 4: Generate response (each sentence synthesized as it completes)
+    print("4. Testing streamed LLM response and TTS...")
+    async for segment, segment_audio in agent.stream_response(user_text="Hello, how are you?"):
+        print(f"   ✓ Response segment: \"{segment}\" ({len(segment_audio)} samples)")
     
     # Scenario 5: Synthesize speech
     print("5. Testing TTS synthesis...")
@@ -1,12 +1,24 @@
 """Memory package."""
 
 from .session_memory import SessionMemory, EmotionalSnapshot
+from .emotion_timeline import EmotionTimeline
 from .user_profile import UserProfile, UserPreferences, EmotionalPattern
+from .profile_store import SQLiteProfileStore
+from .storage import ProfileStore, SessionStore
+from .redis_store import RedisStore
+from .response_cache import InterventionResponseCache, CachedResponse
 
 __all__ = [
     'SessionMemory',
     'EmotionalSnapshot',
+    'EmotionTimeline',
     'UserProfile',
     'UserPreferences',
-    'EmotionalPattern'
+    'EmotionalPattern',
+    'SQLiteProfileStore',
+    'ProfileStore',
+    'SessionStore',
+    'RedisStore',
+    'InterventionResponseCache',
+    'CachedResponse'
 ]
@@ -0,0 +1,455 @@
+"""Array-backed emotional timeline with windowed aggregates.
+
+Stores snapshots as parallel NumPy arrays with running prefix sums, so
+that summaries over "the last N minutes" cost a binary search plus a
+few subtractions regardless of how many snapshots the window holds.
+Raw snapshots cover the recent past; 1-second and 1-minute rollups
+cover the whole session.
+"""
+
+import os
+import weakref
+import tempfile
+import numpy as np
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+@dataclass(slots=True)
+class EmotionalSnapshot:
+    """Single point in emotional timeline."""
+    timestamp: datetime
+    emotion: str
+    valence: float
+    arousal: float
+    authenticity: float
+    context: str  # What triggered this emotion
+
+
+def valence_trend(early_valence: float, late_valence: float) -> str:
+    """Classify the change in mean valence between two halves of a window."""
+    if late_valence > early_valence + 0.2:
+        return 'improving'
+    if late_valence < early_valence - 0.2:
+        return 'declining'
+    return 'stable'
+
+
+def _remove_spill_file(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass  # Already gone, or still mapped on a platform that forbids it
+
+
+class RollupTier:
+    """
+    Fixed-width time buckets with cumulative aggregates.
+    
+    Each closed bucket stores its start time and the running totals
+    (count, valence/arousal/authenticity sums, per-label counts) up to
+    and including it, so totals over any range of buckets are one
+    subtraction. The bucket still being filled is kept separately.
+    
+    With ``spill_dir`` the buckets live in a memory-mapped file sized
+    for ``max_buckets``; pages not recently touched stay on disk.
+    Otherwise they are in memory and grow as needed. Beyond
+    ``max_buckets`` the oldest half is dropped. The spill file is
+    deleted by ``reset``/``close``, or when the tier is garbage
+    collected or the process exits.
+    """
+    
+    def __init__(
+        self,
+        width: float,
+        max_buckets: int,
+        max_labels: int = 32,
+        spill_dir: Optional[str] = None
+    ):
+        """
+        Initialize rollup tier.
+        
+        Args:
+            width: Bucket width in seconds
+            max_buckets: Buckets kept (e.g. a session's duration / width)
+            max_labels: Emotion codes counted per bucket
+            spill_dir: Directory for the memory-mapped bucket file
+        """
+        self.width = width
+        self.max_buckets = max_buckets
+        self.max_labels = max_labels
+        self.spill_dir = spill_dir
+        
+        # Column 0: bucket start; columns 1+: cumulative totals
+        self._data: Optional[np.ndarray] = None
+        self._path: Optional[str] = None
+        self._remove_file: Optional[weakref.finalize] = None
+        self._n = 0
+        self.dropped = False
+        
+        self._pending = np.zeros(4 + max_labels, dtype=np.float64)
+        self._pending_start: Optional[float] = None
+    
+    def __len__(self) -> int:
+        return self._n + (self._pending_start is not None)
+    
+    def _grow(self):
+        """Allocate (or enlarge) bucket storage."""
+        columns = 5 + self.max_labels
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            fd, self._path = tempfile.mkstemp(prefix=f"timeline_{self.width:g}s_", suffix='.bin', dir=self.spill_dir)
+            os.close(fd)
+            self._remove_file = weakref.finalize(self, _remove_spill_file, self._path)
+            self._data = np.memmap(self._path, dtype=np.float64, mode='w+', shape=(self.max_buckets, columns))
+            return
+        
+        rows = min(self.max_buckets, max(256, 2 * (len(self._data) if self._data is not None else 0)))
+        data = np.zeros((rows, columns), dtype=np.float64)
+        if self._data is not None:
+            data[:self._n] = self._data[:self._n]
+        self._data = data
+    
+    def _drop_oldest(self):
+        """Drop the older half of the buckets and rebase the totals."""
+        keep = self._n // 2
+        base = self._data[self._n - keep - 1, 1:].copy()
+        self._data[:keep] = self._data[self._n - keep:self._n]
+        self._data[:keep, 1:] -= base
+        self._n = keep
+        self.dropped = True
+    
+    def _close_bucket(self):
+        if self._data is None or self._n == len(self._data):
+            if self._data is not None and len(self._data) >= self.max_buckets:
+                self._drop_oldest()
+            else:
+                self._grow()
+        
+        row = self._data[self._n]
+        row[0] = self._pending_start
+        row[1:] = self._pending
+        if self._n:
+            row[1:] += self._data[self._n - 1, 1:]
+        self._n += 1
+        
+        self._pending[:] = 0
+        self._pending_start = None
+    
+    def add(self, timestamp: float, code: int, valence: float, arousal: float, authenticity: float):
+        """Add a snapshot to its bucket."""
+        start = np.floor(timestamp / self.width) * self.width
+        if self._pending_start is not None and start != self._pending_start:
+            self._close_bucket()
+        if self._pending_start is None:
+            self._pending_start = start
+        
+        pending = self._pending
+        pending[0] += 1
+        pending[1] += valence
+        pending[2] += arousal
+        pending[3] += authenticity
+        if code < self.max_labels:
+            pending[4 + code] += 1
+    
+    @property
+    def oldest(self) -> Optional[float]:
+        """Start of the oldest bucket kept."""
+        if self._n:
+            return float(self._data[0, 0])
+        return self._pending_start
+    
+    def covers(self, since: float) -> bool:
+        """Whether every bucket starting at or after ``since`` is kept."""
+        return not self.dropped or (self.oldest is not None and self.oldest <= since)
+    
+    def _cumulative(self, t: float) -> np.ndarray:
+        """Totals of the closed buckets starting before ``t``."""
+        index = int(np.searchsorted(self._data[:self._n, 0], t, side='left')) if self._n else 0
+        if index == 0:
+            return np.zeros(4 + self.max_labels, dtype=np.float64)
+        return self._data[index - 1, 1:]
+    
+    def totals(self, since: float, until: float = np.inf) -> np.ndarray:
+        """
+        Totals over the buckets starting in [since, until).
+        
+        Returns:
+            Array of (count, valence sum, arousal sum, authenticity sum,
+            per-label counts...)
+        """
+        totals = self._cumulative(until) - self._cumulative(since)
+        if self._pending_start is not None and since <= self._pending_start < until:
+            totals = totals + self._pending
+        return totals
+    
+    def reset(self):
+        """Remove all buckets and any spill file."""
+        if self._path:
+            self._data = None  # Release the mapping before deleting
+            self._remove_file()
+            self._path = None
+            self._remove_file = None
+        self._n = 0
+        self.dropped = False
+        self._pending[:] = 0
+        self._pending_start = None
+    
+    def close(self):
+        """Release the tier's storage and delete its spill file."""
+        self.reset()
+
+
+class EmotionTimeline:
+    """
+    Session timeline of emotional snapshots.
+    
+    Keeps the most recent ``capacity`` snapshots. Timestamps (seconds,
+    non-decreasing), valence, arousal and authenticity are stored in
+    parallel arrays; emotions as int8 codes into a vocabulary that grows
+    as labels are seen. Prefix sums of the scores and per-label prefix
+    counts make any contiguous range summable in O(labels).
+    
+    Storage is twice the capacity; when it fills, the live half is moved
+    to the front and the prefix sums rebased (amortized O(1) appends).
+    
+    Every snapshot is also rolled up into coarser tiers, by default
+    1-second buckets for the last hour and 1-minute buckets for the
+    whole session, so summaries over windows older than the raw
+    snapshots stay correct at bucket resolution.
+    """
+    
+    def __init__(
+        self,
+        capacity: int = 1000,
+        rollups: Sequence[Tuple[float, Optional[float]]] = ((1.0, 3600.0), (60.0, None)),
+        max_duration_seconds: float = 8 * 3600,
+        spill_dir: Optional[str] = None
+    ):
+        """
+        Initialize timeline.
+        
+        Args:
+            capacity: Maximum raw snapshots kept
+            rollups: (bucket width, span) of each rollup tier, finest
+                first; a span of None covers the whole session
+            max_duration_seconds: Session length the rollup tiers are sized for
+            spill_dir: Directory for memory-mapped rollup tiers (memory if None)
+        """
+        self.capacity = capacity
+        self.tiers = [
+            RollupTier(width, int(min(span or max_duration_seconds, max_duration_seconds) / width) + 2, spill_dir=spill_dir)
+            for width, span in rollups
+        ]
+        self._dropped = False  # Whether raw snapshots have been discarded
+        self.labels: List[str] = []
+        self._label_codes: Dict[str, int] = {}
+        
+        size = 2 * capacity
+        self.timestamps = np.zeros(size, dtype=np.float64)
+        self.valence = np.zeros(size, dtype=np.float32)
+        self.arousal = np.zeros(size, dtype=np.float32)
+        self.authenticity = np.zeros(size, dtype=np.float32)
+        self.emotions = np.zeros(size, dtype=np.int8)
+        self.contexts: List[str] = []
+        
+        # Row k holds the sum over entries [0, k)
+        self._score_sums = np.zeros((size + 1, 3), dtype=np.float64)
+        self._label_counts = np.zeros((size + 1, 0), dtype=np.int32)
+        
+        self._start = 0  # First live entry
+        self._end = 0  # One past the last entry
+    
+    def __len__(self) -> int:
+        return self._end - self._start
+    
+    def _code(self, emotion: str) -> int:
+        """Code of a label, extending the vocabulary if needed."""
+        code = self._label_codes.get(emotion)
+        if code is None:
+            if len(self.labels) >= np.iinfo(np.int8).max:
+                raise ValueError("Emotion vocabulary is full")
+            code = len(self.labels)
+            self.labels.append(emotion)
+            self._label_codes[emotion] = code
+            self._label_counts = np.pad(self._label_counts, ((0, 0), (0, 1)))
+        return code
+    
+    def _compact(self):
+        """Move the live entries to the front of the arrays."""
+        start, end = self._start, self._end
+        n = end - start
+        for array in (self.timestamps, self.valence, self.arousal, self.authenticity, self.emotions):
+            array[:n] = array[start:end]
+        self._score_sums[:n + 1] = self._score_sums[start:end + 1] - self._score_sums[start]
+        self._label_counts[:n + 1] = self._label_counts[start:end + 1] - self._label_counts[start]
+        self.contexts = self.contexts[start:end]
+        self._start, self._end = 0, n
+    
+    def append(
+        self,
+        timestamp: float,
+        emotion: str,
+        valence: float,
+        arousal: float,
+        authenticity: float = 1.0,
+        context: str = ""
+    ):
+        """
+        Add a snapshot.
+        
+        Args:
+            timestamp: Time in seconds (clamped to be non-decreasing)
+            emotion: Primary emotion
+            valence: Emotional valence
+            arousal: Arousal level
+            authenticity: Authenticity score
+            context: What triggered this state
+        """
+        if self._end == len(self.timestamps):
+            self._compact()
+        
+        i = self._end
+        if i > self._start:
+            timestamp = max(timestamp, self.timestamps[i - 1])
+        code = self._code(emotion)
+        
+        self.timestamps[i] = timestamp
+        self.valence[i] = valence
+        self.arousal[i] = arousal
+        self.authenticity[i] = authenticity
+        self.emotions[i] = code
+        self.contexts.append(context)
+        
+        self._score_sums[i + 1] = self._score_sums[i] + (valence, arousal, authenticity)
+        self._label_counts[i + 1] = self._label_counts[i]
+        self._label_counts[i + 1, code] += 1
+        
+        self._end += 1
+        if self._end - self._start > self.capacity:
+            self._start += 1
+            self._dropped = True
+        
+        for tier in self.tiers:
+            tier.add(timestamp, code, valence, arousal, authenticity)
+    
+    def __getitem__(self, index: int) -> EmotionalSnapshot:
+        """Materialize one snapshot (negative indices count from the end)."""
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("timeline index out of range")
+        
+        i = self._start + index
+        return EmotionalSnapshot(
+            timestamp=datetime.fromtimestamp(self.timestamps[i]),
+            emotion=self.labels[self.emotions[i]],
+            valence=float(self.valence[i]),
+            arousal=float(self.arousal[i]),
+            authenticity=float(self.authenticity[i]),
+            context=self.contexts[i]
+        )
+    
+    def __iter__(self) -> Iterator[EmotionalSnapshot]:
+        for index in range(len(self)):
+            yield self[index]
+    
+    def latest(self) -> Optional[Tuple[float, float, float]]:
+        """(valence, arousal, authenticity) of the newest snapshot, without materializing it."""
+        if not len(self):
+            return None
+        i = self._end - 1
+        return float(self.valence[i]), float(self.arousal[i]), float(self.authenticity[i])
+    
+    def window(self, since: float) -> Tuple[int, int]:
+        """Storage range [i, j) of the snapshots at or after ``since``."""
+        i = self._start + int(np.searchsorted(self.timestamps[self._start:self._end], since, side='left'))
+        return i, self._end
+    
+    def range_sums(self, i: int, j: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(valence/arousal/authenticity sums, per-label counts) over [i, j)."""
+        return self._score_sums[j] - self._score_sums[i], self._label_counts[j] - self._label_counts[i]
+    
+    def _make_summary(self, totals: np.ndarray, label_counts: np.ndarray, trend: str) -> Dict:
+        """Summary dict from (count, valence sum, arousal sum) and label counts."""
+        n = int(totals[0])
+        return {
+            'dominant_emotion': self.labels[int(np.argmax(label_counts))],
+            'avg_valence': float(totals[1] / n),
+            'avg_arousal': float(totals[2] / n),
+            'trend': trend,
+            'num_snapshots': n
+        }
+    
+    def _raw_summary(self, since: float, fallback_count: int) -> Dict:
+        """Exact summary from the raw snapshots."""
+        i, j = self.window(since)
+        if i == j:
+            i = max(self._start, j - fallback_count)
+        n = j - i
+        
+        sums, counts = self.range_sums(i, j)
+        
+        # Trend: mean valence of the later half against the earlier half
+        trend = 'stable'
+        if n >= 3:
+            mid = i + n // 2
+            early_valence = (self._score_sums[mid, 0] - self._score_sums[i, 0]) / (mid - i)
+            late_valence = (self._score_sums[j, 0] - self._score_sums[mid, 0]) / (j - mid)
+            trend = valence_trend(early_valence, late_valence)
+        
+        return self._make_summary(np.array([n, sums[0], sums[1]]), counts, trend)
+    
+    def summary(self, since: float, fallback_count: int = 10) -> Optional[Dict]:
+        """
+        Summarize the snapshots at or after ``since``.
+        
+        Uses the raw snapshots when they reach back to ``since``,
+        otherwise the finest rollup tier that does (the window start is
+        then rounded to that tier's bucket width, and the trend splits
+        the window by time rather than by count).
+        
+        Args:
+            since: Window start (seconds)
+            fallback_count: Snapshots summarized if the window is empty
+        
+        Returns:
+            Summary statistics, or None if the timeline is empty
+        """
+        if not len(self):
+            return None
+        
+        if not self._dropped or self.timestamps[self._start] <= since or not self.tiers:
+            return self._raw_summary(since, fallback_count)
+        
+        tier = next((t for t in self.tiers if t.covers(since)), self.tiers[-1])
+        totals = tier.totals(since)
+        if totals[0] == 0:
+            return self._raw_summary(since, fallback_count)
+        
+        n_labels = min(len(self.labels), tier.max_labels)
+        label_counts = totals[4:4 + n_labels]
+        
+        trend = 'stable'
+        if totals[0] >= 3:
+            start = max(since, tier.oldest)
+            mid = start + (self.timestamps[self._end - 1] - start) / 2
+            early, late = tier.totals(since, mid), tier.totals(mid)
+            if early[0] and late[0]:
+                trend = valence_trend(early[1] / early[0], late[1] / late[0])
+        
+        return self._make_summary(totals[:3], label_counts, trend)
+    
+    def clear(self):
+        """Remove all snapshots (the vocabulary is kept)."""
+        self._start = self._end = 0
+        self._dropped = False
+        self.contexts = []
+        for tier in self.tiers:
+            tier.reset()
+    
+    def close(self):
+        """Remove all snapshots and delete the rollup tiers' spill files."""
+        self.clear()
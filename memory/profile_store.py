@@ -0,0 +1,321 @@
+"""Embedded SQLite store for user profiles.
+
+Profiles are stored as rows rather than whole JSON documents: the
+profile row, one row per learned pattern and one row per intervention,
+so each change is a small upsert. Changes are buffered and written by a
+background thread every ``flush_interval_seconds`` (write-behind), which
+keeps disk I/O off the event loop and batches many updates into one
+transaction. The database runs in WAL mode so reads do not wait for the
+writer.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+
+from .storage import ProfileStore
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    user_id TEXT PRIMARY KEY,
+    preferences TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    last_session TEXT,
+    total_sessions INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS patterns (
+    user_id TEXT NOT NULL,
+    pattern_type TEXT NOT NULL,
+    description TEXT NOT NULL,
+    frequency INTEGER NOT NULL,
+    last_seen TEXT NOT NULL,
+    PRIMARY KEY (user_id, pattern_type)
+);
+CREATE TABLE IF NOT EXISTS interventions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    type TEXT NOT NULL,
+    effective INTEGER
+);
+CREATE INDEX IF NOT EXISTS interventions_user ON interventions (user_id, id);
+"""
+
+
+class SQLiteProfileStore(ProfileStore):
+    """
+    Write-behind profile store backed by SQLite.
+    
+    ``put_profile``, ``put_pattern`` and ``add_intervention`` only
+    buffer the change (repeated updates of the same row coalesce);
+    ``flush`` writes everything buffered in one transaction. Reads flush
+    the user's own pending changes first, so they always see earlier
+    writes without paying for other users' backlog.
+    """
+    
+    _shared: Optional['SQLiteProfileStore'] = None
+    
+    def __init__(
+        self,
+        db_path: str,
+        flush_interval_seconds: float = 60.0,
+        max_interventions: int = 100
+    ):
+        """
+        Initialize profile store.
+        
+        Args:
+            db_path: SQLite database file
+            flush_interval_seconds: Write-behind interval (0 = flush only on request)
+            max_interventions: Intervention records kept per user
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval_seconds
+        self.max_interventions = max_interventions
+        
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.executescript(_SCHEMA)
+        self._reader = self._connect()
+        self._reader_lock = threading.Lock()
+        
+        # Pending changes, swapped out as a whole by flush()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._profiles: Dict[str, Tuple] = {}
+        self._patterns: Dict[Tuple[str, str], Tuple] = {}
+        self._interventions: List[Tuple] = []
+        
+        self.flushes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if flush_interval_seconds > 0:
+            self._thread = threading.Thread(target=self._run, name="profile-store", daemon=True)
+            self._thread.start()
+        
+        logger.info(f"SQLiteProfileStore at {self.db_path} (flush every {flush_interval_seconds}s)")
+    
+    @classmethod
+    def from_config(cls, config) -> 'SQLiteProfileStore':
+        """Create a store from the ``memory.user_profile`` settings."""
+        return cls(
+            db_path=config.get('memory.user_profile.db_path', './data/profiles/profiles.db'),
+            flush_interval_seconds=config.get('memory.session.save_interval_seconds', 60),
+            max_interventions=config.get('memory.user_profile.max_interventions', 100)
+        )
+    
+    @classmethod
+    def shared(cls, config) -> 'SQLiteProfileStore':
+        """Get the worker-wide store."""
+        if cls._shared is None:
+            cls._shared = cls.from_config(config)
+        return cls._shared
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")  # Durable at checkpoints; safe with WAL
+        return conn
+    
+    def _run(self):
+        """Background thread: flush on the interval until closed."""
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Profile store flush failed: {e}")
+    
+    # Buffered writes
+    
+    def put_profile(
+        self,
+        user_id: str,
+        preferences: Dict,
+        created_at: datetime,
+        last_session: Optional[datetime],
+        total_sessions: int
+    ):
+        """Buffer an upsert of the profile row."""
+        row = (
+            user_id,
+            json.dumps(preferences),
+            created_at.isoformat(),
+            last_session.isoformat() if last_session else None,
+            total_sessions
+        )
+        with self._lock:
+            self._profiles[user_id] = row
+    
+    def put_pattern(
+        self,
+        user_id: str,
+        pattern_type: str,
+        description: str,
+        frequency: int,
+        last_seen: datetime
+    ):
+        """Buffer an upsert of one learned pattern."""
+        with self._lock:
+            self._patterns[(user_id, pattern_type)] = (
+                user_id, pattern_type, description, frequency, last_seen.isoformat()
+            )
+    
+    def add_intervention(
+        self,
+        user_id: str,
+        timestamp: datetime,
+        intervention_type: str,
+        effective: Optional[bool]
+    ):
+        """Buffer one intervention record."""
+        with self._lock:
+            self._interventions.append((
+                user_id,
+                timestamp.isoformat(),
+                intervention_type,
+                None if effective is None else int(effective)
+            ))
+    
+    def pending(self) -> int:
+        """Number of buffered changes."""
+        with self._lock:
+            return len(self._profiles) + len(self._patterns) + len(self._interventions)
+    
+    def flush(self, user_id: Optional[str] = None) -> int:
+        """
+        Write buffered changes in one transaction.
+        
+        Args:
+            user_id: Only write this user's changes (default: everyone's)
+        
+        Returns:
+            Number of changes written
+        """
+        with self._flush_lock:
+            with self._lock:
+                if user_id is None:
+                    profiles, self._profiles = self._profiles, {}
+                    patterns, self._patterns = self._patterns, {}
+                    interventions, self._interventions = self._interventions, []
+                else:
+                    profiles = {user_id: self._profiles.pop(user_id)} if user_id in self._profiles else {}
+                    patterns = {key: self._patterns.pop(key) for key in list(self._patterns) if key[0] == user_id}
+                    interventions = [row for row in self._interventions if row[0] == user_id]
+                    self._interventions = [row for row in self._interventions if row[0] != user_id]
+            
+            count = len(profiles) + len(patterns) + len(interventions)
+            if not count:
+                return 0
+            
+            conn = self._writer
+            try:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "INSERT INTO profiles VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET preferences=excluded.preferences, "
+                    "last_session=excluded.last_session, total_sessions=excluded.total_sessions",
+                    profiles.values()
+                )
+                conn.executemany(
+                    "INSERT INTO patterns VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(user_id, pattern_type) DO UPDATE SET description=excluded.description, "
+                    "frequency=excluded.frequency, last_seen=excluded.last_seen",
+                    patterns.values()
+                )
+                conn.executemany(
+                    "INSERT INTO interventions (user_id, timestamp, type, effective) VALUES (?, ?, ?, ?)",
+                    interventions
+                )
+                # Trim intervention history of the users just written
+                conn.executemany(
+                    "DELETE FROM interventions WHERE user_id = ? AND id <= "
+                    "(SELECT id FROM interventions WHERE user_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    [(user_id, user_id, self.max_interventions) for user_id in {row[0] for row in interventions}]
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                # Put the changes back (newer buffered rows win)
+                with self._lock:
+                    self._profiles = {**profiles, **self._profiles}
+                    self._patterns = {**patterns, **self._patterns}
+                    self._interventions = interventions + self._interventions
+                raise
+            
+            self.flushes += 1
+            logger.debug(f"Profile store flushed {count} changes")
+            return count
+    
+    # Reads
+    
+    def load_profile(self, user_id: str) -> Optional[Dict]:
+        """
+        Load one user's profile.
+        
+        Returns:
+            Dict with preferences, created_at, last_session,
+            total_sessions, emotional_patterns and intervention_history
+            (timestamps as datetimes), or None if the user is unknown
+        """
+        self.flush(user_id)
+        
+        with self._reader_lock:
+            row = self._reader.execute(
+                "SELECT preferences, created_at, last_session, total_sessions FROM profiles WHERE user_id = ?",
+                (user_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            patterns = self._reader.execute(
+                "SELECT pattern_type, description, frequency, last_seen FROM patterns WHERE user_id = ?",
+                (user_id,)
+            ).fetchall()
+            interventions = self._reader.execute(
+                "SELECT timestamp, type, effective FROM interventions WHERE user_id = ? "
+                "ORDER BY id DESC LIMIT ?",
+                (user_id, self.max_interventions)
+            ).fetchall()
+        
+        preferences, created_at, last_session, total_sessions = row
+        return {
+            'preferences': json.loads(preferences),
+            'created_at': datetime.fromisoformat(created_at),
+            'last_session': datetime.fromisoformat(last_session) if last_session else None,
+            'total_sessions': total_sessions,
+            'emotional_patterns': [
+                {
+                    'pattern_type': pattern_type,
+                    'description': description,
+                    'frequency': frequency,
+                    'last_seen': datetime.fromisoformat(last_seen)
+                }
+                for pattern_type, description, frequency, last_seen in patterns
+            ],
+            'intervention_history': [
+                {
+                    'timestamp': datetime.fromisoformat(timestamp),
+                    'type': intervention_type,
+                    'effective': None if effective is None else bool(effective)
+                }
+                for timestamp, intervention_type, effective in reversed(interventions)
+            ]
+        }
+    
+    def close(self):
+        """Stop the flush thread, write pending changes and close the database."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        try:
+            self.flush()
+        finally:
+            self._writer.close()
+            self._reader.close()
+        if SQLiteProfileStore._shared is self:
+            SQLiteProfileStore._shared = None
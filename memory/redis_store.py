@@ -0,0 +1,538 @@
+"""Redis storage backend for sessions and user profiles.
+
+Writes are queued in process and sent by a background thread as one
+pipelined MULTI/EXEC per flush, over a shared connection pool, so the
+per-frame timeline appends never wait on a network round trip.
+Snapshots are also pre-aggregated into per-minute rollup hashes before
+they are sent; a windowed summary is then a range lookup of bucket keys
+plus one pipelined read of those buckets, however many snapshots the
+window holds.
+
+Key layout (``{p}`` is the key prefix)::
+    
+    {p}:profile:{user}                  hash   preferences, created_at, ...
+    {p}:profile:{user}:patterns         hash   pattern_type -> JSON
+    {p}:profile:{user}:interventions    list   JSON records (trimmed)
+    {p}:session:{id}                    hash   user_id, persona, start_time
+    {p}:session:{id}:snapshots          list   recent raw snapshots (trimmed)
+    {p}:session:{id}:events             list   events and interventions
+    {p}:session:{id}:buckets            zset   rollup bucket starts
+    {p}:session:{id}:rollup:{start}     hash   n, valence, arousal, authenticity, e:{label}
+"""
+
+import json
+import time
+import threading
+import numpy as np
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+from .storage import ProfileStore, SessionStore
+from .emotion_timeline import valence_trend
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize datetimes and NumPy scalars in stored records."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+class RedisStore(ProfileStore, SessionStore):
+    """
+    Redis-backed session and profile storage with write-behind pipelining.
+    
+    Reads flush the queue first, so they see every earlier write from
+    this process. While Redis is unreachable, failed batches are kept
+    for the next flush up to ``max_queued`` changes and dropped beyond
+    that, and the flush thread backs off.
+    """
+    
+    _shared: Optional['RedisStore'] = None
+    _connect_failed: Optional[Tuple[float, Exception]] = None  # (monotonic time, error)
+    
+    def __init__(
+        self,
+        host: str = 'localhost',
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        key_prefix: str = 'empathy',
+        max_connections: int = 32,
+        socket_timeout: float = 2.0,
+        flush_interval_seconds: float = 1.0,
+        max_pending: int = 512,
+        max_queued: int = 100000,
+        max_backoff_seconds: float = 30.0,
+        rollup_seconds: int = 60,
+        max_snapshots: int = 1000,
+        max_interventions: int = 100,
+        session_ttl_seconds: int = 86400,
+        profile_ttl_seconds: Optional[int] = None
+    ):
+        """
+        Initialize Redis store.
+        
+        Args:
+            host: Redis host
+            port: Redis port
+            db: Redis database number
+            password: Redis password (None for no auth)
+            key_prefix: Prefix of every key
+            max_connections: Connection pool size
+            socket_timeout: Connect/read timeout in seconds
+            flush_interval_seconds: Write-behind interval (0 = flush only on request)
+            max_pending: Queued changes that trigger an early flush
+            max_queued: Queued changes kept across failed flushes (older batches are dropped)
+            max_backoff_seconds: Longest wait between flush retries while Redis fails
+            rollup_seconds: Width of the timeline rollup buckets
+            max_snapshots: Raw snapshots kept per session
+            max_interventions: Intervention records kept per user
+            session_ttl_seconds: Expiry of session keys after the last write
+            profile_ttl_seconds: Expiry of profile keys after the last write (None = never)
+        """
+        if not REDIS_AVAILABLE:
+            raise ImportError("redis not installed. Install with: pip install redis")
+        
+        self.pool = redis.ConnectionPool(
+            host=host,
+            port=port,
+            db=db,
+            password=password,
+            max_connections=max_connections,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_timeout,
+            decode_responses=True
+        )
+        self.client = redis.Redis(connection_pool=self.pool)
+        self.client.ping()  # Fail fast if the server is unreachable
+        
+        self.prefix = key_prefix
+        self.flush_interval = flush_interval_seconds
+        self.max_pending = max_pending
+        self.max_queued = max_queued
+        self.max_backoff = max_backoff_seconds
+        self.rollup_seconds = rollup_seconds
+        self.max_snapshots = max_snapshots
+        self.max_interventions = max_interventions
+        self.session_ttl = session_ttl_seconds
+        self.profile_ttl = profile_ttl_seconds
+        
+        # Queued changes, swapped out as a whole by flush()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._commands: List[Tuple[str, tuple, Dict]] = []
+        self._rollups: Dict[Tuple[str, int], Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._sessions: set = set()  # Sessions written since the last flush
+        self._users: set = set()
+        
+        self.flushes = 0
+        self.dropped = 0  # Changes lost to failed flushes
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if flush_interval_seconds > 0:
+            self._thread = threading.Thread(target=self._run, name="redis-store", daemon=True)
+            self._thread.start()
+        
+        logger.info(f"RedisStore connected to {host}:{port}/{db} (flush every {flush_interval_seconds}s)")
+    
+    @classmethod
+    def from_config(cls, config) -> 'RedisStore':
+        """Create a store from the ``memory.storage.redis`` settings."""
+        password = config.get('memory.storage.redis.password')
+        if not password or password.startswith('${'):
+            password = None  # Unset environment variable
+        retention_days = config.get('memory.user_profile.retention_days')
+        
+        return cls(
+            host=config.get('memory.storage.redis.host', 'localhost'),
+            port=config.get('memory.storage.redis.port', 6379),
+            db=config.get('memory.storage.redis.db', 0),
+            password=password,
+            key_prefix=config.get('memory.storage.redis.key_prefix', 'empathy'),
+            max_connections=config.get('memory.storage.redis.max_connections', 32),
+            flush_interval_seconds=config.get('memory.storage.redis.flush_interval_seconds', 1.0),
+            max_snapshots=config.get('memory.session.timeline_capacity', 1000),
+            max_interventions=config.get('memory.user_profile.max_interventions', 100),
+            session_ttl_seconds=int(config.get('memory.storage.redis.session_ttl_hours', 24) * 3600),
+            profile_ttl_seconds=int(retention_days * 86400) if retention_days else None
+        )
+    
+    @classmethod
+    def shared(cls, config) -> 'RedisStore':
+        """
+        Get the worker-wide store.
+        
+        A failed connect is remembered for
+        ``memory.storage.redis.retry_seconds``, so sessions started in
+        the meantime fail at once instead of each waiting out a connect
+        timeout.
+        """
+        if cls._shared is None:
+            if cls._connect_failed is not None:
+                failed_at, error = cls._connect_failed
+                retry_seconds = config.get('memory.storage.redis.retry_seconds', 30)
+                if time.monotonic() - failed_at < retry_seconds:
+                    raise ConnectionError(f"Redis unreachable, next attempt within {retry_seconds}s ({error})")
+            try:
+                cls._shared = cls.from_config(config)
+            except Exception as e:
+                cls._connect_failed = (time.monotonic(), e)
+                raise
+            cls._connect_failed = None
+        return cls._shared
+    
+    def _key(self, *parts: Any) -> str:
+        return ':'.join([self.prefix, *map(str, parts)])
+    
+    def _queue(self, command: str, *args, **kwargs):
+        with self._lock:
+            self._commands.append((command, args, kwargs))
+            full = len(self._commands) >= self.max_pending
+        if full:
+            self._wake.set()
+    
+    def _run(self):
+        """Background thread: flush on the interval (or when the queue fills) until closed."""
+        failures = 0
+        while not self._stop.is_set():
+            if failures:
+                # Back off while Redis fails; a full queue must not turn into a retry loop
+                self._stop.wait(min(self.flush_interval * 2 ** failures, self.max_backoff))
+            else:
+                self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                logger.error(f"Redis store flush failed ({failures} in a row): {e}")
+    
+    def _flush_for_read(self):
+        """Flush before a read; on failure the changes stay queued and the read goes ahead."""
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning(f"Redis store flush before read failed: {e}")
+    
+    # Profiles
+    
+    def put_profile(
+        self,
+        user_id: str,
+        preferences: Dict,
+        created_at: datetime,
+        last_session: Optional[datetime],
+        total_sessions: int
+    ):
+        key = self._key('profile', user_id)
+        self._queue('hsetnx', key, 'created_at', created_at.isoformat())
+        self._queue('hset', key, mapping={
+            'preferences': json.dumps(preferences),
+            'last_session': last_session.isoformat() if last_session else '',
+            'total_sessions': total_sessions
+        })
+        with self._lock:
+            self._users.add(user_id)
+    
+    def put_pattern(
+        self,
+        user_id: str,
+        pattern_type: str,
+        description: str,
+        frequency: int,
+        last_seen: datetime
+    ):
+        record = {'description': description, 'frequency': frequency, 'last_seen': last_seen.isoformat()}
+        self._queue('hset', self._key('profile', user_id, 'patterns'), pattern_type, json.dumps(record))
+        with self._lock:
+            self._users.add(user_id)
+    
+    def add_intervention(
+        self,
+        user_id: str,
+        timestamp: datetime,
+        intervention_type: str,
+        effective: Optional[bool]
+    ):
+        record = {'timestamp': timestamp.isoformat(), 'type': intervention_type, 'effective': effective}
+        self._queue('rpush', self._key('profile', user_id, 'interventions'), json.dumps(record))
+        with self._lock:
+            self._users.add(user_id)
+    
+    def load_profile(self, user_id: str) -> Optional[Dict]:
+        self._flush_for_read()
+        
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(self._key('profile', user_id))
+        pipe.hgetall(self._key('profile', user_id, 'patterns'))
+        pipe.lrange(self._key('profile', user_id, 'interventions'), -self.max_interventions, -1)
+        profile, patterns, interventions = pipe.execute()
+        
+        if not profile:
+            return None
+        
+        history = []
+        for item in interventions:
+            record = json.loads(item)
+            record['timestamp'] = datetime.fromisoformat(record['timestamp'])
+            history.append(record)
+        
+        return {
+            'preferences': json.loads(profile.get('preferences', '{}')),
+            'created_at': datetime.fromisoformat(profile['created_at']),
+            'last_session': datetime.fromisoformat(profile['last_session']) if profile.get('last_session') else None,
+            'total_sessions': int(profile.get('total_sessions', 0)),
+            'emotional_patterns': [
+                {
+                    'pattern_type': pattern_type,
+                    'description': record['description'],
+                    'frequency': record['frequency'],
+                    'last_seen': datetime.fromisoformat(record['last_seen'])
+                }
+                for pattern_type, record in ((t, json.loads(r)) for t, r in patterns.items())
+            ],
+            'intervention_history': history
+        }
+    
+    # Sessions
+    
+    def put_session(self, session_id: str, user_id: str, persona: str, start_time: datetime):
+        self._queue('hset', self._key('session', session_id), mapping={
+            'user_id': user_id,
+            'persona': persona,
+            'start_time': start_time.isoformat()
+        })
+        with self._lock:
+            self._sessions.add(session_id)
+    
+    def append_snapshot(
+        self,
+        session_id: str,
+        timestamp: float,
+        emotion: str,
+        valence: float,
+        arousal: float,
+        authenticity: float
+    ):
+        packed = json.dumps([timestamp, emotion, float(valence), float(arousal), float(authenticity)])
+        bucket = int(timestamp // self.rollup_seconds) * self.rollup_seconds
+        
+        with self._lock:
+            self._commands.append(('rpush', (self._key('session', session_id, 'snapshots'), packed), {}))
+            rollup = self._rollups[(session_id, bucket)]
+            rollup['n'] += 1
+            rollup['valence'] += valence
+            rollup['arousal'] += arousal
+            rollup['authenticity'] += authenticity
+            rollup[f'e:{emotion}'] += 1
+            self._sessions.add(session_id)
+            full = len(self._commands) >= self.max_pending
+        if full:
+            self._wake.set()
+    
+    def add_event(self, session_id: str, kind: str, record: Dict):
+        packed = json.dumps({'kind': kind, 'record': record}, default=_json_default)
+        self._queue('rpush', self._key('session', session_id, 'events'), packed)
+        with self._lock:
+            self._sessions.add(session_id)
+    
+    def load_session(self, session_id: str) -> Optional[Dict]:
+        self._flush_for_read()
+        
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(self._key('session', session_id))
+        pipe.lrange(self._key('session', session_id, 'snapshots'), 0, -1)
+        pipe.lrange(self._key('session', session_id, 'events'), 0, -1)
+        meta, snapshots, events = pipe.execute()
+        
+        if not meta:
+            return None
+        
+        stored = {'event': [], 'intervention': []}
+        for item in events:
+            entry = json.loads(item)
+            record = entry['record']
+            if 'timestamp' in record:
+                record['timestamp'] = datetime.fromisoformat(record['timestamp'])
+            stored.setdefault(entry['kind'], []).append(record)
+        
+        return {
+            'user_id': meta.get('user_id'),
+            'persona': meta.get('persona', 'remote_worker'),
+            'start_time': datetime.fromisoformat(meta['start_time']),
+            'snapshots': [tuple(json.loads(item)) for item in snapshots],
+            'events': stored['event'],
+            'interventions': stored['intervention']
+        }
+    
+    def session_summary(self, session_id: str, since: float) -> Optional[Dict]:
+        """
+        Emotional summary from the rollup buckets.
+        
+        Buckets overlapping ``since`` are included whole, so the window
+        start is rounded down to the bucket width.
+        """
+        self._flush_for_read()
+        
+        starts = self.client.zrangebyscore(
+            self._key('session', session_id, 'buckets'), since - self.rollup_seconds, '+inf'
+        )
+        starts = sorted(int(s) for s in starts if int(s) + self.rollup_seconds > since)
+        if not starts:
+            return None
+        
+        pipe = self.client.pipeline(transaction=False)
+        for start in starts:
+            pipe.hgetall(self._key('session', session_id, 'rollup', start))
+        buckets = [(start, rollup) for start, rollup in zip(starts, pipe.execute()) if rollup]
+        if not buckets:
+            return None
+        
+        n = valence = arousal = 0.0
+        labels: Dict[str, float] = defaultdict(float)
+        for _, rollup in buckets:
+            n += float(rollup.get('n', 0))
+            valence += float(rollup.get('valence', 0))
+            arousal += float(rollup.get('arousal', 0))
+            for field, count in rollup.items():
+                if field.startswith('e:'):
+                    labels[field[2:]] += float(count)
+        if not n:
+            return None
+        
+        # Trend: mean valence of the later half of the window against the earlier half
+        trend = 'stable'
+        mid = (buckets[0][0] + buckets[-1][0]) / 2
+        early = [r for s, r in buckets if s < mid]
+        late = [r for s, r in buckets if s >= mid]
+        if n >= 3 and early and late:
+            def mean_valence(rollups):
+                return sum(float(r['valence']) for r in rollups) / sum(float(r['n']) for r in rollups)
+            trend = valence_trend(mean_valence(early), mean_valence(late))
+        
+        return {
+            'dominant_emotion': max(labels, key=labels.get),
+            'avg_valence': valence / n,
+            'avg_arousal': arousal / n,
+            'trend': trend,
+            'num_snapshots': int(n)
+        }
+    
+    def delete_session(self, session_id: str):
+        """Remove a stored session."""
+        self.flush()
+        keys = [self._key('session', session_id, suffix) for suffix in ('snapshots', 'events', 'buckets')]
+        starts = self.client.zrange(keys[-1], 0, -1)
+        self.client.delete(
+            self._key('session', session_id),
+            *keys,
+            *(self._key('session', session_id, 'rollup', start) for start in starts)
+        )
+    
+    # Writing
+    
+    def pending(self) -> int:
+        """Number of queued changes."""
+        with self._lock:
+            return len(self._commands) + len(self._rollups)
+    
+    def flush(self) -> int:
+        """
+        Send all queued changes as one pipelined transaction.
+        
+        Returns:
+            Number of changes written
+        """
+        with self._flush_lock:
+            with self._lock:
+                commands, self._commands = self._commands, []
+                rollups = self._rollups
+                self._rollups = defaultdict(lambda: defaultdict(float))
+                sessions, self._sessions = self._sessions, set()
+                users, self._users = self._users, set()
+            
+            count = len(commands) + len(rollups)
+            if not count:
+                return 0
+            
+            pipe = self.client.pipeline(transaction=True)
+            for command, args, kwargs in commands:
+                getattr(pipe, command)(*args, **kwargs)
+            
+            for (session_id, start), fields in rollups.items():
+                key = self._key('session', session_id, 'rollup', start)
+                for field, amount in fields.items():
+                    if field == 'n' or field.startswith('e:'):
+                        pipe.hincrby(key, field, int(amount))
+                    else:
+                        pipe.hincrbyfloat(key, field, amount)
+                pipe.expire(key, self.session_ttl)
+                pipe.zadd(self._key('session', session_id, 'buckets'), {str(start): start})
+            
+            for session_id in sessions:
+                pipe.ltrim(self._key('session', session_id, 'snapshots'), -self.max_snapshots, -1)
+                for suffix in (None, 'snapshots', 'events', 'buckets'):
+                    parts = ('session', session_id) + ((suffix,) if suffix else ())
+                    pipe.expire(self._key(*parts), self.session_ttl)
+            
+            for user_id in users:
+                pipe.ltrim(self._key('profile', user_id, 'interventions'), -self.max_interventions, -1)
+                if self.profile_ttl:
+                    for suffix in (None, 'patterns', 'interventions'):
+                        parts = ('profile', user_id) + ((suffix,) if suffix else ())
+                        pipe.expire(self._key(*parts), self.profile_ttl)
+            
+            try:
+                pipe.execute()
+            except (redis.ConnectionError, redis.TimeoutError):
+                # Requeue (the transaction was not applied) ahead of newer
+                # changes, unless that would exceed max_queued
+                with self._lock:
+                    if count + len(self._commands) + len(self._rollups) > self.max_queued:
+                        self.dropped += count
+                        logger.warning(f"Redis store dropped {count} queued changes ({self.dropped} in total)")
+                    else:
+                        self._commands = commands + self._commands
+                        for key, fields in rollups.items():
+                            for field, amount in fields.items():
+                                self._rollups[key][field] += amount
+                        self._sessions |= sessions
+                        self._users |= users
+                raise
+            except Exception:
+                # Not retried: the server rejected the batch, or EXEC
+                # applied every command but the failing ones
+                self.dropped += count
+                raise
+            
+            self.flushes += 1
+            logger.debug(f"Redis store flushed {count} changes")
+            return count
+    
+    def close(self):
+        """Stop the flush thread, send queued changes and release the pool."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Redis store closed with {self.pending()} unsent changes: {e}")
+        finally:
+            self.pool.disconnect()
+        if RedisStore._shared is self:
+            RedisStore._shared = None
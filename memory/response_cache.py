@@ -0,0 +1,276 @@
+"""Cache of synthesized intervention responses.
+
+Proactive interventions depend on a small, discrete set of inputs
+(persona, intervention type, coarse mood and time of day), so their
+text and audio can be reused instead of running the LLM and TTS again.
+"""
+
+import json
+import time
+import hashlib
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+
+
+@dataclass
+class CachedResponse:
+    """Synthesized response stored in the cache."""
+    text: str
+    audio: np.ndarray
+    created_at: float  # time.time() when generated
+    uses: int = 0
+
+
+class InterventionResponseCache:
+    """
+    Emotion-bucketed cache of intervention text and audio.
+    
+    Each key holds up to ``variants_per_key`` different responses. Until
+    a key is full, lookups miss so that fresh variants get generated;
+    after that variants are served in rotation to avoid repetition.
+    Variants expire after ``ttl_seconds``, and the least recently used
+    keys are evicted beyond ``max_entries`` variants in total.
+    
+    Keys do not include the user, so one cache is shared by all
+    sessions of a worker (see ``shared``). Cached responses must
+    therefore be generated from prompts without conversation history
+    (``PromptBuilder.build_prompt(..., include_history=False)``).
+    """
+    
+    _shared: Optional['InterventionResponseCache'] = None
+    
+    def __init__(
+        self,
+        variants_per_key: int = 3,
+        ttl_seconds: float = 86400.0,
+        max_entries: int = 512,
+        storage_path: Optional[str] = None
+    ):
+        """
+        Initialize response cache.
+        
+        Args:
+            variants_per_key: Responses kept (and rotated) per key
+            ttl_seconds: Age after which a response is discarded
+            max_entries: Maximum responses across all keys
+            storage_path: Directory to persist the cache (memory only if None)
+        """
+        self.variants_per_key = variants_per_key
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.storage_dir = Path(storage_path) if storage_path else None
+        
+        self._entries: "OrderedDict[str, List[CachedResponse]]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        
+        if self.storage_dir:
+            self.load()
+        
+        logger.info(
+            f"InterventionResponseCache initialized (variants={variants_per_key}, "
+            f"ttl={ttl_seconds}s, max_entries={max_entries})"
+        )
+    
+    @classmethod
+    def from_config(cls, config) -> 'InterventionResponseCache':
+        """Create a cache from the ``intervention.response_cache`` settings."""
+        return cls(
+            variants_per_key=config.get('intervention.response_cache.variants_per_key', 3),
+            ttl_seconds=config.get('intervention.response_cache.ttl_seconds', 86400),
+            max_entries=config.get('intervention.response_cache.max_entries', 512),
+            storage_path=config.get('intervention.response_cache.storage_path')
+        )
+    
+    @classmethod
+    def shared(cls, config) -> 'InterventionResponseCache':
+        """Get the worker-wide cache."""
+        if cls._shared is None:
+            cls._shared = cls.from_config(config)
+        return cls._shared
+    
+    @staticmethod
+    def make_key(
+        persona: str,
+        intervention_type: str,
+        valence: float,
+        arousal: float,
+        time_of_day: Optional[datetime] = None
+    ) -> str:
+        """
+        Build a cache key from coarse buckets of the request inputs.
+        
+        Bands use the same thresholds as the prompt's emotion and time
+        context. The key says nothing about the user or the conversation,
+        so only history-free prompts may be cached under it.
+        """
+        if valence < -0.3:
+            valence_band = 'negative'
+        elif valence > 0.3:
+            valence_band = 'positive'
+        else:
+            valence_band = 'neutral'
+        
+        if arousal > 0.7:
+            arousal_band = 'high'
+        elif arousal < 0.3:
+            arousal_band = 'low'
+        else:
+            arousal_band = 'medium'
+        
+        hour = (time_of_day or datetime.now()).hour
+        if 5 <= hour < 12:
+            time_bucket = 'morning'
+        elif 12 <= hour < 17:
+            time_bucket = 'afternoon'
+        elif 17 <= hour < 21:
+            time_bucket = 'evening'
+        else:
+            time_bucket = 'night'
+        
+        return "|".join((persona, intervention_type, valence_band, arousal_band, time_bucket))
+    
+    def _expire(self, key: str, now: float) -> List[CachedResponse]:
+        """Drop expired variants of a key."""
+        variants = self._entries.get(key, [])
+        fresh = [v for v in variants if now - v.created_at < self.ttl_seconds]
+        if len(fresh) == len(variants):
+            return variants
+        
+        self._size -= len(variants) - len(fresh)
+        if fresh:
+            self._entries[key] = fresh
+        else:
+            del self._entries[key]
+        return fresh
+    
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Get the next response for a key.
+        
+        Returns:
+            Least recently served variant, or None if the key does not
+            yet hold ``variants_per_key`` variants
+        """
+        variants = self._expire(key, time.time())
+        if len(variants) < self.variants_per_key:
+            self.misses += 1
+            return None
+        
+        # Rotate: serve the first variant, then move it to the back
+        response = variants.pop(0)
+        variants.append(response)
+        response.uses += 1
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+    
+    def put(self, key: str, text: str, audio: np.ndarray):
+        """Add a freshly generated response for a key."""
+        if not text:
+            return
+        
+        variants = self._expire(key, time.time())
+        if any(v.text == text for v in variants):
+            return  # Not a new variant
+        
+        if len(variants) >= self.variants_per_key:
+            variants.pop(0)
+            self._size -= 1
+        
+        variants.append(CachedResponse(text=text, audio=np.asarray(audio, dtype=np.float32),
+                                       created_at=time.time()))
+        self._entries[key] = variants
+        self._entries.move_to_end(key)
+        self._size += 1
+        
+        # Evict least recently used keys
+        while self._size > self.max_entries and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+    
+    def clear(self):
+        """Remove all cached responses."""
+        self._entries.clear()
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def get_stats(self) -> Dict:
+        """Get hit/miss counters and size."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'keys': len(self._entries),
+            'entries': self._size
+        }
+    
+    def save(self):
+        """Save cache to disk."""
+        if not self.storage_dir:
+            logger.warning("No storage path configured, cannot save")
+            return
+        
+        try:
+            self.storage_dir.mkdir(parents=True, exist_ok=True)
+            index = []
+            for key, variants in self._entries.items():
+                for variant in variants:
+                    digest = hashlib.sha1(f"{key}|{variant.text}".encode('utf-8')).hexdigest()
+                    audio_file = f"{digest}.npy"
+                    np.save(self.storage_dir / audio_file, variant.audio)
+                    index.append({
+                        'key': key,
+                        'text': variant.text,
+                        'created_at': variant.created_at,
+                        'audio_file': audio_file
+                    })
+            
+            with open(self.storage_dir / 'index.json', 'w') as f:
+                json.dump(index, f, indent=2)
+            
+            # Remove audio of evicted responses
+            kept = {entry['audio_file'] for entry in index}
+            for path in self.storage_dir.glob('*.npy'):
+                if path.name not in kept:
+                    path.unlink()
+            
+            logger.info(f"Response cache saved ({self._size} entries)")
+        
+        except Exception as e:
+            logger.error(f"Failed to save response cache: {e}")
+    
+    def load(self):
+        """Load cache from disk."""
+        index_path = self.storage_dir / 'index.json' if self.storage_dir else None
+        if not index_path or not index_path.exists():
+            return
+        
+        try:
+            with open(index_path, 'r') as f:
+                index = json.load(f)
+            
+            now = time.time()
+            for entry in index:
+                if now - entry['created_at'] >= self.ttl_seconds:
+                    continue
+                variants = self._entries.setdefault(entry['key'], [])
+                variants.append(CachedResponse(
+                    text=entry['text'],
+                    audio=np.load(self.storage_dir / entry['audio_file']),
+                    created_at=entry['created_at']
+                ))
+                self._size += 1
+            
+            logger.info(f"Response cache loaded ({self._size} entries)")
+        
+        except Exception as e:
+            logger.error(f"Failed to load response cache: {e}")
+            self.clear()
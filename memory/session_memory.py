@@ -1,24 +1,16 @@
 """Session memory for tracking current conversation context.
 
-Maintains short-term emotional timeline and conversation state.
+Maintains short-term emotional timeline and conversation state,
+optionally mirrored to a session store so that it survives restarts.
 """
 
-from typing import Dict, List, Optional, Deque
-from collections import deque
+import time
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from dataclasses import dataclass
 from loguru import logger
 
-
-@dataclass
-class EmotionalSnapshot:
-    """Single point in emotional timeline."""
-    timestamp: datetime
-    emotion: str
-    valence: float
-    arousal: float
-    authenticity: float
-    context: str  # What triggered this emotion
+from .emotion_timeline import EmotionTimeline, EmotionalSnapshot
+from .storage import SessionStore
 
 
 class SessionMemory:
@@ -32,17 +24,23 @@ class SessionMemory:
     def __init__(
         self,
         max_duration_hours: int = 8,
-        timeline_capacity: int = 1000
+        timeline_capacity: int = 1000,
+        spill_dir: Optional[str] = None,
+        store: Optional[SessionStore] = None
     ):
         """
         Initialize session memory.
         
         Args:
             max_duration_hours: Maximum session duration
-            timeline_capacity: Maximum timeline snapshots to keep
+            timeline_capacity: Maximum raw timeline snapshots to keep
+            spill_dir: Directory for memory-mapped timeline rollups (memory if None)
+            store: Session store that every change is handed to
         """
         self.max_duration = timedelta(hours=max_duration_hours)
         self.timeline_capacity = timeline_capacity
+        self.store = store
+        self.resumed_at: Optional[float] = None  # When a stored session was resumed
         
         # Session metadata
         self.session_id: Optional[str] = None
@@ -50,8 +48,12 @@ class SessionMemory:
         self.start_time: Optional[datetime] = None
         self.persona: str = 'remote_worker'
         
-        # Emotional timeline
-        self.emotional_timeline: Deque[EmotionalSnapshot] = deque(maxlen=timeline_capacity)
+        # Emotional timeline (recent raw snapshots plus whole-session rollups)
+        self.emotional_timeline = EmotionTimeline(
+            capacity=timeline_capacity,
+            max_duration_seconds=max_duration_hours * 3600,
+            spill_dir=spill_dir
+        )
         
         # Significant events
         self.significant_events: List[Dict] = []
@@ -67,14 +69,39 @@ class SessionMemory:
         user_id: str,
         persona: str = 'remote_worker'
     ):
-        """Start a new session."""
+        """Start a new session (or resume it from the store)."""
         self.session_id = session_id
         self.user_id = user_id
         self.start_time = datetime.now()
         self.persona = persona
+        self.resumed_at = None
+        
+        if self.store is not None:
+            try:
+                stored = self.store.load_session(session_id)
+            except Exception as e:
+                logger.error(f"Failed to load session {session_id}: {e}")
+                stored = None
+            
+            if stored is not None and stored['user_id'] == user_id:
+                self._resume(stored)
+                return
+            self.store.put_session(session_id, user_id, persona, self.start_time)
         
         logger.info(f"Session {session_id} started for user {user_id} with persona '{persona}'")
     
+    def _resume(self, stored: Dict):
+        """Restore a stored session (recent snapshots, events, interventions)."""
+        self.start_time = stored['start_time']
+        self.persona = stored['persona']
+        for snapshot in stored['snapshots']:
+            self.emotional_timeline.append(*snapshot)
+        self.significant_events = stored['events']
+        self.interventions = stored['interventions']
+        self.resumed_at = time.time()
+        
+        logger.info(f"Session {self.session_id} resumed with {len(stored['snapshots'])} snapshots")
+    
     def add_emotional_snapshot(
         self,
         emotion: str,
@@ -93,33 +120,28 @@ class SessionMemory:
             authenticity: Authenticity score
             context: What triggered this state
         """
-        snapshot = EmotionalSnapshot(
-            timestamp=datetime.now(),
-            emotion=emotion,
-            valence=valence,
-            arousal=arousal,
-            authenticity=authenticity,
-            context=context
-        )
-        
-        self.emotional_timeline.append(snapshot)
+        prev = self.emotional_timeline.latest()
+        timestamp = time.time()
+        self.emotional_timeline.append(timestamp, emotion, valence, arousal, authenticity, context)
+        if self.store is not None and self.session_id:
+            self.store.append_snapshot(self.session_id, timestamp, emotion, valence, arousal, authenticity)
         
         # Detect significant changes
-        if len(self.emotional_timeline) >= 2:
-            prev = self.emotional_timeline[-2]
+        if prev is not None:
+            prev_valence, _, prev_authenticity = prev
             
             # Significant valence shift
-            if abs(snapshot.valence - prev.valence) > 0.5:
+            if abs(valence - prev_valence) > 0.5:
                 self.record_event(
                     'emotional_shift',
-                    f"Valence shifted from {prev.valence:.2f} to {snapshot.valence:.2f}"
+                    f"Valence shifted from {prev_valence:.2f} to {valence:.2f}"
                 )
             
             # Emotional masking detected
-            if snapshot.authenticity < 0.5 and prev.authenticity >= 0.5:
+            if authenticity < 0.5 and prev_authenticity >= 0.5:
                 self.record_event(
                     'masking_detected',
-                    f"User may be hiding emotions ({snapshot.emotion})"
+                    f"User may be hiding emotions ({emotion})"
                 )
     
     def record_event(self, event_type: str, description: str, metadata: Optional[Dict] = None):
@@ -132,6 +154,8 @@ class SessionMemory:
         }
         
         self.significant_events.append(event)
+        if self.store is not None and self.session_id:
+            self.store.add_event(self.session_id, 'event', event)
         logger.info(f"Event recorded: {event_type} - {description}")
     
     def record_intervention(
@@ -149,6 +173,8 @@ class SessionMemory:
         }
         
         self.interventions.append(intervention)
+        if self.store is not None and self.session_id:
+            self.store.add_event(self.session_id, 'intervention', intervention)
         logger.info(f"Intervention recorded: {intervention_type}")
     
     def get_emotional_summary(self, window_minutes: int = 30) -> Dict:
@@ -161,7 +187,23 @@ class SessionMemory:
         Returns:
             Summary statistics
         """
-        if not self.emotional_timeline:
+        since = time.time() - window_minutes * 60
+        
+        # A resumed session only has its recent snapshots locally; the
+        # store's rollups cover the rest of the window
+        summary = None
+        if self.store is not None and self.resumed_at is not None and since < self.resumed_at:
+            try:
+                summary = self.store.session_summary(self.session_id, since)
+            except Exception as e:
+                logger.error(f"Failed to read session summary: {e}")
+        
+        # Binary search for the window start plus prefix-sum differences;
+        # falls back to the last 10 snapshots if the window is empty
+        if summary is None:
+            summary = self.emotional_timeline.summary(since, fallback_count=10)
+        
+        if summary is None:
             return {
                 'dominant_emotion': 'unknown',
                 'avg_valence': 0.0,
@@ -169,42 +211,7 @@ class SessionMemory:
                 'trend': 'stable'
             }
         
-        # Filter to time window
-        cutoff = datetime.now() - timedelta(minutes=window_minutes)
-        recent = [s for s in self.emotional_timeline if s.timestamp >= cutoff]
-        
-        if not recent:
-            recent = list(self.emotional_timeline)[-10:]  # Fallback to last 10
-        
-        # Calculate statistics
-        from collections import Counter
-        emotion_counts = Counter(s.emotion for s in recent)
-        dominant_emotion = emotion_counts.most_common(1)[0][0]
-        
-        avg_valence = sum(s.valence for s in recent) / len(recent)
-        avg_arousal = sum(s.arousal for s in recent) / len(recent)
-        
-        # Determine trend (simple)
-        if len(recent) >= 3:
-            early_valence = sum(s.valence for s in recent[:len(recent)//2]) / (len(recent)//2)
-            late_valence = sum(s.valence for s in recent[len(recent)//2:]) / (len(recent) - len(recent)//2)
-            
-            if late_valence > early_valence + 0.2:
-                trend = 'improving'
-            elif late_valence < early_valence - 0.2:
-                trend = 'declining'
-            else:
-                trend = 'stable'
-        else:
-            trend = 'stable'
-        
-        return {
-            'dominant_emotion': dominant_emotion,
-            'avg_valence': avg_valence,
-            'avg_arousal': avg_arousal,
-            'trend': trend,
-            'num_snapshots': len(recent)
-        }
+        return summary
     
     def get_recent_events(self, count: int = 5) -> List[Dict]:
         """Get most recent significant events."""
@@ -220,13 +227,22 @@ class SessionMemory:
         """Check if session should end based on duration."""
         return self.get_session_duration() >= self.max_duration
     
+    def flush(self):
+        """Write the store's pending changes."""
+        if self.store is not None:
+            try:
+                self.store.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush session store: {e}")
+    
     def clear(self):
-        """Clear session memory."""
+        """Clear session memory (the stored session is kept until it expires)."""
         self.emotional_timeline.clear()
         self.significant_events.clear()
         self.interventions.clear()
         self.session_id = None
         self.user_id = None
         self.start_time = None
+        self.resumed_at = None
         
         logger.info("Session memory cleared")
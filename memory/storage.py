@@ -0,0 +1,168 @@
+"""Storage backends for session memory and user profiles.
+
+SessionMemory and UserProfile keep their working state in process and
+hand every change to a backend, which batches the writes. Backends
+implement ``ProfileStore`` and/or ``SessionStore``; the factories below
+pick the configured one.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Optional
+from loguru import logger
+
+
+class ProfileStore(ABC):
+    """Persistent user profiles (preferences, patterns, interventions)."""
+    
+    @abstractmethod
+    def put_profile(
+        self,
+        user_id: str,
+        preferences: Dict,
+        created_at: datetime,
+        last_session: Optional[datetime],
+        total_sessions: int
+    ):
+        """Queue an upsert of the profile fields."""
+        pass
+    
+    @abstractmethod
+    def put_pattern(
+        self,
+        user_id: str,
+        pattern_type: str,
+        description: str,
+        frequency: int,
+        last_seen: datetime
+    ):
+        """Queue an upsert of one learned pattern."""
+        pass
+    
+    @abstractmethod
+    def add_intervention(
+        self,
+        user_id: str,
+        timestamp: datetime,
+        intervention_type: str,
+        effective: Optional[bool]
+    ):
+        """Queue one intervention record."""
+        pass
+    
+    @abstractmethod
+    def load_profile(self, user_id: str) -> Optional[Dict]:
+        """
+        Load one user's profile.
+        
+        Returns:
+            Dict with preferences, created_at, last_session,
+            total_sessions, emotional_patterns and intervention_history,
+            or None if the user is unknown
+        """
+        pass
+    
+    @abstractmethod
+    def flush(self) -> int:
+        """Write queued changes; returns how many were written."""
+        pass
+    
+    @abstractmethod
+    def close(self):
+        """Write queued changes and release connections."""
+        pass
+
+
+class SessionStore(ABC):
+    """Persistent session state (metadata, emotional timeline, events)."""
+    
+    @abstractmethod
+    def put_session(self, session_id: str, user_id: str, persona: str, start_time: datetime):
+        """Queue the session metadata."""
+        pass
+    
+    @abstractmethod
+    def append_snapshot(
+        self,
+        session_id: str,
+        timestamp: float,
+        emotion: str,
+        valence: float,
+        arousal: float,
+        authenticity: float
+    ):
+        """Queue one emotional snapshot."""
+        pass
+    
+    @abstractmethod
+    def add_event(self, session_id: str, kind: str, record: Dict):
+        """Queue a significant event or intervention (``kind``)."""
+        pass
+    
+    @abstractmethod
+    def load_session(self, session_id: str) -> Optional[Dict]:
+        """
+        Load a stored session.
+        
+        Returns:
+            Dict with user_id, persona, start_time, snapshots (recent
+            (timestamp, emotion, valence, arousal, authenticity) tuples),
+            events and interventions, or None if unknown
+        """
+        pass
+    
+    @abstractmethod
+    def session_summary(self, session_id: str, since: float) -> Optional[Dict]:
+        """Emotional summary of the snapshots at or after ``since``."""
+        pass
+    
+    @abstractmethod
+    def flush(self) -> int:
+        """Write queued changes; returns how many were written."""
+        pass
+    
+    @abstractmethod
+    def close(self):
+        """Write queued changes and release connections."""
+        pass
+
+
+def profile_store_from_config(config) -> Optional[ProfileStore]:
+    """
+    Get the worker-wide profile store selected by ``memory.user_profile.backend``.
+    
+    Returns:
+        The store, or None for per-user JSON files (also used when the
+        backend is unavailable)
+    """
+    backend = config.get('memory.user_profile.backend', 'json')
+    try:
+        if backend == 'sqlite':
+            from .profile_store import SQLiteProfileStore
+            return SQLiteProfileStore.shared(config)
+        if backend == 'redis':
+            from .redis_store import RedisStore
+            return RedisStore.shared(config)
+    except Exception as e:
+        logger.warning(f"Profile backend '{backend}' unavailable ({e}), using JSON files")
+    return None
+
+
+def session_store_from_config(config) -> Optional[SessionStore]:
+    """
+    Get the worker-wide session store selected by ``memory.storage.type``.
+    
+    Returns:
+        The store, or None to keep sessions in process only (also used
+        when the backend is unavailable)
+    """
+    backend = config.get('memory.storage.type', 'memory')
+    if backend == 'redis':
+        try:
+            from .redis_store import RedisStore
+            return RedisStore.shared(config)
+        except Exception as e:
+            logger.warning(f"Redis unavailable ({e}), keeping sessions in process")
+    elif backend != 'memory':
+        logger.warning(f"Session storage '{backend}' not supported, keeping sessions in process")
+    return None
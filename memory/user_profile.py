@@ -1,6 +1,7 @@
 """User profile storage for long-term preferences and patterns.
 
-Maintains persistent user data across sessions.
+Maintains persistent user data across sessions, either in a profile
+store (incremental, write-behind) or as one JSON file per user.
 """
 
 from typing import Dict, List, Optional
@@ -10,6 +11,8 @@ import json
 from pathlib import Path
 from loguru import logger
 
+from .storage import ProfileStore
+
 
 @dataclass
 class UserPreferences:
@@ -36,21 +39,29 @@ class UserProfile:
     
     Stores preferences, intervention history, and
     emotional patterns across sessions.
+    
+    Stored data is loaded on first access. With a ``store``, every
+    change is handed to the store as it happens (the store batches the
+    writes); otherwise ``save`` writes the whole profile as JSON.
     """
     
     def __init__(
         self,
         user_id: str,
-        storage_path: Optional[str] = None
+        storage_path: Optional[str] = None,
+        store: Optional[ProfileStore] = None
     ):
         """
         Initialize user profile.
         
         Args:
             user_id: Unique user identifier
-            storage_path: Directory to store profiles
+            storage_path: Directory of JSON profiles (imported into
+                ``store`` on first load when one is given)
+            store: Profile store for incremental persistence
         """
         self.user_id = user_id
+        self.store = store
         
         # Storage
         if storage_path:
@@ -61,23 +72,106 @@ class UserProfile:
             self.storage_dir = None
             self.profile_path = None
         
-        # User data
-        self.preferences = UserPreferences()
-        self.created_at: datetime = datetime.now()
-        self.last_session: Optional[datetime] = None
-        self.total_sessions: int = 0
+        # User data (populated by _ensure_loaded)
+        self._loaded = False
+        self._preferences = UserPreferences()
+        self._created_at: datetime = datetime.now()
+        self._last_session: Optional[datetime] = None
+        self._total_sessions: int = 0
         
         # Learned patterns
-        self.emotional_patterns: List[EmotionalPattern] = []
+        self._emotional_patterns: List[EmotionalPattern] = []
         
         # Intervention history
-        self.intervention_history: List[Dict] = []
+        self._intervention_history: List[Dict] = []
+    
+    def _ensure_loaded(self):
+        """Load stored data on first access."""
+        if self._loaded:
+            return
+        self._loaded = True
         
-        # Load existing profile if available
-        if self.profile_path and self.profile_path.exists():
+        if self.store is not None:
+            try:
+                data = self.store.load_profile(self.user_id)
+            except Exception as e:
+                logger.error(f"Failed to load profile: {e}")
+                return
+            if data is not None:
+                self._apply(data)
+                logger.info(f"Profile loaded for user {self.user_id}")
+                return
+            if self.profile_path and self.profile_path.exists():
+                # Import the JSON profile into the store
+                self.load()
+                self._store_all()
+                return
+        elif self.profile_path and self.profile_path.exists():
             self.load()
-        else:
-            logger.info(f"Created new user profile for {user_id}")
+            return
+        
+        logger.info(f"Created new user profile for {self.user_id}")
+    
+    @property
+    def preferences(self) -> UserPreferences:
+        self._ensure_loaded()
+        return self._preferences
+    
+    @property
+    def created_at(self) -> datetime:
+        self._ensure_loaded()
+        return self._created_at
+    
+    @property
+    def last_session(self) -> Optional[datetime]:
+        self._ensure_loaded()
+        return self._last_session
+    
+    @property
+    def total_sessions(self) -> int:
+        self._ensure_loaded()
+        return self._total_sessions
+    
+    @property
+    def emotional_patterns(self) -> List[EmotionalPattern]:
+        self._ensure_loaded()
+        return self._emotional_patterns
+    
+    @property
+    def intervention_history(self) -> List[Dict]:
+        self._ensure_loaded()
+        return self._intervention_history
+    
+    def _store_profile(self):
+        """Hand the profile row to the store."""
+        if self.store is not None:
+            self.store.put_profile(
+                self.user_id,
+                asdict(self._preferences),
+                self._created_at,
+                self._last_session,
+                self._total_sessions
+            )
+    
+    def _store_pattern(self, pattern: EmotionalPattern):
+        if self.store is not None:
+            self.store.put_pattern(
+                self.user_id,
+                pattern.pattern_type,
+                pattern.description,
+                pattern.frequency,
+                pattern.last_seen
+            )
+    
+    def _store_all(self):
+        """Hand the whole profile to the store."""
+        if self.store is None:
+            return
+        self._store_profile()
+        for pattern in self._emotional_patterns:
+            self._store_pattern(pattern)
+        for record in self._intervention_history:
+            self.store.add_intervention(self.user_id, record['timestamp'], record['type'], record['effective'])
     
     def update_preferences(self, **kwargs):
         """Update user preferences."""
@@ -85,11 +179,14 @@ class UserProfile:
             if hasattr(self.preferences, key):
                 setattr(self.preferences, key, value)
                 logger.info(f"Updated preference {key} = {value}")
+        self._store_profile()
     
     def record_session_start(self):
         """Record that a new session started."""
-        self.last_session = datetime.now()
-        self.total_sessions += 1
+        self._ensure_loaded()
+        self._last_session = datetime.now()
+        self._total_sessions += 1
+        self._store_profile()
     
     def record_intervention(
         self,
@@ -110,10 +207,12 @@ class UserProfile:
         }
         
         self.intervention_history.append(record)
+        if self.store is not None:
+            self.store.add_intervention(self.user_id, record['timestamp'], intervention_type, was_effective)
         
         # Keep only last 100
-        if len(self.intervention_history) > 100:
-            self.intervention_history = self.intervention_history[-100:]
+        if len(self._intervention_history) > 100:
+            self._intervention_history = self._intervention_history[-100:]
     
     def learn_pattern(
         self,
@@ -133,6 +232,7 @@ class UserProfile:
                 # Update existing
                 pattern.frequency += 1
                 pattern.last_seen = datetime.now()
+                self._store_pattern(pattern)
                 logger.info(f"Updated pattern '{pattern_type}' (seen {pattern.frequency} times)")
                 return
         
@@ -144,6 +244,7 @@ class UserProfile:
             last_seen=datetime.now()
         )
         self.emotional_patterns.append(pattern)
+        self._store_pattern(pattern)
         logger.info(f"Learned new pattern: {pattern_type}")
     
     def get_intervention_effectiveness(
@@ -205,7 +306,14 @@ class UserProfile:
         return random.random() < base_probability
     
     def save(self):
-        """Save profile to disk."""
+        """Save profile to disk (with a store: write its pending changes)."""
+        if self.store is not None:
+            try:
+                self.store.flush()
+            except Exception as e:
+                logger.error(f"Failed to save profile: {e}")
+            return
+        
         if not self.profile_path:
             logger.warning("No storage path configured, cannot save")
             return
@@ -253,37 +361,49 @@ class UserProfile:
             with open(self.profile_path, 'r') as f:
                 data = json.load(f)
             
-            # Load preferences
-            pref_data = data.get('preferences', {})
-            self.preferences = UserPreferences(**pref_data)
-            
-            # Load metadata
-            self.created_at = datetime.fromisoformat(data['created_at'])
-            self.last_session = datetime.fromisoformat(data['last_session']) if data.get('last_session') else None
-            self.total_sessions = data.get('total_sessions', 0)
-            
-            # Load patterns
-            self.emotional_patterns = [
-                EmotionalPattern(
-                    pattern_type=p['pattern_type'],
-                    description=p['description'],
-                    frequency=p['frequency'],
-                    last_seen=datetime.fromisoformat(p['last_seen'])
-                )
-                for p in data.get('emotional_patterns', [])
-            ]
-            
-            # Load intervention history
-            self.intervention_history = [
-                {
-                    'timestamp': datetime.fromisoformat(i['timestamp']),
-                    'type': i['type'],
-                    'effective': i.get('effective')
-                }
-                for i in data.get('intervention_history', [])
-            ]
+            data['created_at'] = datetime.fromisoformat(data['created_at'])
+            data['last_session'] = datetime.fromisoformat(data['last_session']) if data.get('last_session') else None
+            for p in data.get('emotional_patterns', []):
+                p['last_seen'] = datetime.fromisoformat(p['last_seen'])
+            for i in data.get('intervention_history', []):
+                i['timestamp'] = datetime.fromisoformat(i['timestamp'])
             
+            self._apply(data)
             logger.info(f"Profile loaded for user {self.user_id}")
             
         except Exception as e:
             logger.error(f"Failed to load profile: {e}")
+    
+    def _apply(self, data: Dict):
+        """Set profile fields from loaded data (timestamps as datetimes)."""
+        self._loaded = True
+        
+        # Load preferences
+        pref_data = data.get('preferences', {})
+        self._preferences = UserPreferences(**pref_data)
+        
+        # Load metadata
+        self._created_at = data['created_at']
+        self._last_session = data.get('last_session')
+        self._total_sessions = data.get('total_sessions', 0)
+        
+        # Load patterns
+        self._emotional_patterns = [
+            EmotionalPattern(
+                pattern_type=p['pattern_type'],
+                description=p['description'],
+                frequency=p['frequency'],
+                last_seen=p['last_seen']
+            )
+            for p in data.get('emotional_patterns', [])
+        ]
+        
+        # Load intervention history
+        self._intervention_history = [
+            {
+                'timestamp': i['timestamp'],
+                'type': i['type'],
+                'effective': i.get('effective')
+            }
+            for i in data.get('intervention_history', [])
+        ]
@@ -5,6 +5,7 @@ from .stt import SenseVoiceSTT, MockSTT
 from .prosody import ProsodyAnalyzer, MockProsodyAnalyzer
 from .event_detector import AudioEventDetector, MockEventDetector, AudioEvent
 from .audio_pipeline import AudioPipeline
+from models.results import AudioState, AudioResult
 
 __all__ = [
     'SileroVAD',
@@ -16,5 +17,7 @@ __all__ = [
     'AudioEventDetector',
     'MockEventDetector',
     'AudioEvent',
-    'AudioPipeline'
+    'AudioPipeline',
+    'AudioState',
+    'AudioResult'
 ]
@@ -15,6 +15,7 @@ from .stt import SenseVoiceSTT, MockSTT
 from .prosody import ProsodyAnalyzer, MockProsodyAnalyzer
 from .event_detector import AudioEventDetector, MockEventDetector
 from utils.helpers import timeit, LatencyTracker
+from models.results import AudioState, AudioResult
 
 
 class AudioPipeline:
@@ -156,7 +157,7 @@ class AudioPipeline:
         self, 
         audio_chunk: np.ndarray, 
         timestamp: Optional[float] = None
-    ) -> Dict[str, any]:
+    ) -> AudioResult:
         """
         Process a single audio chunk through all audio models.
         
@@ -165,7 +166,7 @@ class AudioPipeline:
             timestamp: Audio timestamp in seconds
             
         Returns:
-            Dictionary containing:
+            AudioResult (dict-compatible) containing:
             - vad: Voice activity detection result
             - transcription: Speech-to-text result (if speech ended)
             - prosody: Paralinguistic features
@@ -225,14 +226,14 @@ class AudioPipeline:
             processing_time = (time.perf_counter() - start_time) * 1000
             self.latency_tracker.record('audio_pipeline', processing_time)
             
-            return {
-                'vad': vad_result,
-                'transcription': transcription_result,
-                'prosody': prosody_result,
-                'events': events_result,
-                'audio_state': audio_state,
-                'processing_time_ms': processing_time
-            }
+            return AudioResult(
+                vad=vad_result,
+                prosody=prosody_result,
+                events=events_result,
+                audio_state=audio_state,
+                transcription=transcription_result,
+                processing_time_ms=processing_time
+            )
             
         except Exception as e:
             logger.error(f"Error in audio pipeline: {e}")
@@ -264,7 +265,7 @@ class AudioPipeline:
         transcription: Optional[Dict],
         prosody: Dict,
         events: Dict
-    ) -> Dict:
+    ) -> AudioState:
         """
         Aggregate audio results into unified emotional state.
         
@@ -283,7 +284,7 @@ class AudioPipeline:
         silence_duration = events.get('silence_duration', 0.0)
         
         # Adjust based on events
-        event_types = [e.event_type for e in detected_events]
+        event_types = tuple(e.event_type for e in detected_events)
         
         if 'sigh' in event_types:
             valence -= 0.2  # Sighs indicate frustration/relief
@@ -313,18 +314,18 @@ class AudioPipeline:
             arousal, valence, tremor, detected_events, is_silence
         )
         
-        return {
-            'is_speaking': is_speaking,
-            'transcribed_text': transcribed_text,
-            'arousal': arousal,
-            'valence': valence,
-            'tremor': tremor,
-            'audio_emotion': audio_emotion,
-            'detected_events': event_types,
-            'is_silence': is_silence,
-            'silence_duration': silence_duration,
-            'emotional_masking': emotional_masking
-        }
+        return AudioState(
+            is_speaking=is_speaking,
+            transcribed_text=transcribed_text,
+            arousal=arousal,
+            valence=valence,
+            tremor=tremor,
+            audio_emotion=audio_emotion,
+            detected_events=event_types,
+            is_silence=is_silence,
+            silence_duration=silence_duration,
+            emotional_masking=emotional_masking
+        )
     
     def _classify_audio_state(
         self,
@@ -366,20 +367,14 @@ class AudioPipeline:
         else:
             return 'neutral'
     
-    def _empty_result(self) -> Dict:
+    def _empty_result(self) -> AudioResult:
         """Return empty result for errors."""
-        return {
-            'vad': {'is_speech': False},
-            'transcription': None,
-            'prosody': {},
-            'events': {'events': []},
-            'audio_state': {
-                'audio_emotion': 'unknown',
-                'arousal': 0.5,
-                'valence': 0.0
-            },
-            'processing_time_ms': 0.0
-        }
+        return AudioResult(
+            vad={'is_speech': False},
+            prosody={},
+            events={'events': []},
+            audio_state=AudioState()
+        )
     
     def get_latency_stats(self) -> Dict:
         """Get latency statistics for the pipeline."""
@@ -16,7 +16,7 @@ from loguru import logger
 from utils.helpers import timeit
 
 
-@dataclass
+@dataclass(slots=True)
 class AudioEvent:
     """Container for detected audio event."""
     event_type: str  # 'sigh', 'breath', 'silence', 'noise'
@@ -7,6 +7,8 @@ from .fusion_transformer import (
     FusedEmotion
 )
 from .temporal_smoother import TemporalSmoother, SmoothedEmotion
+from .smoother_bank import TemporalSmootherBank
+from .fusion_scheduler import FusionScheduler, AlignedInputs
 
 __all__ = [
     'MultimodalFusionTransformer',
@@ -14,5 +16,8 @@ __all__ = [
     'MockFusionEngine',
     'FusedEmotion',
     'TemporalSmoother',
-    'SmoothedEmotion'
+    'SmoothedEmotion',
+    'TemporalSmootherBank',
+    'FusionScheduler',
+    'AlignedInputs'
 ]
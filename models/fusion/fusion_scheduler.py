@@ -0,0 +1,214 @@
+"""Timestamp-aligned fusion scheduling.
+
+Buffers timestamped outputs from the video and audio pipelines in a
+small jitter buffer and releases time-aligned input pairs for fusion
+at a fixed rate, independent of the pipelines' frame rates.
+"""
+
+import numpy as np
+from typing import Dict, Optional, Deque, Tuple
+from collections import deque
+from dataclasses import dataclass
+from loguru import logger
+
+
+@dataclass
+class AlignedInputs:
+    """Time-aligned visual and audio states ready for fusion."""
+    timestamp: float  # Target time the states were aligned to
+    visual_state: Dict
+    audio_state: Dict
+    visual_staleness: float  # Seconds since the newest visual sample used
+    audio_staleness: float  # Seconds since the newest audio sample used
+    visual_stale: bool  # True if visual exceeded max_staleness
+    audio_stale: bool  # True if audio exceeded max_staleness
+
+
+class _ModalityBuffer:
+    """Jitter buffer for one modality's timestamped states."""
+    
+    def __init__(self, capacity: int):
+        self.samples: Deque[Tuple[float, Dict]] = deque(maxlen=capacity)
+        self.received = 0  # Total samples pushed (detects new input)
+    
+    def push(self, timestamp: float, state: Dict):
+        # Drop out-of-order samples older than the newest one
+        if self.samples and timestamp < self.samples[-1][0]:
+            return
+        self.samples.append((timestamp, state))
+        self.received += 1
+    
+    @property
+    def latest_timestamp(self) -> Optional[float]:
+        return self.samples[-1][0] if self.samples else None
+    
+    def sample(self, t: float) -> Tuple[Optional[Dict], float]:
+        """
+        Get the state at time ``t``.
+        
+        Numeric fields are linearly interpolated between the samples
+        bracketing ``t``; other fields come from the sample at or before
+        ``t``. Past the newest sample, the newest state is held.
+        
+        Returns:
+            (state, staleness in seconds) or (None, inf) if empty
+        """
+        if not self.samples:
+            return None, float('inf')
+        
+        before = None
+        after = None
+        for ts, state in reversed(self.samples):
+            if ts <= t:
+                before = (ts, state)
+                break
+            after = (ts, state)
+        
+        if before is None:
+            # Target precedes everything buffered: use the oldest sample
+            ts, state = after
+            return state, 0.0
+        
+        if after is None:
+            ts, state = before
+            return state, t - ts
+        
+        (t0, s0), (t1, s1) = before, after
+        weight = (t - t0) / (t1 - t0) if t1 > t0 else 0.0
+        state = dict(s0)
+        for key, v0 in s0.items():
+            v1 = s1.get(key)
+            if isinstance(v0, (float, np.floating)) and isinstance(v1, (float, np.floating)):
+                state[key] = v0 + (v1 - v0) * weight
+        return state, 0.0
+    
+    def clear(self):
+        self.samples.clear()
+        self.received = 0
+
+
+class FusionScheduler:
+    """
+    Schedules multimodal fusion at a fixed rate on aligned inputs.
+    
+    Pipelines push timestamped states as they produce them; ``poll``
+    returns at most one AlignedInputs per fusion period, aligned to
+    ``now - jitter_delay`` so that late-arriving samples of the slower
+    modality can still be interpolated. Nothing is returned when no
+    new input arrived since the previous fusion.
+    """
+    
+    def __init__(
+        self,
+        rate_hz: float = 10.0,
+        jitter_delay_ms: float = 100.0,
+        max_staleness_ms: float = 1000.0,
+        buffer_size: int = 32
+    ):
+        """
+        Initialize fusion scheduler.
+        
+        Args:
+            rate_hz: Maximum fusion rate
+            jitter_delay_ms: How far behind the newest input to align
+            max_staleness_ms: Age beyond which a modality is treated as missing
+            buffer_size: Samples kept per modality
+        """
+        self.period = 1.0 / rate_hz
+        self.jitter_delay = jitter_delay_ms / 1000.0
+        self.max_staleness = max_staleness_ms / 1000.0
+        
+        self.visual = _ModalityBuffer(buffer_size)
+        self.audio = _ModalityBuffer(buffer_size)
+        
+        self.last_fusion_time: Optional[float] = None
+        self._last_received = (0, 0)
+        
+        # Counters
+        self.fusions = 0
+        self.skipped_not_due = 0
+        self.skipped_no_input = 0
+        
+        logger.info(
+            f"FusionScheduler initialized (rate={rate_hz}Hz, "
+            f"jitter_delay={jitter_delay_ms}ms, max_staleness={max_staleness_ms}ms)"
+        )
+    
+    def push_visual(self, visual_state: Dict, timestamp: float):
+        """Buffer a visual state produced at ``timestamp``."""
+        self.visual.push(timestamp, visual_state)
+    
+    def push_audio(self, audio_state: Dict, timestamp: float):
+        """Buffer an audio state produced at ``timestamp``."""
+        self.audio.push(timestamp, audio_state)
+    
+    def _clock(self) -> Optional[float]:
+        """Newest timestamp seen on either modality."""
+        stamps = [
+            ts for ts in (self.visual.latest_timestamp, self.audio.latest_timestamp)
+            if ts is not None
+        ]
+        return max(stamps) if stamps else None
+    
+    def poll(self, now: Optional[float] = None) -> Optional[AlignedInputs]:
+        """
+        Get aligned inputs if a fusion is due.
+        
+        Args:
+            now: Current time on the pipelines' clock (defaults to the
+                newest buffered timestamp)
+        
+        Returns:
+            AlignedInputs, or None if not due or nothing new arrived
+        """
+        if now is None:
+            now = self._clock()
+            if now is None:
+                return None
+        
+        if self.last_fusion_time is not None and now - self.last_fusion_time < self.period:
+            self.skipped_not_due += 1
+            return None
+        
+        received = (self.visual.received, self.audio.received)
+        if received == self._last_received:
+            self.skipped_no_input += 1
+            return None
+        
+        target = now - self.jitter_delay
+        visual_state, visual_staleness = self.visual.sample(target)
+        audio_state, audio_staleness = self.audio.sample(target)
+        
+        visual_stale = visual_staleness > self.max_staleness
+        audio_stale = audio_staleness > self.max_staleness
+        
+        self.last_fusion_time = now
+        self._last_received = received
+        self.fusions += 1
+        
+        # Missing or stale modalities fall back to the extractors' defaults
+        return AlignedInputs(
+            timestamp=target,
+            visual_state={} if visual_stale else visual_state,
+            audio_state={} if audio_stale else audio_state,
+            visual_staleness=visual_staleness,
+            audio_staleness=audio_staleness,
+            visual_stale=visual_stale,
+            audio_stale=audio_stale
+        )
+    
+    def get_stats(self) -> Dict:
+        """Get scheduling counters."""
+        return {
+            'fusions': self.fusions,
+            'skipped_not_due': self.skipped_not_due,
+            'skipped_no_input': self.skipped_no_input
+        }
+    
+    def reset(self):
+        """Clear buffered inputs and scheduling state."""
+        self.visual.clear()
+        self.audio.clear()
+        self.last_fusion_time = None
+        self._last_received = (0, 0)
+        logger.debug("FusionScheduler reset")
@@ -190,7 +190,8 @@ class FusionEngine:
         self,
         model_path: Optional[str] = None,
         device: str = "cuda",
-        confidence_threshold: float = 0.6
+        confidence_threshold: float = 0.6,
+        change_tolerance: float = 1e-3
     ):
         """
         Initialize fusion engine.
@@ -199,9 +200,20 @@ class FusionEngine:
             model_path: Path to pre-trained fusion model
             device: Device to run on
             confidence_threshold: Minimum confidence for predictions
+            change_tolerance: Max absolute feature change treated as
+                "unchanged" (reuses the previous result; negative disables)
         """
         self.device = device
         self.confidence_threshold = confidence_threshold
+        self.change_tolerance = change_tolerance
+        
+        # Change tracking: skip the forward pass when features are unchanged
+        self._last_visual_features: Optional[np.ndarray] = None
+        self._last_audio_features: Optional[np.ndarray] = None
+        self._last_result: Optional[FusedEmotion] = None
+        self.last_cache_hit = False
+        self.cache_hits = 0
+        self.cache_misses = 0
         
         # Initialize model
         self.model = MultimodalFusionTransformer(
@@ -234,13 +246,23 @@ class FusionEngine:
             audio_state: Output from audio pipeline
             
         Returns:
-            FusedEmotion object with combined assessment
+            FusedEmotion object with combined assessment (the previous
+            object when the encoded features did not materially change)
         """
         try:
             # Extract features
             visual_features = self._extract_visual_features(visual_state)
             audio_features = self._extract_audio_features(audio_state)
             
+            # Reuse the last result if nothing material changed
+            if self._is_unchanged(visual_features, audio_features):
+                self.cache_hits += 1
+                self.last_cache_hit = True
+                return self._last_result
+            
+            self.cache_misses += 1
+            self.last_cache_hit = False
+            
             # Convert to tensors
             visual_tensor = torch.FloatTensor(visual_features).unsqueeze(0).to(self.device)
             audio_tensor = torch.FloatTensor(audio_features).unsqueeze(0).to(self.device)
@@ -265,7 +287,7 @@ class FusionEngine:
                 valence_val, arousal_val, dominance_val
             )
             
-            return FusedEmotion(
+            result = FusedEmotion(
                 valence=valence_val,
                 arousal=arousal_val,
                 dominance=dominance_val,
@@ -276,10 +298,43 @@ class FusionEngine:
                 audio_weight=audio_weight
             )
             
+            self._last_visual_features = visual_features
+            self._last_audio_features = audio_features
+            self._last_result = result
+            
+            return result
+            
         except Exception as e:
             logger.error(f"Error in fusion: {e}")
+            self.last_cache_hit = False
             return self._empty_fusion()
     
+    def _is_unchanged(self, visual_features: np.ndarray, audio_features: np.ndarray) -> bool:
+        """Check whether features are within tolerance of the last fused input."""
+        if self._last_result is None or self.change_tolerance < 0:
+            return False
+        
+        return (
+            np.max(np.abs(visual_features - self._last_visual_features)) <= self.change_tolerance and
+            np.max(np.abs(audio_features - self._last_audio_features)) <= self.change_tolerance
+        )
+    
+    def get_cache_stats(self) -> Dict:
+        """Get change-tracking hit/miss counters."""
+        total = self.cache_hits + self.cache_misses
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_rate': self.cache_hits / total if total else 0.0
+        }
+    
+    def reset_cache(self):
+        """Forget the last fused input so the next call runs the model."""
+        self._last_visual_features = None
+        self._last_audio_features = None
+        self._last_result = None
+        self.last_cache_hit = False
+    
     def _extract_visual_features(self, visual_state: Dict) -> np.ndarray:
         """Extract feature vector from visual state."""
         features = np.zeros(16, dtype=np.float32)
@@ -0,0 +1,408 @@
+"""Vectorized temporal smoothing for many concurrent sessions.
+
+Keeps the state of N per-session smoothers as NumPy arrays
+(struct-of-arrays) so that a multi-tenant worker can smooth every
+session that received a fused result in a single array operation.
+Agents hand their results to ``submit``; everything submitted in one
+event-loop iteration (e.g. a worker gathering every session's fusion
+for a tick) is smoothed by one ``smooth_batch`` call.
+"""
+
+import asyncio
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+from loguru import logger
+
+from .fusion_transformer import FusedEmotion, FusionEngine
+from .temporal_smoother import SmoothedEmotion
+
+
+class TemporalSmootherBank:
+    """
+    Struct-of-arrays bank of temporal smoothers.
+    
+    Each session occupies one row of the state arrays. Semantics match
+    ``TemporalSmoother`` in EMA mode: EMA of valence/arousal/dominance,
+    majority emotion over the window (ties go to the most recently seen
+    label), variance-based stability and a least-squares valence trend.
+    Window variances are kept with Welford updates, as in
+    ``TemporalSmoother``, rather than as sums of squares.
+    """
+    
+    _shared: Dict[Tuple[int, float], 'TemporalSmootherBank'] = {}
+    
+    def __init__(
+        self,
+        window_size: int = 30,
+        alpha: float = 0.3,
+        trend_window: int = 10,
+        labels: Optional[Sequence[str]] = None,
+        initial_capacity: int = 64
+    ):
+        """
+        Initialize smoother bank.
+        
+        Args:
+            window_size: Number of past predictions to consider
+            alpha: EMA smoothing factor (0=smooth, 1=responsive)
+            trend_window: Number of recent valence values for trend detection
+            labels: Emotion vocabulary (unlisted labels map to 'unknown')
+            initial_capacity: Number of session rows to preallocate
+        """
+        self.window_size = window_size
+        self.alpha = alpha
+        self.trend_window = min(trend_window, window_size)
+        
+        self.labels: List[str] = list(labels or FusionEngine.EMOTIONS)
+        if 'unknown' not in self.labels:
+            self.labels.append('unknown')
+        self._label_codes = {label: i for i, label in enumerate(self.labels)}
+        self._unknown_code = self._label_codes['unknown']
+        
+        # Session id -> row
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self.capacity = 0
+        self._allocate(initial_capacity)
+        
+        # Results submitted during the current event-loop iteration
+        self._pending: List[Tuple[str, FusedEmotion, asyncio.Future]] = []
+        
+        # Constants for the least-squares slope over a full trend window
+        n = self.trend_window
+        self._sum_x = n * (n - 1) / 2
+        self._slope_denom = n * ((n - 1) * n * (2 * n - 1) / 6) - self._sum_x ** 2
+        
+        logger.info(
+            f"TemporalSmootherBank initialized (window={window_size}, alpha={alpha}, "
+            f"capacity={initial_capacity})"
+        )
+    
+    @classmethod
+    def from_config(cls, config) -> 'TemporalSmootherBank':
+        """Create a bank from the ``models.fusion`` settings."""
+        return cls(
+            window_size=config.get('models.fusion.temporal_window', 30),
+            alpha=config.get('models.fusion.smoothing_alpha', 0.2)
+        )
+    
+    @classmethod
+    def shared(cls, config) -> 'TemporalSmootherBank':
+        """Get the worker-wide bank for the configured window and alpha."""
+        key = (
+            config.get('models.fusion.temporal_window', 30),
+            config.get('models.fusion.smoothing_alpha', 0.2)
+        )
+        bank = cls._shared.get(key)
+        if bank is None:
+            bank = cls._shared[key] = cls.from_config(config)
+        return bank
+    
+    def _allocate(self, capacity: int):
+        """Grow state arrays to ``capacity`` rows."""
+        old = self.capacity
+        w, k = self.window_size, len(self.labels)
+        
+        def grow(array: Optional[np.ndarray], shape, dtype, fill=0):
+            new = np.full(shape, fill, dtype=dtype)
+            if array is not None:
+                new[:old] = array
+            return new
+        
+        def get(name: str) -> Optional[np.ndarray]:
+            return getattr(self, name, None)
+        
+        # Per-session scalars
+        self.count = grow(get('count'), capacity, np.int32)
+        self.frames = grow(get('frames'), capacity, np.int64)
+        self.head = grow(get('head'), capacity, np.int32)
+        self.ema = grow(get('ema'), (capacity, 3), np.float64)
+        self.valence_mean = grow(get('valence_mean'), capacity, np.float64)
+        self.valence_m2 = grow(get('valence_m2'), capacity, np.float64)
+        self.arousal_mean = grow(get('arousal_mean'), capacity, np.float64)
+        self.arousal_m2 = grow(get('arousal_m2'), capacity, np.float64)
+        self.authenticity_sum = grow(get('authenticity_sum'), capacity, np.float64)
+        
+        # Ring buffers (row = session, column = window position)
+        self.valence_ring = grow(get('valence_ring'), (capacity, w), np.float64)
+        self.arousal_ring = grow(get('arousal_ring'), (capacity, w), np.float64)
+        self.authenticity_ring = grow(get('authenticity_ring'), (capacity, w), np.float64)
+        self.label_ring = grow(get('label_ring'), (capacity, w), np.int16)
+        
+        # Label histograms over the window
+        self.label_hist = grow(get('label_hist'), (capacity, k), np.int32)
+        self.label_last = grow(get('label_last'), (capacity, k), np.int64)  # Frame last seen
+        
+        self._free.extend(range(capacity - 1, old - 1, -1))
+        self.capacity = capacity
+    
+    def add_session(self, session_id: str) -> int:
+        """Assign a state row to a session (idempotent)."""
+        if session_id in self._slots:
+            return self._slots[session_id]
+        
+        if not self._free:
+            self._allocate(max(1, self.capacity * 2))
+        
+        slot = self._free.pop()
+        self._slots[session_id] = slot
+        self._clear_rows(np.array([slot]))
+        return slot
+    
+    def remove_session(self, session_id: str):
+        """Release a session's state row."""
+        slot = self._slots.pop(session_id, None)
+        if slot is not None:
+            self._free.append(slot)
+    
+    def reset_session(self, session_id: str):
+        """Reset a session's smoothing state."""
+        slot = self._slots.get(session_id)
+        if slot is not None:
+            self._clear_rows(np.array([slot]))
+    
+    def _clear_rows(self, rows: np.ndarray):
+        self.count[rows] = 0
+        self.frames[rows] = 0
+        self.head[rows] = 0
+        self.ema[rows] = 0.0
+        self.valence_mean[rows] = 0.0
+        self.valence_m2[rows] = 0.0
+        self.arousal_mean[rows] = 0.0
+        self.arousal_m2[rows] = 0.0
+        self.authenticity_sum[rows] = 0.0
+        self.valence_ring[rows] = 0.0
+        self.arousal_ring[rows] = 0.0
+        self.authenticity_ring[rows] = 0.0
+        self.label_ring[rows] = 0
+        self.label_hist[rows] = 0
+        self.label_last[rows] = 0
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._slots
+    
+    def smooth_batch(self, emotions: Dict[str, FusedEmotion]) -> Dict[str, SmoothedEmotion]:
+        """
+        Smooth one fused result for each of several sessions at once.
+        
+        Args:
+            emotions: Session id -> current fused emotion (unknown sessions
+                are added automatically)
+        
+        Returns:
+            Session id -> SmoothedEmotion
+        """
+        if not emotions:
+            return {}
+        
+        session_ids = list(emotions)
+        rows = np.fromiter(
+            (self.add_session(sid) for sid in session_ids), dtype=np.int64, count=len(session_ids)
+        )
+        fused = [emotions[sid] for sid in session_ids]
+        
+        valence = np.fromiter((e.valence for e in fused), dtype=np.float64, count=len(fused))
+        arousal = np.fromiter((e.arousal for e in fused), dtype=np.float64, count=len(fused))
+        dominance = np.fromiter((e.dominance for e in fused), dtype=np.float64, count=len(fused))
+        authenticity = np.fromiter(
+            (e.authenticity_score for e in fused), dtype=np.float64, count=len(fused)
+        )
+        confidence = np.fromiter((e.confidence for e in fused), dtype=np.float64, count=len(fused))
+        codes = np.fromiter(
+            (self._label_codes.get(e.primary_emotion, self._unknown_code) for e in fused),
+            dtype=np.int16, count=len(fused)
+        )
+        
+        self._update(rows, valence, arousal, dominance, authenticity, codes)
+        return self._views(session_ids, rows, confidence)
+    
+    def smooth(self, session_id: str, emotion: FusedEmotion) -> SmoothedEmotion:
+        """Smooth a single session's result (convenience wrapper)."""
+        return self.smooth_batch({session_id: emotion})[session_id]
+    
+    def submit(self, session_id: str, emotion: FusedEmotion) -> asyncio.Future:
+        """
+        Queue a session's result for the batch smoothed on this loop iteration.
+        
+        Must be called from the event loop. Results submitted before the
+        loop runs its next callbacks are smoothed together by one
+        ``smooth_batch`` call.
+        
+        Args:
+            session_id: Session to smooth
+            emotion: Current fused emotion
+        
+        Returns:
+            Future resolving to the session's SmoothedEmotion
+        """
+        loop = asyncio.get_running_loop()
+        if not self._pending:
+            loop.call_soon(self._smooth_pending)
+        future = loop.create_future()
+        self._pending.append((session_id, emotion, future))
+        return future
+    
+    def _smooth_pending(self):
+        """Smooth every submitted result (one batch per repeat of a session)."""
+        pending, self._pending = self._pending, []
+        while pending:
+            batch: Dict[str, Tuple[FusedEmotion, asyncio.Future]] = {}
+            later = []
+            for session_id, emotion, future in pending:
+                if session_id in batch:
+                    later.append((session_id, emotion, future))  # Keep per-session order
+                else:
+                    batch[session_id] = (emotion, future)
+            pending = later
+            
+            try:
+                results = self.smooth_batch({sid: emotion for sid, (emotion, _) in batch.items()})
+            except Exception as e:
+                for _, future in batch.values():
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for sid, (_, future) in batch.items():
+                if not future.done():
+                    future.set_result(results[sid])
+    
+    def _update(
+        self,
+        rows: np.ndarray,
+        valence: np.ndarray,
+        arousal: np.ndarray,
+        dominance: np.ndarray,
+        authenticity: np.ndarray,
+        codes: np.ndarray
+    ):
+        """Vectorized state update for ``rows``."""
+        w = self.window_size
+        head = self.head[rows]
+        full = self.count[rows] == w
+        
+        # Evict the values being overwritten in full windows
+        size = np.where(full, w, self.count[rows] + 1).astype(np.float64)
+        self._welford(self.valence_mean, self.valence_m2, rows, valence, self.valence_ring[rows, head], full, size)
+        self._welford(self.arousal_mean, self.arousal_m2, rows, arousal, self.arousal_ring[rows, head], full, size)
+        old_auth = np.where(full, self.authenticity_ring[rows, head], 0.0)
+        self.authenticity_sum[rows] += authenticity - old_auth
+        
+        full_rows = rows[full]
+        self.label_hist[full_rows, self.label_ring[full_rows, head[full]]] -= 1
+        self.label_hist[rows, codes] += 1
+        self.frames[rows] += 1
+        self.label_last[rows, codes] = self.frames[rows]
+        
+        # Write into ring buffers
+        self.valence_ring[rows, head] = valence
+        self.arousal_ring[rows, head] = arousal
+        self.authenticity_ring[rows, head] = authenticity
+        self.label_ring[rows, head] = codes
+        self.head[rows] = (head + 1) % w
+        self.count[rows] = np.minimum(self.count[rows] + 1, w)
+        
+        # EMA (first observation initializes)
+        current = np.stack([valence, arousal, dominance], axis=1)
+        first = (self.count[rows] == 1)[:, None]
+        previous = np.where(first, current, self.ema[rows])
+        self.ema[rows] = self.alpha * current + (1 - self.alpha) * previous
+    
+    @staticmethod
+    def _welford(
+        mean: np.ndarray,
+        m2: np.ndarray,
+        rows: np.ndarray,
+        value: np.ndarray,
+        evicted: np.ndarray,
+        full: np.ndarray,
+        size: np.ndarray
+    ):
+        """Windowed Welford update of ``mean``/``m2`` (``evicted`` only counts where ``full``)."""
+        old_mean = mean[rows]
+        delta = value - np.where(full, evicted, old_mean)
+        new_mean = old_mean + delta / size
+        m2[rows] += delta * (value - new_mean + np.where(full, evicted - old_mean, 0.0))
+        mean[rows] = new_mean
+    
+    def _views(
+        self,
+        session_ids: List[str],
+        rows: np.ndarray,
+        confidence: np.ndarray
+    ) -> Dict[str, SmoothedEmotion]:
+        """Build per-session SmoothedEmotion results from state arrays."""
+        count = self.count[rows].astype(np.float64)
+        
+        valence_var = np.maximum(self.valence_m2[rows], 0.0) / count
+        arousal_var = np.maximum(self.arousal_m2[rows], 0.0) / count
+        stability = 1.0 / (1.0 + (valence_var + arousal_var) / 2 * 10)
+        stability = np.where(count < 3, 0.5, np.clip(stability, 0.0, 1.0))
+        
+        slope = self._trend_slopes(rows)
+        trend_codes = np.where(slope > 0.02, 1, np.where(slope < -0.02, -1, 0))
+        trend_codes = np.where(count < self.trend_window, 0, trend_codes)
+        trend_names = {1: 'improving', -1: 'declining', 0: 'stable'}
+        
+        # Most frequent label; ties go to the one seen most recently
+        hist = self.label_hist[rows]
+        tied = hist == hist.max(axis=1, keepdims=True)
+        majority = np.where(tied, self.label_last[rows], -1).argmax(axis=1)
+        authenticity = self.authenticity_sum[rows] / count
+        ema = self.ema[rows]
+        conf = confidence * (0.5 + 0.5 * stability)
+        
+        return {
+            sid: SmoothedEmotion(
+                valence=float(ema[i, 0]),
+                arousal=float(ema[i, 1]),
+                dominance=float(ema[i, 2]),
+                primary_emotion=self.labels[majority[i]],
+                confidence=float(conf[i]),
+                authenticity_score=float(authenticity[i]),
+                emotion_stability=float(stability[i]),
+                trend=trend_names[int(trend_codes[i])]
+            )
+            for i, sid in enumerate(session_ids)
+        }
+    
+    def _trend_slopes(self, rows: np.ndarray) -> np.ndarray:
+        """Least-squares valence slope over the last ``trend_window`` values."""
+        n = self.trend_window
+        # Ring positions of the last n values, oldest first
+        offsets = np.arange(n) - n
+        positions = (self.head[rows, None] + offsets) % self.window_size
+        recent = self.valence_ring[rows[:, None], positions]
+        
+        sum_y = recent.sum(axis=1)
+        sum_xy = recent @ np.arange(n, dtype=np.float64)
+        return (n * sum_xy - self._sum_x * sum_y) / self._slope_denom
+    
+    def get_sustained_emotion(
+        self,
+        session_id: str,
+        duration_frames: int = 15
+    ) -> Optional[str]:
+        """
+        Get a session's emotion if it's been sustained for a duration.
+        
+        Args:
+            session_id: Session to query
+            duration_frames: Minimum duration in frames
+        
+        Returns:
+            Emotion if sustained (>= 80% of the last frames), None otherwise
+        """
+        slot = self._slots.get(session_id)
+        if slot is None or self.count[slot] < duration_frames:
+            return None
+        
+        positions = (self.head[slot] + np.arange(-duration_frames, 0)) % self.window_size
+        counts = np.bincount(self.label_ring[slot, positions], minlength=len(self.labels))
+        code = int(counts.argmax())
+        
+        if counts[code] >= duration_frames * 0.8:
+            return self.labels[code]
+        return None
@@ -2,6 +2,9 @@
 
 Smooths emotion predictions over time to reduce jitter
 and detect sustained emotional states.
+
+All window statistics are maintained incrementally (running sums with
+eviction), so each update costs O(1) regardless of ``window_size``.
 """
 
 import numpy as np
@@ -26,19 +29,121 @@ class SmoothedEmotion:
     trend: str  # 'improving', 'declining', 'stable'
 
 
+class _WindowedWelford:
+    """Sliding-window mean/variance using Welford updates with eviction."""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def push(self, value: float, evicted: Optional[float] = None):
+        """Add a value, replacing ``evicted`` if the window is full."""
+        if evicted is None:
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+        else:
+            old_mean = self.mean
+            self.mean += (value - evicted) / self.count
+            self.m2 += (value - evicted) * (value - self.mean + evicted - old_mean)
+    
+    @property
+    def variance(self) -> float:
+        """Population variance of the window (matches ``np.var``)."""
+        if self.count == 0:
+            return 0.0
+        return max(self.m2, 0.0) / self.count
+    
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+
+class _RunningSlope:
+    """Least-squares slope over the last ``size`` values, updated in O(1)."""
+    
+    def __init__(self, size: int):
+        self.size = size
+        self.values: Deque[float] = deque(maxlen=size)
+        self.sum_y = 0.0
+        self.sum_xy = 0.0
+    
+    def push(self, value: float):
+        n = len(self.values)
+        if n < self.size:
+            # Growing window: new value gets index n
+            self.sum_xy += n * value
+            self.sum_y += value
+        else:
+            # Sliding window: drop index 0 and shift every index down by one
+            oldest = self.values[0]
+            self.sum_xy += -(self.sum_y - oldest) + (n - 1) * value
+            self.sum_y += value - oldest
+        self.values.append(value)
+    
+    @property
+    def slope(self) -> float:
+        n = len(self.values)
+        if n < 2:
+            return 0.0
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        denom = n * sum_xx - sum_x * sum_x
+        return (n * self.sum_xy - sum_x * self.sum_y) / denom
+    
+    def reset(self):
+        self.values.clear()
+        self.sum_y = 0.0
+        self.sum_xy = 0.0
+
+
+class _ScalarKalman:
+    """1-D Kalman filter with a random-walk state model."""
+    
+    def __init__(self, process_variance: float, measurement_variance: float):
+        self.q = process_variance
+        self.r = measurement_variance
+        self.x: Optional[float] = None
+        self.p = 1.0
+    
+    def update(self, measurement: float) -> float:
+        if self.x is None:
+            self.x = measurement
+            self.p = self.r
+            return self.x
+        
+        # Predict, then correct
+        self.p += self.q
+        gain = self.p / (self.p + self.r)
+        self.x += gain * (measurement - self.x)
+        self.p *= (1 - gain)
+        return self.x
+    
+    def reset(self):
+        self.x = None
+        self.p = 1.0
+
+
 class TemporalSmoother:
     """
     Smooths emotion predictions over time.
     
-    Uses exponential moving average and trend detection
-    to produce stable, reliable emotion assessments.
+    Uses exponential moving average (or a per-dimension Kalman filter)
+    and trend detection to produce stable, reliable emotion assessments.
     """
     
     def __init__(
         self,
         window_size: int = 30,  # Number of frames to smooth over
         alpha: float = 0.3,  # EMA smoothing factor
-        stability_threshold: float = 0.1  # Variance threshold for stability
+        stability_threshold: float = 0.1,  # Variance threshold for stability
+        trend_window: int = 10,  # Frames used for trend slope
+        filter_type: str = 'ema',  # 'ema' or 'kalman'
+        process_variance: float = 1e-3,
+        measurement_variance: float = 1e-2
     ):
         """
         Initialize temporal smoother.
@@ -47,10 +152,20 @@ class TemporalSmoother:
             window_size: Number of past predictions to consider
             alpha: Smoothing factor (0=smooth, 1=responsive)
             stability_threshold: Max variance for "stable" classification
+            trend_window: Number of recent valence values for trend detection
+            filter_type: 'ema' for exponential moving average, 'kalman' for
+                a per-dimension Kalman filter
+            process_variance: Kalman process noise (how fast emotions drift)
+            measurement_variance: Kalman measurement noise (model jitter)
         """
+        if filter_type not in ('ema', 'kalman'):
+            raise ValueError(f"Unknown filter_type '{filter_type}'")
+        
         self.window_size = window_size
         self.alpha = alpha
         self.stability_threshold = stability_threshold
+        self.trend_window = trend_window
+        self.filter_type = filter_type
         
         # History buffers
         self.valence_history: Deque[float] = deque(maxlen=window_size)
@@ -59,12 +174,33 @@ class TemporalSmoother:
         self.emotion_history: Deque[str] = deque(maxlen=window_size)
         self.authenticity_history: Deque[float] = deque(maxlen=window_size)
         
+        # Running statistics over the history buffers
+        self._valence_stats = _WindowedWelford()
+        self._arousal_stats = _WindowedWelford()
+        self._authenticity_sum = 0.0
+        self._valence_slope = _RunningSlope(trend_window)
+        self._emotion_counts: Dict[str, int] = {}
+        self._emotion_last_seen: Dict[str, int] = {}  # Label -> frame number
+        self._frames = 0
+        
+        # Label counts for sub-windows queried via get_sustained_emotion
+        self._sustained_counts: Dict[int, Dict[str, int]] = {}
+        
+        # Per-dimension Kalman filters (only used when filter_type='kalman')
+        self._kalman = {
+            dim: _ScalarKalman(process_variance, measurement_variance)
+            for dim in ('valence', 'arousal', 'dominance')
+        }
+        
         # Smoothed values
         self.smoothed_valence: Optional[float] = None
         self.smoothed_arousal: Optional[float] = None
         self.smoothed_dominance: Optional[float] = None
         
-        logger.info(f"TemporalSmoother initialized (window={window_size}, alpha={alpha})")
+        logger.info(
+            f"TemporalSmoother initialized (window={window_size}, alpha={alpha}, "
+            f"filter={filter_type})"
+        )
     
     def smooth(self, emotion: FusedEmotion) -> SmoothedEmotion:
         """
@@ -76,6 +212,9 @@ class TemporalSmoother:
         Returns:
             SmoothedEmotion with temporal filtering applied
         """
+        # Update running statistics before the deques evict
+        self._update_statistics(emotion)
+        
         # Add to history
         self.valence_history.append(emotion.valence)
         self.arousal_history.append(emotion.arousal)
@@ -83,25 +222,30 @@ class TemporalSmoother:
         self.emotion_history.append(emotion.primary_emotion)
         self.authenticity_history.append(emotion.authenticity_score)
         
-        # Initialize smoothed values if first prediction
-        if self.smoothed_valence is None:
-            self.smoothed_valence = emotion.valence
-            self.smoothed_arousal = emotion.arousal
-            self.smoothed_dominance = emotion.dominance
-        
-        # Exponential moving average
-        self.smoothed_valence = (
-            self.alpha * emotion.valence + 
-            (1 - self.alpha) * self.smoothed_valence
-        )
-        self.smoothed_arousal = (
-            self.alpha * emotion.arousal + 
-            (1 - self.alpha) * self.smoothed_arousal
-        )
-        self.smoothed_dominance = (
-            self.alpha * emotion.dominance + 
-            (1 - self.alpha) * self.smoothed_dominance
-        )
+        if self.filter_type == 'kalman':
+            self.smoothed_valence = self._kalman['valence'].update(emotion.valence)
+            self.smoothed_arousal = self._kalman['arousal'].update(emotion.arousal)
+            self.smoothed_dominance = self._kalman['dominance'].update(emotion.dominance)
+        else:
+            # Initialize smoothed values if first prediction
+            if self.smoothed_valence is None:
+                self.smoothed_valence = emotion.valence
+                self.smoothed_arousal = emotion.arousal
+                self.smoothed_dominance = emotion.dominance
+            
+            # Exponential moving average
+            self.smoothed_valence = (
+                self.alpha * emotion.valence + 
+                (1 - self.alpha) * self.smoothed_valence
+            )
+            self.smoothed_arousal = (
+                self.alpha * emotion.arousal + 
+                (1 - self.alpha) * self.smoothed_arousal
+            )
+            self.smoothed_dominance = (
+                self.alpha * emotion.dominance + 
+                (1 - self.alpha) * self.smoothed_dominance
+            )
         
         # Determine primary emotion from smoothed values
         primary_emotion = self._get_majority_emotion()
@@ -113,7 +257,7 @@ class TemporalSmoother:
         trend = self._detect_trend()
         
         # Smooth authenticity
-        smoothed_authenticity = float(np.mean(self.authenticity_history))
+        smoothed_authenticity = self._authenticity_sum / len(self.authenticity_history)
         
         # Calculate confidence based on stability
         confidence = emotion.confidence * (0.5 + 0.5 * stability)
@@ -129,18 +273,57 @@ class TemporalSmoother:
             trend=trend
         )
     
+    def _update_statistics(self, emotion: FusedEmotion):
+        """Fold a new prediction into the running window statistics."""
+        full = len(self.valence_history) == self.window_size
+        
+        self._valence_stats.push(
+            emotion.valence, self.valence_history[0] if full else None
+        )
+        self._arousal_stats.push(
+            emotion.arousal, self.arousal_history[0] if full else None
+        )
+        
+        self._authenticity_sum += emotion.authenticity_score
+        if full:
+            self._authenticity_sum -= self.authenticity_history[0]
+        
+        self._valence_slope.push(emotion.valence)
+        
+        label = emotion.primary_emotion
+        if full:
+            self._decrement(self._emotion_counts, self.emotion_history[0])
+        self._emotion_counts[label] = self._emotion_counts.get(label, 0) + 1
+        self._frames += 1
+        self._emotion_last_seen[label] = self._frames
+        
+        # Sub-windows: the label leaving a window of size d is history[-d]
+        history_len = len(self.emotion_history)
+        for duration, counts in self._sustained_counts.items():
+            if history_len >= duration:
+                self._decrement(counts, self.emotion_history[-duration])
+            counts[label] = counts.get(label, 0) + 1
+    
+    @staticmethod
+    def _decrement(counts: Dict[str, int], label: str):
+        """Decrement a label count, dropping it at zero."""
+        remaining = counts[label] - 1
+        if remaining:
+            counts[label] = remaining
+        else:
+            del counts[label]
+    
     def _get_majority_emotion(self) -> str:
         """Get most common emotion in recent history."""
-        if not self.emotion_history:
+        if not self._emotion_counts:
             return 'unknown'
         
-        # Count occurrences
-        from collections import Counter
-        emotion_counts = Counter(self.emotion_history)
-        
-        # Get most common
-        most_common = emotion_counts.most_common(1)[0][0]
-        return most_common
+        # Number of distinct labels is bounded, independent of window size;
+        # ties go to the label seen most recently
+        return max(
+            self._emotion_counts,
+            key=lambda label: (self._emotion_counts[label], self._emotion_last_seen[label])
+        )
     
     def _calculate_stability(self) -> float:
         """
@@ -152,9 +335,9 @@ class TemporalSmoother:
         if len(self.valence_history) < 3:
             return 0.5
         
-        # Calculate variance of recent predictions
-        valence_var = float(np.var(self.valence_history))
-        arousal_var = float(np.var(self.arousal_history))
+        # Variance of recent predictions
+        valence_var = self._valence_stats.variance
+        arousal_var = self._arousal_stats.variance
         
         # Combine variances
         total_var = (valence_var + arousal_var) / 2
@@ -172,16 +355,11 @@ class TemporalSmoother:
         Returns:
             'improving', 'declining', or 'stable'
         """
-        if len(self.valence_history) < 10:
+        if len(self.valence_history) < self.trend_window:
             return 'stable'
         
-        # Calculate trend using linear regression on valence
-        recent_valence = list(self.valence_history)[-10:]
-        x = np.arange(len(recent_valence))
-        
-        # Simple linear fit
-        coeffs = np.polyfit(x, recent_valence, 1)
-        slope = coeffs[0]
+        # Linear regression slope on recent valence
+        slope = self._valence_slope.slope
         
         # Classify trend
         if slope > 0.02:
@@ -195,6 +373,9 @@ class TemporalSmoother:
         """
         Get emotion if it's been sustained for a duration.
         
+        The first query for a given duration seeds a label counter for that
+        window; later queries (and updates) are O(1).
+        
         Args:
             duration_frames: Minimum duration in frames
             
@@ -204,19 +385,19 @@ class TemporalSmoother:
         if len(self.emotion_history) < duration_frames:
             return None
         
-        # Check last N frames
-        recent_emotions = list(self.emotion_history)[-duration_frames:]
-        
-        # Check if all the same
-        if len(set(recent_emotions)) == 1:
-            return recent_emotions[0]
+        counts = self._sustained_counts.get(duration_frames)
+        if counts is None:
+            counts = {}
+            for i in range(len(self.emotion_history) - duration_frames, len(self.emotion_history)):
+                label = self.emotion_history[i]
+                counts[label] = counts.get(label, 0) + 1
+            self._sustained_counts[duration_frames] = counts
         
-        # Check if majority is same
-        from collections import Counter
-        counts = Counter(recent_emotions)
-        most_common_emotion, count = counts.most_common(1)[0]
+        most_common_emotion = max(counts, key=counts.get)
+        count = counts[most_common_emotion]
         
-        if count >= duration_frames * 0.8:  # 80% threshold
+        # All the same, or majority above 80% threshold
+        if count >= duration_frames * 0.8:
             return most_common_emotion
         
         return None
@@ -229,6 +410,17 @@ class TemporalSmoother:
         self.emotion_history.clear()
         self.authenticity_history.clear()
         
+        self._valence_stats.reset()
+        self._arousal_stats.reset()
+        self._authenticity_sum = 0.0
+        self._valence_slope.reset()
+        self._emotion_counts.clear()
+        self._emotion_last_seen.clear()
+        self._frames = 0
+        self._sustained_counts.clear()
+        for kalman in self._kalman.values():
+            kalman.reset()
+        
         self.smoothed_valence = None
         self.smoothed_arousal = None
         self.smoothed_dominance = None
@@ -0,0 +1,246 @@
+"""Typed result containers for the perception pipelines.
+
+Per-frame and per-chunk results are slotted dataclasses instead of
+nested dicts, so each result is one small object with no per-instance
+``__dict__``. Emotion probabilities are float32 vectors in the fixed
+``EMOTION_LABELS`` order and pose landmarks are float32 arrays.
+
+Every result still supports the mapping accessors existing callers
+use (``result['key']``, ``get``, ``in``, ``keys``, item assignment),
+and ``to_dict`` converts it back to plain dicts for serialization.
+Results are ``Mapping`` instances, not ``dict`` subclasses, so encode
+them with ``json.dumps(result.to_dict())`` or pass ``json_default`` as
+the encoder's ``default``.
+
+``dataclass(slots=True)`` requires Python 3.10 or newer.
+"""
+
+import numpy as np
+from collections.abc import Mapping as MappingABC
+from dataclasses import asdict, dataclass, fields, is_dataclass
+from functools import lru_cache
+from typing import Any, ClassVar, Dict, Iterator, List, Mapping, Optional, Tuple
+
+
+EMOTION_LABELS: Tuple[str, ...] = (
+    'angry', 'contempt', 'disgust', 'fear',
+    'happy', 'neutral', 'sad', 'surprise'
+)
+EMOTION_INDEX: Dict[str, int] = {label: i for i, label in enumerate(EMOTION_LABELS)}
+
+
+def emotion_vector(scores: Mapping[str, float], scale: float = 1.0) -> np.ndarray:
+    """
+    Convert emotion scores to a fixed-order probability vector.
+    
+    Args:
+        scores: Emotion label -> score (labels outside EMOTION_LABELS are ignored)
+        scale: Factor applied to the scores (e.g. 0.01 for percentages)
+    
+    Returns:
+        float32 vector aligned with EMOTION_LABELS
+    """
+    vector = np.zeros(len(EMOTION_LABELS), dtype=np.float32)
+    for label, score in scores.items():
+        index = EMOTION_INDEX.get(label)
+        if index is not None:
+            vector[index] = score * scale
+    return vector
+
+
+@lru_cache(maxsize=None)
+def _field_names(cls: type) -> Tuple[str, ...]:
+    return tuple(f.name for f in fields(cls)) + cls._extra_keys
+
+
+def _values_equal(a: Any, b: Any) -> bool:
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b)
+    if isinstance(a, MappingABC) and isinstance(b, MappingABC):
+        return (set(a.keys()) == set(b.keys())
+                and all(_values_equal(a[key], b[key]) for key in a.keys()))
+    return bool(a == b)
+
+
+class DictAccessMixin(MappingABC):
+    """
+    Mapping-style access to a result dataclass.
+    
+    Keys are the dataclass fields plus any computed ``_extra_keys``;
+    fields listed in ``_optional_keys`` only count as present when set.
+    Results compare equal to any mapping with the same keys and values
+    (arrays compared element-wise), so subclasses are declared with
+    ``eq=False`` to keep the dataclass ``__eq__`` from replacing this one.
+    """
+    
+    __slots__ = ()
+    
+    _extra_keys: ClassVar[Tuple[str, ...]] = ()
+    _optional_keys: ClassVar[Tuple[str, ...]] = ()
+    
+    def keys(self) -> List[str]:
+        return [key for key in _field_names(type(self)) if key in self]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+    
+    def __len__(self) -> int:
+        return len(self.keys())
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, MappingABC):
+            return NotImplemented
+        return _values_equal(self, other)
+    
+    __hash__ = None
+    
+    def __contains__(self, key: str) -> bool:
+        if key in self._optional_keys:
+            return getattr(self, key) is not None
+        return key in _field_names(type(self))
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key: str, value: Any):
+        if key not in _field_names(type(self)) or key in self._extra_keys:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self else default
+    
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, getattr(self, key)) for key in self.keys()]
+    
+    def values(self) -> List[Any]:
+        return [getattr(self, key) for key in self.keys()]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-dict copy (nested results converted, arrays as lists)."""
+        result = {}
+        for key, value in self.items():
+            if isinstance(value, DictAccessMixin):
+                value = value.to_dict()
+            elif isinstance(value, np.ndarray):
+                value = value.tolist()
+            result[key] = value
+        return result
+
+
+def json_default(obj: Any) -> Any:
+    """
+    ``default`` hook for ``json.dump``/``json.dumps``.
+    
+    Encodes results via ``to_dict``, other dataclasses (e.g. posture and
+    gaze metrics) as dicts, and numpy arrays and scalars as plain values.
+    """
+    if isinstance(obj, DictAccessMixin):
+        return obj.to_dict()
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+@dataclass(slots=True, eq=False)
+class FaceResult(DictAccessMixin):
+    """Facial expression result for one frame."""
+    face_detected: bool
+    primary_emotion: str = 'unknown'
+    confidence: float = 0.0
+    valence: float = 0.0
+    arousal: float = 0.0
+    scores: Optional[np.ndarray] = None  # float32, EMOTION_LABELS order
+    face_box: Optional[List[int]] = None  # (x, y, w, h)
+    
+    _extra_keys: ClassVar[Tuple[str, ...]] = ('emotions', 'all_emotions', 'face_bbox')
+    
+    @property
+    def emotions(self) -> Dict[str, float]:
+        """Emotion label -> probability."""
+        if self.scores is None:
+            return {}
+        return {label: float(score) for label, score in zip(EMOTION_LABELS, self.scores)}
+    
+    @property
+    def all_emotions(self) -> Dict[str, float]:
+        """Emotion label -> percentage (DeepFace convention)."""
+        return {label: score * 100.0 for label, score in self.emotions.items()}
+    
+    @property
+    def face_bbox(self) -> Optional[List[int]]:
+        return self.face_box
+
+
+@dataclass(slots=True, eq=False)
+class PostureResult(DictAccessMixin):
+    """Posture result for one frame."""
+    pose_detected: bool
+    posture_state: str = 'unknown'
+    metrics: Optional[Any] = None  # PostureMetrics
+    landmarks: Optional[np.ndarray] = None  # (33, 4) float32: x, y, z, visibility
+
+
+@dataclass(slots=True, eq=False)
+class GazeResult(DictAccessMixin):
+    """Gaze result for one frame."""
+    face_detected: bool
+    gaze_pattern: str = 'unknown'
+    metrics: Optional[Any] = None  # GazeMetrics
+
+
+@dataclass(slots=True, eq=False)
+class VisualState(DictAccessMixin):
+    """Aggregated visual emotional state."""
+    primary_emotion: str = 'unknown'
+    emotion_confidence: float = 0.0
+    posture_state: str = 'unknown'
+    gaze_pattern: str = 'unknown'
+    valence: float = 0.0
+    arousal: float = 0.0
+    overall_state: str = 'unknown'
+
+
+@dataclass(slots=True, eq=False)
+class VideoResult(DictAccessMixin):
+    """Output of VideoPipeline.process_frame."""
+    face_emotion: FaceResult
+    posture: PostureResult
+    gaze: GazeResult
+    visual_state: VisualState
+    processing_time_ms: float = 0.0
+
+
+@dataclass(slots=True, eq=False)
+class AudioState(DictAccessMixin):
+    """Aggregated audio emotional state."""
+    is_speaking: bool = False
+    transcribed_text: str = ''
+    arousal: float = 0.5
+    valence: float = 0.0
+    tremor: float = 0.0
+    audio_emotion: str = 'unknown'
+    detected_events: Tuple[str, ...] = ()
+    is_silence: bool = False
+    silence_duration: float = 0.0
+    emotional_masking: bool = False
+
+
+@dataclass(slots=True, eq=False)
+class AudioResult(DictAccessMixin):
+    """Output of AudioPipeline.process_audio."""
+    vad: Dict
+    prosody: Dict
+    events: Dict
+    audio_state: AudioState
+    transcription: Optional[Dict] = None
+    processing_time_ms: float = 0.0
+    barge_in: Optional[Dict] = None  # Set by the agent when the user interrupts
+    
+    _optional_keys: ClassVar[Tuple[str, ...]] = ('barge_in',)
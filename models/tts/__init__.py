@@ -1,8 +1,13 @@
 """TTS models package."""
 
 from .voice_synthesis import CosyVoiceTTS, MockTTS
+from .audio_cache import TTSAudioCache
+from .time_stretch import WSOLAStretcher, time_stretch
 
 __all__ = [
     'CosyVoiceTTS',
-    'MockTTS'
+    'MockTTS',
+    'TTSAudioCache',
+    'WSOLAStretcher',
+    'time_stretch'
 ]
@@ -0,0 +1,256 @@
+"""Content-addressed cache of synthesized speech.
+
+Short phrases ("I'm here for you.", intervention openers) are spoken
+over and over; caching their audio by what determines it (text, voice,
+emotion, speed) makes repeats free to synthesize.
+"""
+
+import os
+import re
+import hashlib
+import threading
+import unicodedata
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+from loguru import logger
+
+
+# Typographic variants normalized before hashing
+_PUNCTUATION = str.maketrans({'‘': "'", '’': "'", '“': '"', '”': '"'})
+_WHITESPACE = re.compile(r'\s+')
+
+
+class TTSAudioCache:
+    """
+    Two-tier cache of synthesized audio.
+    
+    The memory tier is an LRU bounded by ``max_memory_bytes``. The disk
+    tier stores each clip as a float32 ``.npy`` file named by its key;
+    disk hits are memory-mapped (only the pages played are read) and
+    promoted to the memory tier. The disk tier is bounded by
+    ``max_disk_bytes``: files are touched on every hit, and once the
+    budget is exceeded the least recently used ones are deleted down to
+    90% of it (the directory is rescanned, so this also covers clips
+    written by other workers). Returned arrays are read-only because
+    they are shared between callers. Safe to use from synthesis threads.
+    
+    One cache is shared by all sessions of a worker (see ``shared``).
+    """
+    
+    _shared: Optional['TTSAudioCache'] = None
+    
+    def __init__(
+        self,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        storage_path: Optional[str] = None,
+        max_disk_bytes: int = 512 * 1024 * 1024
+    ):
+        """
+        Initialize audio cache.
+        
+        Args:
+            max_memory_bytes: Budget for audio held in memory
+            storage_path: Directory for the disk tier (memory only if None)
+            max_disk_bytes: Budget for the disk tier
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.storage_dir = Path(storage_path) if storage_path else None
+        
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+        
+        if self.storage_dir:
+            self.storage_dir.mkdir(parents=True, exist_ok=True)
+            self._trim_disk()
+        
+        logger.info(
+            f"TTSAudioCache initialized (memory={max_memory_bytes // (1024 * 1024)}MB, "
+            f"disk={self.storage_dir or 'off'}, disk budget={max_disk_bytes // (1024 * 1024)}MB)"
+        )
+    
+    @classmethod
+    def from_config(cls, config) -> 'TTSAudioCache':
+        """Create a cache from the ``models.tts.cache`` settings."""
+        return cls(
+            max_memory_bytes=int(config.get('models.tts.cache.max_memory_mb', 64) * 1024 * 1024),
+            storage_path=config.get('models.tts.cache.storage_path'),
+            max_disk_bytes=int(config.get('models.tts.cache.max_disk_mb', 512) * 1024 * 1024)
+        )
+    
+    @classmethod
+    def shared(cls, config) -> 'TTSAudioCache':
+        """Get the worker-wide cache."""
+        if cls._shared is None:
+            cls._shared = cls.from_config(config)
+        return cls._shared
+    
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalize text so that trivially different strings share a key."""
+        text = unicodedata.normalize('NFKC', text).translate(_PUNCTUATION)
+        return _WHITESPACE.sub(' ', text).strip().lower()
+    
+    @classmethod
+    def make_key(
+        cls,
+        text: str,
+        voice: str,
+        emotion: Optional[str] = None,
+        speed: float = 1.0
+    ) -> str:
+        """
+        Build the content address of a synthesis request.
+        
+        Args:
+            text: Text to synthesize
+            voice: Model and speaker identifier
+            emotion: Emotional tone (None for neutral)
+            speed: Speech rate (rounded to 0.01)
+        
+        Returns:
+            Hex digest identifying the audio
+        """
+        parts = (cls.normalize_text(text), voice, emotion or 'neutral', f"{speed:.2f}")
+        return hashlib.sha1("\x1f".join(parts).encode('utf-8')).hexdigest()
+    
+    def _path(self, key: str) -> Path:
+        return self.storage_dir / f"{key}.npy"
+    
+    def _remember(self, key: str, audio: np.ndarray):
+        """Add audio to the memory tier, evicting least recently used clips."""
+        if audio.nbytes > self.max_memory_bytes:
+            return
+        
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.nbytes
+        
+        self._memory[key] = audio
+        self._memory_bytes += audio.nbytes
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+    
+    def _trim_disk(self):
+        """
+        Rescan the disk tier and delete least recently used clips over budget.
+        
+        Sets the disk usage estimate to what remains on disk.
+        """
+        with self._disk_lock:
+            clips = []
+            for entry in os.scandir(self.storage_dir):
+                if not entry.name.endswith('.npy') or '.tmp.' in entry.name:
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # Evicted by another worker
+                clips.append((stat.st_mtime, stat.st_size, entry.path))
+            
+            total = sum(size for _, size, _ in clips)
+            if total > self.max_disk_bytes:
+                target = self.max_disk_bytes * 0.9
+                clips.sort()
+                for _, size, path in clips:
+                    if total <= target:
+                        break
+                    try:
+                        # Memory-mapped copies stay valid after unlink
+                        os.unlink(path)
+                    except OSError:
+                        continue
+                    total -= size
+                    self.disk_evictions += 1
+            
+            self._disk_bytes = total
+    
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Get cached audio.
+        
+        Returns:
+            Read-only float32 audio, or None if not cached
+        """
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return audio
+        
+        if self.storage_dir:
+            path = self._path(key)
+            if path.exists():
+                try:
+                    audio = np.load(path, mmap_mode='r')
+                    os.utime(path)  # Recently used: evicted last
+                    with self._lock:
+                        self._remember(key, audio)
+                        self.disk_hits += 1
+                    return audio
+                except Exception as e:
+                    logger.warning(f"Discarding unreadable TTS cache file {path.name}: {e}")
+                    path.unlink(missing_ok=True)
+        
+        with self._lock:
+            self.misses += 1
+        return None
+    
+    def put(self, key: str, audio: np.ndarray) -> np.ndarray:
+        """
+        Store synthesized audio.
+        
+        Returns:
+            The cached (read-only) audio, to be used in place of ``audio``
+        """
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        audio.flags.writeable = False
+        with self._lock:
+            self._remember(key, audio)
+        
+        if self.storage_dir:
+            path = self._path(key)
+            tmp_path = path.with_name(f"{key}.{os.getpid()}.tmp.npy")
+            try:
+                # Write then rename so other workers never see a partial file
+                np.save(tmp_path, audio)
+                os.replace(tmp_path, path)
+                with self._disk_lock:
+                    self._disk_bytes += path.stat().st_size
+                    over_budget = self._disk_bytes > self.max_disk_bytes
+                if over_budget:
+                    self._trim_disk()
+            except Exception as e:
+                logger.error(f"Failed to write TTS cache file: {e}")
+                tmp_path.unlink(missing_ok=True)
+        
+        return audio
+    
+    def clear(self):
+        """Remove all clips from the memory tier."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+    
+    def get_stats(self) -> Dict:
+        """Get hit/miss counters and memory use."""
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'memory_entries': len(self._memory),
+            'memory_bytes': self._memory_bytes,
+            'disk_bytes': self._disk_bytes,
+            'disk_evictions': self.disk_evictions
+        }
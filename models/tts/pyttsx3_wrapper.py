@@ -1,6 +1,13 @@
 """pyttsx3 TTS wrapper for empathy system."""
 
+import os
+import queue
+import wave
+import tempfile
+import threading
 import numpy as np
+from concurrent.futures import Future
+from dataclasses import dataclass, field
 from typing import Optional
 from loguru import logger
 
@@ -11,11 +18,23 @@ except ImportError:
     PYTTSX3_AVAILABLE = False
 
 
+@dataclass
+class _Job:
+    """Text queued for the engine thread."""
+    text: str
+    rate: int
+    future: Future = field(default_factory=Future)
+
+
 class Pyttsx3TTS:
     """
     Text-to-speech using pyttsx3 (Windows system voices).
     
-    Compatible with Python 3.13, works offline.
+    Compatible with Python 3.13, works offline. The engine lives on its
+    own thread (system speech engines are thread-affine) and renders
+    queued jobs to WAV files, so callers get audio samples back instead
+    of the engine speaking, and never block on the speech engine's event
+    loop. Jobs can be cancelled until they start rendering.
     """
     
     def __init__(self, voice_index: int = 0, rate: int = 170, volume: float = 0.9):
@@ -30,78 +49,190 @@ class Pyttsx3TTS:
         if not PYTTSX3_AVAILABLE:
             raise ImportError("pyttsx3 not installed")
         
-        self.engine = pyttsx3.init()
         self.sample_rate = 22050  # Standard for compatibility
+        self.rate = rate
+        self.volume = volume
+        self.voice_index = voice_index
         
-        # Get voices
-        voices = self.engine.getProperty('voices')
-        if voices and 0 <= voice_index < len(voices):
-            self.engine.setProperty('voice', voices[voice_index].id)
-            logger.info(f"Using voice: {voices[voice_index].name}")
+        self._jobs: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._ready = threading.Event()
+        self._init_error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._run_engine, name="pyttsx3-engine", daemon=True)
+        self._thread.start()
         
-        # Set properties
-        self.engine.setProperty('rate', rate)
-        self.engine.setProperty('volume', volume)
+        self._ready.wait()
+        if self._init_error is not None:
+            raise self._init_error
         
         logger.info(f"Pyttsx3TTS initialized (rate={rate}, volume={volume})")
     
+    def _run_engine(self):
+        """Engine thread: render jobs one at a time."""
+        try:
+            engine = pyttsx3.init()
+            
+            # Get voices
+            voices = engine.getProperty('voices')
+            if voices and 0 <= self.voice_index < len(voices):
+                engine.setProperty('voice', voices[self.voice_index].id)
+                logger.info(f"Using voice: {voices[self.voice_index].name}")
+            
+            engine.setProperty('volume', self.volume)
+        except Exception as e:
+            self._init_error = e
+            return
+        finally:
+            self._ready.set()
+        
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            if not job.future.set_running_or_notify_cancel():
+                continue  # Cancelled while queued
+            if not job.text.strip():
+                job.future.set_result(np.array([], dtype=np.float32))
+                continue
+            
+            fd, path = tempfile.mkstemp(suffix='.wav')
+            os.close(fd)
+            try:
+                engine.setProperty('rate', job.rate)
+                engine.save_to_file(job.text, path)
+                engine.runAndWait()
+                job.future.set_result(self._read_wav(path))
+            except Exception as e:
+                job.future.set_exception(e)
+            finally:
+                os.unlink(path)
+        
+        try:
+            engine.stop()
+        except Exception:
+            pass
+    
+    def _read_wav(self, path: str) -> np.ndarray:
+        """Load a rendered WAV file as mono float32 at ``sample_rate``."""
+        with wave.open(path, 'rb') as wav:
+            channels = wav.getnchannels()
+            width = wav.getsampwidth()
+            file_rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+        
+        if width == 1:
+            audio = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+        elif width == 2:
+            audio = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768
+        elif width == 4:
+            audio = np.frombuffer(frames, dtype=np.int32).astype(np.float32) / 2147483648
+        else:
+            raise ValueError(f"Unsupported WAV sample width: {width}")
+        
+        if channels > 1:
+            audio = audio.reshape(-1, channels).mean(axis=1)
+        
+        if file_rate != self.sample_rate and len(audio):
+            # Linear resampling is adequate for the system voices' bandwidth
+            n_out = int(round(len(audio) * self.sample_rate / file_rate))
+            positions = np.arange(n_out) * (file_rate / self.sample_rate)
+            audio = np.interp(positions, np.arange(len(audio)), audio)
+        
+        return audio.astype(np.float32)
+    
+    def _job_rate(self, emotion_override: Optional[str]) -> int:
+        """Speech rate for a job (simple emotion heuristic)."""
+        if emotion_override in ['excited', 'happy']:
+            return self.rate + 20
+        if emotion_override in ['sad', 'calm']:
+            return self.rate - 20
+        return self.rate
+    
+    def submit(self, text: str, emotion_override: Optional[str] = None) -> Future:
+        """
+        Queue text for synthesis without waiting.
+        
+        Args:
+            text: Text to synthesize
+            emotion_override: Optional emotion hint (adjusts rate)
+        
+        Returns:
+            Future resolving to float32 audio; ``cancel()`` drops the job
+            if it has not started rendering
+        """
+        job = _Job(text=text, rate=self._job_rate(emotion_override))
+        if not self._thread.is_alive():
+            job.future.set_exception(RuntimeError("TTS engine is shut down"))
+            return job.future
+        
+        self._jobs.put(job)
+        return job.future
+    
     def synthesize(self, text: str, emotion_override: Optional[str] = None) -> np.ndarray:
         """
         Synthesize speech from text.
         
         Args:
             text: Text to synthesize
-            emotion_override: Optional emotion hint (not used by pyttsx3)
-            
+            emotion_override: Optional emotion hint (adjusts rate)
+        
         Returns:
-            Empty array (pyttsx3 plays directly, doesn't return audio)
+            Audio as numpy array (float32, sample_rate); empty on error
         """
         if not text or not text.strip():
             return np.array([], dtype=np.float32)
         
         try:
-            # Adjust rate based on emotion (simple heuristic)
-            if emotion_override:
-                base_rate = self.engine.getProperty('rate')
-                if emotion_override in ['excited', 'happy']:
-                    self.engine.setProperty('rate', base_rate + 20)
-                elif emotion_override in ['sad', 'calm']:
-                    self.engine.setProperty('rate', base_rate - 20)
-            
-            # Speak
-            self.engine.say(text)
-            self.engine.runAndWait()
-            
-            # Reset rate
-            if emotion_override:
-                self.engine.setProperty('rate', 170)
-            
+            audio = self.submit(text, emotion_override).result()
             logger.debug(f"Synthesized: {text[:50]}...")
-            return np.array([], dtype=np.float32)
-            
+            return audio
+        
         except Exception as e:
             logger.error(f"TTS error: {e}")
             return np.array([], dtype=np.float32)
     
-    def synthesize_async(self, text: str):
+    def synthesize_async(self, text: str) -> Optional[Future]:
         """
         Synthesize speech asynchronously (non-blocking).
         
         Args:
             text: Text to synthesize
+        
+        Returns:
+            Future resolving to the audio, or None for empty text
         """
         if not text or not text.strip():
-            return
+            return None
+        return self.submit(text)
+    
+    def cancel_pending(self) -> int:
+        """
+        Cancel all jobs that have not started rendering.
         
-        try:
-            self.engine.say(text)
-            # Don't call runAndWait - let it queue
-        except Exception as e:
-            logger.error(f"Async TTS error: {e}")
+        Returns:
+            Number of jobs cancelled
+        """
+        cancelled = 0
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                self._jobs.put(None)  # Keep the shutdown request
+                break
+            if job.future.cancel():
+                cancelled += 1
+        return cancelled
     
     def flush(self):
-        """Process queued speech."""
+        """Wait until all queued jobs have been rendered."""
         try:
-            self.engine.runAndWait()
-        except:
+            self.submit("").result()
+        except Exception:
             pass
+    
+    def shutdown(self):
+        """Cancel pending jobs and stop the engine thread."""
+        self.cancel_pending()
+        self._jobs.put(None)
+        self._thread.join(timeout=5)
@@ -0,0 +1,156 @@
+"""Streaming time-domain time stretching (WSOLA).
+
+Changes speech rate without changing pitch by overlap-adding windowed
+frames of the input at a different hop than they are read, each frame
+shifted slightly so that it lines up with the waveform already output.
+Unlike a phase vocoder it needs no STFT and works chunk by chunk.
+"""
+
+import numpy as np
+
+
+class WSOLAStretcher:
+    """
+    Waveform-similarity overlap-add time stretcher.
+    
+    Feed audio with ``process`` as it arrives and call ``flush`` at the
+    end; the concatenated output is the input played ``rate`` times
+    faster (``rate`` > 1) or slower (``rate`` < 1) at the original pitch.
+    """
+    
+    def __init__(
+        self,
+        rate: float,
+        sample_rate: int = 22050,
+        frame_ms: float = 40.0,
+        tolerance_ms: float = 10.0
+    ):
+        """
+        Initialize stretcher.
+        
+        Args:
+            rate: Speed factor (>1 = faster, <1 = slower)
+            sample_rate: Audio sample rate
+            frame_ms: Analysis frame length (a few pitch periods)
+            tolerance_ms: Maximum shift when aligning a frame
+        """
+        self.rate = rate
+        self.frame = 2 * int(sample_rate * frame_ms / 2000)
+        self.hop = self.frame // 2  # Output hop
+        self.analysis_hop = self.hop * rate
+        self.tolerance = int(sample_rate * tolerance_ms / 1000)
+        # Periodic Hann windows at 50% overlap sum to one
+        self.window = np.hanning(self.frame + 1)[:-1].astype(np.float32)
+        
+        # Input is prefixed with half a frame of silence so that the first
+        # output samples are not faded in; that much output is dropped
+        self._input = np.zeros(self.hop, dtype=np.float32)
+        self._input_start = 0  # Absolute index of self._input[0]
+        self._input_samples = 0
+        self._output = np.zeros(self.frame, dtype=np.float32)
+        self._to_skip = self.hop
+        self._emitted = 0
+        self._frames = 0
+        self._previous = None  # Absolute start of the previous frame
+    
+    def _segment(self, start: int, length: int) -> np.ndarray:
+        offset = start - self._input_start
+        return self._input[offset:offset + length]
+    
+    def _align(self, nominal: int) -> int:
+        """Choose the frame start near ``nominal`` that best continues the output."""
+        if self._previous is None:
+            return nominal
+        
+        # The frame should resemble what naturally followed the previous one
+        target = self._segment(self._previous + self.hop, self.frame)
+        lo = max(nominal - self.tolerance, self._input_start)
+        region = self._segment(lo, nominal + self.tolerance - lo + self.frame)
+        similarity = np.correlate(region, target, mode='valid')
+        return lo + int(np.argmax(similarity))
+    
+    def _run(self, final: bool) -> np.ndarray:
+        """Overlap-add every frame the buffered input allows."""
+        available = self._input_start + len(self._input)
+        end = self.hop + self._input_samples  # End of real input (padded coordinates)
+        output = []
+        
+        while True:
+            nominal = int(round(self._frames * self.analysis_hop))
+            if final and nominal >= end:
+                break
+            needed = nominal + self.tolerance + self.frame
+            if self._previous is not None:
+                needed = max(needed, self._previous + self.hop + self.frame)
+            if needed > available:
+                if not final:
+                    break
+                # Pad the tail with silence to finish the last frames
+                self._input = np.concatenate([
+                    self._input, np.zeros(needed - available, dtype=np.float32)
+                ])
+                available = needed
+            
+            start = self._align(nominal)
+            self._output += self.window * self._segment(start, self.frame)
+            output.append(self._output[:self.hop].copy())
+            self._output = np.concatenate([self._output[self.hop:], np.zeros(self.hop, dtype=np.float32)])
+            self._previous = start
+            self._frames += 1
+            
+            # Drop input no later frame can reach
+            keep_from = min(int(round(self._frames * self.analysis_hop)) - self.tolerance, start + self.hop)
+            if keep_from > self._input_start:
+                self._input = self._input[keep_from - self._input_start:]
+                self._input_start = keep_from
+        
+        if final:
+            output.append(self._output)
+        audio = np.concatenate(output) if output else np.zeros(0, dtype=np.float32)
+        
+        skip = min(self._to_skip, len(audio))
+        self._to_skip -= skip
+        audio = audio[skip:]
+        if final:
+            audio = audio[:max(0, int(round(self._input_samples / self.rate)) - self._emitted)]
+        self._emitted += len(audio)
+        return audio
+    
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """
+        Stretch the next chunk of input.
+        
+        Args:
+            chunk: Audio samples
+        
+        Returns:
+            Stretched audio that is ready (may be empty)
+        """
+        if self.rate == 1.0:
+            return np.asarray(chunk, dtype=np.float32)
+        
+        self._input = np.concatenate([self._input, np.asarray(chunk, dtype=np.float32)])
+        self._input_samples += len(chunk)
+        return self._run(final=False)
+    
+    def flush(self) -> np.ndarray:
+        """Return the remaining output after the last chunk."""
+        if self.rate == 1.0:
+            return np.zeros(0, dtype=np.float32)
+        return self._run(final=True)
+
+
+def time_stretch(audio: np.ndarray, rate: float, sample_rate: int = 22050) -> np.ndarray:
+    """
+    Time-stretch a complete clip without changing pitch.
+    
+    Args:
+        audio: Input audio
+        rate: Speed factor (>1 = faster, <1 = slower)
+        sample_rate: Audio sample rate
+    
+    Returns:
+        Time-stretched audio
+    """
+    stretcher = WSOLAStretcher(rate, sample_rate=sample_rate)
+    return np.concatenate([stretcher.process(audio), stretcher.flush()])
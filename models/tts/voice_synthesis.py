@@ -3,13 +3,18 @@
 Provides natural, emotionally-aware voice synthesis.
 """
 
+import queue
+import threading
 import torch
 import numpy as np
-from typing import Dict, Optional, Iterator
+from typing import Dict, List, Optional, Iterator
 from pathlib import Path
 from loguru import logger
 
 from utils.helpers import timeit
+from utils.text_segmenter import split_sentences
+from .audio_cache import TTSAudioCache
+from .time_stretch import time_stretch
 
 
 class CosyVoiceTTS:
@@ -24,7 +29,11 @@ class CosyVoiceTTS:
         model_name: str = "CosyVoice-300M",
         device: str = "cuda",
         speaker: str = "default",
-        speed: float = 1.0
+        speed: float = 1.0,
+        crossfade_ms: float = 15.0,
+        cache: Optional[TTSAudioCache] = None,
+        native_speed: bool = False,
+        native_emotion: bool = False
     ):
         """
         Initialize CosyVoice TTS.
@@ -34,11 +43,24 @@ class CosyVoiceTTS:
             device: Device to run on
             speaker: Voice ID for multi-speaker models
             speed: Speech rate multiplier
+            crossfade_ms: Crossfade between streamed sentences
+            cache: Audio cache for repeated phrases (None to disable)
+            native_speed: The model renders ``speed`` itself (otherwise
+                the rate is applied with WSOLA time-stretching)
+            native_emotion: The model renders ``emotion`` itself
+        
+        Coqui's ``TTS.tts`` accepts ``speed`` and ``emotion`` for every
+        model, but most models ignore them (and some reject the pair),
+        so native prosody is only used when enabled explicitly.
         """
         self.device = device
         self.speaker = speaker
         self.speed = speed
+        self.crossfade_ms = crossfade_ms
+        self.cache = cache
         self.model_name = model_name
+        self.native_speed = native_speed
+        self.native_emotion = native_emotion
         self.sample_rate = 22050  # CosyVoice default
         
         try:
@@ -49,7 +71,7 @@ class CosyVoiceTTS:
             self.tts = TTS(model_name=model_name).to(device)
             
             logger.info(f"CosyVoice TTS initialized with '{model_name}' on {device}")
-            
+        
         except ImportError:
             logger.error("TTS library not installed. Install with: pip install TTS")
             raise
@@ -71,85 +93,172 @@ class CosyVoiceTTS:
             text: Text to synthesize
             emotion: Emotional tone (happy, sad, neutral, etc)
             speed: Override default speed
-            
+        
         Returns:
             Audio as numpy array (float32, sample_rate)
         """
         if not text or not text.strip():
             return np.zeros(100, dtype=np.float32)
         
+        speed_factor = speed or self.speed
+        cache_key = None
+        if self.cache is not None:
+            # Emotion only changes the audio when the engine renders it
+            cache_key = self.cache.make_key(
+                text, f"{self.model_name}/{self.speaker}",
+                emotion if self.native_emotion else None, speed_factor
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
-            # Apply emotional modulation if supported
-            if emotion and hasattr(self.tts, 'tts_with_vc_to_file'):
-                # Voice conversion for emotion
-                wav = self.tts.tts_with_vc(
-                    text=text,
-                    speaker_wav=None,  # Could provide reference audio
-                    language="en"
-                )
-            else:
-                # Standard synthesis
-                wav = self.tts.tts(
-                    text=text,
-                    speaker=self.speaker,
-                    language="en"
-                )
+            # Let the engine render emotion and rate when it supports them
+            prosody = {}
+            if emotion and self.native_emotion:
+                prosody['emotion'] = emotion.capitalize()  # e.g. "Happy", "Sad"
+            if speed_factor != 1.0 and self.native_speed:
+                prosody['speed'] = speed_factor
+            
+            wav = self.tts.tts(
+                text=text,
+                speaker=self.speaker,
+                language="en",
+                **prosody
+            )
             
             # Convert to numpy
             if isinstance(wav, torch.Tensor):
                 wav = wav.cpu().numpy()
+            wav = np.asarray(wav, dtype=np.float32)
             
-            # Apply speed modulation
-            speed_factor = speed or self.speed
-            if speed_factor != 1.0:
+            # Apply speed modulation the engine could not
+            if speed_factor != 1.0 and not self.native_speed:
                 wav = self._time_stretch(wav, speed_factor)
             
-            return wav.astype(np.float32)
-            
+            if cache_key is not None:
+                wav = self.cache.put(cache_key, wav)
+            return wav
+        
         except Exception as e:
             logger.error(f"Error in synthesis: {e}")
             return np.zeros(100, dtype=np.float32)
     
+    def warm_up(self, phrases: List[str]) -> int:
+        """
+        Pre-synthesize frequently spoken phrases into the cache.
+        
+        Args:
+            phrases: Phrases to synthesize (neutral tone, default speed)
+        
+        Returns:
+            Number of phrases that had to be synthesized
+        """
+        if self.cache is None or not phrases:
+            return 0
+        
+        synthesized = 0
+        for phrase in phrases:
+            key = self.cache.make_key(phrase, f"{self.model_name}/{self.speaker}", None, self.speed)
+            if self.cache.get(key) is None:
+                self.synthesize(phrase)
+                synthesized += 1
+        
+        logger.info(f"TTS cache warmed ({synthesized}/{len(phrases)} phrases synthesized)")
+        return synthesized
+    
     def synthesize_stream(
         self,
         text: str,
-        chunk_size: int = 4096
+        chunk_size: int = 4096,
+        emotion: Optional[str] = None,
+        speed: Optional[float] = None
     ) -> Iterator[np.ndarray]:
         """
         Synthesize speech with streaming output.
         
+        The text is split into sentences (long ones at clause boundaries),
+        which a worker thread synthesizes in order while earlier ones are
+        being played, so the first chunk only waits for the first
+        sentence. Adjacent sentences are joined with a short crossfade.
+        Closing the generator stops synthesis after the current sentence.
+        
         Args:
             text: Text to synthesize
             chunk_size: Size of audio chunks
-            
+            emotion: Emotional tone (as in synthesize)
+            speed: Override default speed
+        
         Yields:
             Audio chunks
         """
-        # Full synthesis (CosyVoice doesn't support true streaming yet)
-        full_audio = self.synthesize(text)
+        segments = split_sentences(text) if text and text.strip() else []
+        if len(segments) <= 1:
+            audio = self.synthesize(text, emotion=emotion, speed=speed)
+            for i in range(0, len(audio), chunk_size):
+                yield audio[i:i + chunk_size]
+            return
         
-        # Split into chunks
-        for i in range(0, len(full_audio), chunk_size):
-            chunk = full_audio[i:i + chunk_size]
-            yield chunk
+        ready: "queue.Queue[Optional[np.ndarray]]" = queue.Queue()
+        stop = threading.Event()
+        
+        def worker():
+            try:
+                for segment in segments:
+                    if stop.is_set():
+                        break
+                    ready.put(self.synthesize(segment, emotion=emotion, speed=speed))
+            finally:
+                ready.put(None)
+        
+        threading.Thread(target=worker, name="tts-stream", daemon=True).start()
+        
+        # The end of each sentence is held back to crossfade with the next
+        fade_samples = int(self.sample_rate * self.crossfade_ms / 1000)
+        tail = np.zeros(0, dtype=np.float32)
+        try:
+            while True:
+                audio = ready.get()
+                if audio is None:
+                    break
+                
+                audio = self._crossfade(tail, audio)
+                split = max(0, len(audio) - fade_samples)
+                tail = audio[split:]
+                for i in range(0, split, chunk_size):
+                    yield audio[i:min(i + chunk_size, split)]
+            
+            if len(tail):
+                yield tail
+        finally:
+            stop.set()
+    
+    @staticmethod
+    def _crossfade(tail: np.ndarray, audio: np.ndarray) -> np.ndarray:
+        """Join ``audio`` onto ``tail``, overlapping them with a raised-cosine fade."""
+        overlap = min(len(tail), len(audio))
+        if overlap == 0:
+            return np.concatenate([tail, audio]).astype(np.float32)
+        
+        fade_in = np.sin(np.linspace(0.0, np.pi / 2, overlap, dtype=np.float32)) ** 2
+        mixed = tail[len(tail) - overlap:] * (1.0 - fade_in) + audio[:overlap] * fade_in
+        return np.concatenate([tail[:len(tail) - overlap], mixed, audio[overlap:]]).astype(np.float32)
     
     def _time_stretch(self, audio: np.ndarray, rate: float) -> np.ndarray:
         """
         Time-stretch audio without changing pitch.
         
+        Uses time-domain WSOLA, which costs a small fraction of a phase
+        vocoder and avoids its phasiness on speech.
+        
         Args:
             audio: Input audio
             rate: Speed factor (>1 = faster, <1 = slower)
-            
+        
         Returns:
             Time-stretched audio
         """
-        try:
-            import librosa
-            return librosa.effects.time_stretch(audio, rate=rate)
-        except ImportError:
-            logger.warning("librosa not installed, cannot time-stretch")
-            return audio
+        return time_stretch(audio, rate, self.sample_rate)
     
     def modulate_emotion(
         self,
@@ -164,7 +273,7 @@ class CosyVoiceTTS:
             text: Text to synthesize
             valence: Emotional valence (-1 to 1)
             arousal: Arousal level (0 to 1)
-            
+        
         Returns:
             Emotionally modulated audio
         """
@@ -174,6 +283,7 @@ class CosyVoiceTTS:
         # Map VAD to speed
         # High arousal = faster, low arousal = slower
         speed = 0.9 + (arousal * 0.3)  # Range: 0.9 - 1.2
+        speed = round(speed * 20) / 20  # 0.05 steps, so cached audio is reusable
         
         return self.synthesize(text, emotion=emotion, speed=speed)
     
@@ -202,7 +312,7 @@ class MockTTS:
         samples = int(self.sample_rate * duration)
         return np.zeros(samples, dtype=np.float32)
     
-    def synthesize_stream(self, text: str, chunk_size: int = 4096) -> Iterator[np.ndarray]:
+    def synthesize_stream(self, text: str, chunk_size: int = 4096, **kwargs) -> Iterator[np.ndarray]:
         audio = self.synthesize(text)
         for i in range(0, len(audio), chunk_size):
             yield audio[i:i + chunk_size]
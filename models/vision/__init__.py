@@ -4,6 +4,7 @@ from .face_emotion import FaceEmotionDetector, MockFaceEmotionDetector
 from .posture_analyzer import PostureAnalyzer, MockPostureAnalyzer
 from .gaze_tracker import GazeTracker, MockGazeTracker
 from .video_pipeline import VideoPipeline
+from models.results import FaceResult, PostureResult, GazeResult, VisualState, VideoResult
 
 __all__ = [
     'FaceEmotionDetector',
@@ -12,5 +13,10 @@ __all__ = [
     'MockPostureAnalyzer',
     'GazeTracker',
     'MockGazeTracker',
-    'VideoPipeline'
+    'VideoPipeline',
+    'FaceResult',
+    'PostureResult',
+    'GazeResult',
+    'VisualState',
+    'VideoResult'
 ]
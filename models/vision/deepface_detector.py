@@ -8,6 +8,8 @@ import numpy as np
 from typing import Dict, Optional
 from loguru import logger
 
+from models.results import FaceResult, emotion_vector
+
 try:
     from deepface import DeepFace
     DEEPFACE_AVAILABLE = True
@@ -44,7 +46,7 @@ class DeepFaceEmotionDetector:
         
         logger.info("DeepFace emotion detector initialized")
     
-    def detect(self, frame: np.ndarray) -> Dict:
+    def detect(self, frame: np.ndarray) -> FaceResult:
         """
         Detect emotions in frame.
         
@@ -52,7 +54,7 @@ class DeepFaceEmotionDetector:
             frame: RGB image (H, W, 3)
             
         Returns:
-            Dictionary with emotion results
+            FaceResult with emotion results
         """
         try:
             # DeepFace expects BGR
@@ -88,31 +90,23 @@ class DeepFaceEmotionDetector:
                 region.get('h', 0)
             ] if region else None
             
-            return {
-                'face_detected': True,
-                'primary_emotion': dominant_emotion,
-                'confidence': confidence,
-                'all_emotions': emotions,
-                'face_box': face_box,
-                'valence': self.emotion_map[dominant_emotion][0],
-                'arousal': self.emotion_map[dominant_emotion][1]
-            }
+            return FaceResult(
+                face_detected=True,
+                primary_emotion=dominant_emotion,
+                confidence=confidence,
+                valence=self.emotion_map[dominant_emotion][0],
+                arousal=self.emotion_map[dominant_emotion][1],
+                scores=emotion_vector(emotions, scale=0.01),  # DeepFace reports percentages
+                face_box=face_box
+            )
             
         except Exception as e:
             logger.debug(f"DeepFace detection failed: {e}")
             return self._empty_result()
     
-    def _empty_result(self) -> Dict:
+    def _empty_result(self) -> FaceResult:
         """Return empty result when no face detected."""
-        return {
-            'face_detected': False,
-            'primary_emotion': 'unknown',
-            'confidence': 0.0,
-            'all_emotions': {},
-            'face_box': None,
-            'valence': 0.0,
-            'arousal': 0.0
-        }
+        return FaceResult(face_detected=False)
     
     def get_emotion_valence_arousal(self, emotion: str) -> tuple[float, float]:
         """Get valence and arousal for emotion."""
@@ -202,22 +196,17 @@ class MockDeepFaceDetector:
         self.device = device
         logger.info("Using MockDeepFaceDetector")
     
-    def detect(self, frame: np.ndarray) -> Dict:
+    def detect(self, frame: np.ndarray) -> FaceResult:
         """Return mock results."""
-        return {
-            'face_detected': True,
-            'primary_emotion': 'neutral',
-            'confidence': 0.7,
-            'all_emotions': {
-                'neutral': 70.0,
-                'happy': 15.0,
-                'sad': 10.0,
-                'angry': 5.0
-            },
-            'face_box': [100, 100, 200, 200],
-            'valence': 0.0,
-            'arousal': 0.3
-        }
+        return FaceResult(
+            face_detected=True,
+            primary_emotion='neutral',
+            confidence=0.7,
+            valence=0.0,
+            arousal=0.3,
+            scores=emotion_vector({'neutral': 0.7, 'happy': 0.15, 'sad': 0.1, 'angry': 0.05}),
+            face_box=[100, 100, 200, 200]
+        )
     
     def get_emotion_valence_arousal(self, emotion: str) -> tuple[float, float]:
         return (0.0, 0.3)
@@ -19,6 +19,7 @@ except ImportError:
     HSEmotionRecognizer = None
 
 from utils.helpers import timeit
+from models.results import EMOTION_LABELS, FaceResult, emotion_vector
 
 
 class FaceEmotionDetector:
@@ -28,10 +29,7 @@ class FaceEmotionDetector:
     Uses HSEmotion for fast, accurate emotion recognition.
     """
     
-    EMOTIONS = [
-        'angry', 'contempt', 'disgust', 'fear',
-        'happy', 'neutral', 'sad', 'surprise'
-    ]
+    EMOTIONS = EMOTION_LABELS  # Model output order
     
     def __init__(
         self,
@@ -59,7 +57,7 @@ class FaceEmotionDetector:
         logger.info(f"FaceEmotionDetector initialized with model '{model_name}' on {device}")
     
     @timeit
-    def detect(self, frame: np.ndarray) -> Dict[str, any]:
+    def detect(self, frame: np.ndarray) -> FaceResult:
         """
         Detect emotions from a video frame.
         
@@ -67,7 +65,8 @@ class FaceEmotionDetector:
             frame: RGB image as numpy array (H, W, 3)
             
         Returns:
-            Dictionary containing:
+            FaceResult (dict-compatible) containing:
+            - scores: float32 probabilities in EMOTIONS order
             - emotions: Dict mapping emotion names to probabilities
             - primary_emotion: Most confident emotion
             - confidence: Confidence score for primary emotion
@@ -82,44 +81,30 @@ class FaceEmotionDetector:
             )
             
             if emotion_scores is None or len(emotion_scores) == 0:
-                return {
-                    'emotions': {},
-                    'primary_emotion': 'unknown',
-                    'confidence': 0.0,
-                    'face_detected': False,
-                    'face_bbox': None
-                }
+                return FaceResult(face_detected=False)
             
-            # Convert to dictionary
-            emotions_dict = {
-                emotion: float(score)
-                for emotion, score in zip(self.EMOTIONS, emotion_scores)
-            }
+            scores = np.asarray(emotion_scores, dtype=np.float32)
             
             # Get primary emotion
-            primary_emotion = max(emotions_dict.items(), key=lambda x: x[1])
+            best = int(np.argmax(scores))
+            primary_emotion = self.EMOTIONS[best]
+            confidence = float(scores[best])
             
             # Filter low confidence
-            if primary_emotion[1] < self.confidence_threshold:
-                primary_emotion = ('neutral', primary_emotion[1])
+            if confidence < self.confidence_threshold:
+                primary_emotion = 'neutral'
             
-            return {
-                'emotions': emotions_dict,
-                'primary_emotion': primary_emotion[0],
-                'confidence': primary_emotion[1],
-                'face_detected': True,
-                'face_bbox': face_bbox
-            }
+            return FaceResult(
+                face_detected=True,
+                primary_emotion=primary_emotion,
+                confidence=confidence,
+                scores=scores,
+                face_box=face_bbox
+            )
             
         except Exception as e:
             logger.error(f"Error in face emotion detection: {e}")
-            return {
-                'emotions': {},
-                'primary_emotion': 'error',
-                'confidence': 0.0,
-                'face_detected': False,
-                'face_bbox': None
-            }
+            return FaceResult(face_detected=False, primary_emotion='error')
     
     def detect_batch(self, frames: list) -> list:
         """
@@ -160,7 +145,7 @@ class FaceEmotionDetector:
         
         return mapping.get(emotion, (0.0, 0.0))
     
-    def visualize(self, frame: np.ndarray, result: Dict) -> np.ndarray:
+    def visualize(self, frame: np.ndarray, result: FaceResult) -> np.ndarray:
         """
         Draw emotion detection results on frame.
         
@@ -203,14 +188,13 @@ class MockFaceEmotionDetector:
     def __init__(self, *args, **kwargs):
         logger.warning("Using MockFaceEmotionDetector - install hsemotion for real detection")
     
-    def detect(self, frame: np.ndarray) -> Dict:
-        return {
-            'emotions': {'neutral': 1.0},
-            'primary_emotion': 'neutral',
-            'confidence': 1.0,
-            'face_detected': True,
-            'face_bbox': None
-        }
+    def detect(self, frame: np.ndarray) -> FaceResult:
+        return FaceResult(
+            face_detected=True,
+            primary_emotion='neutral',
+            confidence=1.0,
+            scores=emotion_vector({'neutral': 1.0})
+        )
     
     def detect_batch(self, frames: list) -> list:
         return [self.detect(frame) for frame in frames]
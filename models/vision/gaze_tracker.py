@@ -19,9 +19,10 @@ except ImportError:
     mp = None
 
 from utils.helpers import timeit
+from models.results import GazeResult
 
 
-@dataclass
+@dataclass(slots=True)
 class GazeMetrics:
     """Container for gaze analysis metrics."""
     gaze_direction: str  # 'center', 'left', 'right', 'up', 'down'
@@ -80,7 +81,7 @@ class GazeTracker:
         logger.info("GazeTracker initialized")
     
     @timeit
-    def track(self, frame: np.ndarray, timestamp: float) -> Dict[str, any]:
+    def track(self, frame: np.ndarray, timestamp: float) -> GazeResult:
         """
         Track gaze from a video frame.
         
@@ -89,7 +90,7 @@ class GazeTracker:
             timestamp: Current timestamp in seconds
             
         Returns:
-            Dictionary containing:
+            GazeResult (dict-compatible) containing:
             - face_detected: Whether face was found
             - metrics: GazeMetrics object
             - gaze_pattern: Overall gaze pattern classification
@@ -98,11 +99,7 @@ class GazeTracker:
             results = self.face_mesh.process(frame)
             
             if not results.multi_face_landmarks:
-                return {
-                    'face_detected': False,
-                    'metrics': None,
-                    'gaze_pattern': 'unknown'
-                }
+                return GazeResult(face_detected=False)
             
             landmarks = results.multi_face_landmarks[0].landmark
             h, w, _ = frame.shape
@@ -142,19 +139,15 @@ class GazeTracker:
             # Classify overall pattern
             gaze_pattern = self._classify_pattern(metrics)
             
-            return {
-                'face_detected': True,
-                'metrics': metrics,
-                'gaze_pattern': gaze_pattern
-            }
+            return GazeResult(
+                face_detected=True,
+                gaze_pattern=gaze_pattern,
+                metrics=metrics
+            )
             
         except Exception as e:
             logger.error(f"Error in gaze tracking: {e}")
-            return {
-                'face_detected': False,
-                'metrics': None,
-                'gaze_pattern': 'error'
-            }
+            return GazeResult(face_detected=False, gaze_pattern='error')
     
     def _estimate_gaze(
         self, 
@@ -343,19 +336,19 @@ class MockGazeTracker:
     def __init__(self, *args, **kwargs):
         logger.warning("Using MockGazeTracker - install mediapipe for real tracking")
     
-    def track(self, frame: np.ndarray, timestamp: float) -> Dict:
-        return {
-            'face_detected': True,
-            'metrics': GazeMetrics(
+    def track(self, frame: np.ndarray, timestamp: float) -> GazeResult:
+        return GazeResult(
+            face_detected=True,
+            gaze_pattern='normal',
+            metrics=GazeMetrics(
                 gaze_direction='center',
                 gaze_yaw=0.0,
                 gaze_pitch=0.0,
                 blink_rate=15.0,
                 fixation_duration=0.5,
                 is_staring=False
-            ),
-            'gaze_pattern': 'normal'
-        }
+            )
+        )
     
     def visualize(self, frame: np.ndarray, result: Dict) -> np.ndarray:
         return frame
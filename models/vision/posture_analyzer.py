@@ -20,9 +20,10 @@ except ImportError:
     mp = None
 
 from utils.helpers import timeit
+from models.results import PostureResult
 
 
-@dataclass
+@dataclass(slots=True)
 class PostureMetrics:
     """Container for posture analysis metrics."""
     shoulder_slope: float  # Degrees from horizontal
@@ -70,12 +71,12 @@ class PostureAnalyzer:
         )
         
         self.smoothing_window = smoothing_window
-        self.pose_history: List[any] = []
+        self.pose_history: List[np.ndarray] = []
         
         logger.info(f"PostureAnalyzer initialized with complexity={model_complexity}")
     
     @timeit
-    def analyze(self, frame: np.ndarray) -> Dict[str, any]:
+    def analyze(self, frame: np.ndarray) -> PostureResult:
         """
         Analyze posture from a video frame.
         
@@ -83,10 +84,10 @@ class PostureAnalyzer:
             frame: RGB image as numpy array (H, W, 3)
             
         Returns:
-            Dictionary containing:
+            PostureResult (dict-compatible) containing:
             - pose_detected: Whether pose was found
             - metrics: PostureMetrics object
-            - landmarks: MediaPipe landmarks (33 points)
+            - landmarks: (33, 4) float32 array of x, y, z, visibility
             - posture_state: Overall posture classification
         """
         try:
@@ -94,15 +95,13 @@ class PostureAnalyzer:
             results = self.pose.process(frame)
             
             if not results.pose_landmarks:
-                return {
-                    'pose_detected': False,
-                    'metrics': None,
-                    'landmarks': None,
-                    'posture_state': 'unknown'
-                }
+                return PostureResult(pose_detected=False)
             
-            # Extract landmarks
-            landmarks = results.pose_landmarks.landmark
+            # Copy landmarks out of the MediaPipe message (normalized coordinates)
+            landmarks = np.array(
+                [(lm.x, lm.y, lm.z, lm.visibility) for lm in results.pose_landmarks.landmark],
+                dtype=np.float32
+            )
             
             # Calculate posture metrics
             metrics = self._calculate_metrics(landmarks, frame.shape)
@@ -115,25 +114,20 @@ class PostureAnalyzer:
             # Classify posture state
             posture_state = self._classify_posture(metrics)
             
-            return {
-                'pose_detected': True,
-                'metrics': metrics,
-                'landmarks': landmarks,
-                'posture_state': posture_state
-            }
+            return PostureResult(
+                pose_detected=True,
+                posture_state=posture_state,
+                metrics=metrics,
+                landmarks=landmarks
+            )
             
         except Exception as e:
             logger.error(f"Error in posture analysis: {e}")
-            return {
-                'pose_detected': False,
-                'metrics': None,
-                'landmarks': None,
-                'posture_state': 'error'
-            }
+            return PostureResult(pose_detected=False, posture_state='error')
     
     def _calculate_metrics(
         self, 
-        landmarks: any, 
+        landmarks: np.ndarray, 
         frame_shape: Tuple[int, int, int]
     ) -> PostureMetrics:
         """Calculate posture metrics from landmarks."""
@@ -150,23 +144,23 @@ class PostureAnalyzer:
         
         # Calculate shoulder slope
         shoulder_slope = self._calculate_angle(
-            (left_shoulder.x * w, left_shoulder.y * h),
-            (right_shoulder.x * w, right_shoulder.y * h),
+            (left_shoulder[0] * w, left_shoulder[1] * h),
+            (right_shoulder[0] * w, right_shoulder[1] * h),
             horizontal=True
         )
         
         # Calculate head tilt (nose to shoulder midpoint)
-        shoulder_mid_x = (left_shoulder.x + right_shoulder.x) / 2 * w
-        shoulder_mid_y = (left_shoulder.y + right_shoulder.y) / 2 * h
+        shoulder_mid_x = (left_shoulder[0] + right_shoulder[0]) / 2 * w
+        shoulder_mid_y = (left_shoulder[1] + right_shoulder[1]) / 2 * h
         head_tilt = self._calculate_angle(
-            (nose.x * w, nose.y * h),
+            (nose[0] * w, nose[1] * h),
             (shoulder_mid_x, shoulder_mid_y),
             horizontal=False
         )
         
         # Calculate spine angle (shoulder to hip)
-        hip_mid_x = (left_hip.x + right_hip.x) / 2 * w
-        hip_mid_y = (left_hip.y + right_hip.y) / 2 * h
+        hip_mid_x = (left_hip[0] + right_hip[0]) / 2 * w
+        hip_mid_y = (left_hip[1] + right_hip[1]) / 2 * h
         spine_angle = self._calculate_angle(
             (shoulder_mid_x, shoulder_mid_y),
             (hip_mid_x, hip_mid_y),
@@ -179,15 +173,15 @@ class PostureAnalyzer:
         )
         
         # Detect slouching (forward head, rounded shoulders)
-        is_slouching = abs(head_tilt) > 15 or abs(spine_angle) > 20
+        is_slouching = bool(abs(head_tilt) > 15 or abs(spine_angle) > 20)
         
         # Calculate movement score
         movement_score = self._calculate_movement()
         
         return PostureMetrics(
-            shoulder_slope=shoulder_slope,
-            head_tilt=head_tilt,
-            spine_angle=spine_angle,
+            shoulder_slope=float(shoulder_slope),
+            head_tilt=float(head_tilt),
+            spine_angle=float(spine_angle),
             head_in_hands=head_in_hands,
             is_slouching=is_slouching,
             movement_score=movement_score
@@ -214,46 +208,28 @@ class PostureAnalyzer:
     
     def _detect_head_in_hands(
         self, 
-        nose: any, 
-        left_wrist: any, 
-        right_wrist: any
+        nose: np.ndarray, 
+        left_wrist: np.ndarray, 
+        right_wrist: np.ndarray
     ) -> bool:
         """Detect if hands are near face (head-in-hands gesture)."""
         # Calculate distance from each wrist to nose
-        left_dist = np.sqrt(
-            (nose.x - left_wrist.x)**2 + 
-            (nose.y - left_wrist.y)**2
-        )
-        right_dist = np.sqrt(
-            (nose.x - right_wrist.x)**2 + 
-            (nose.y - right_wrist.y)**2
-        )
+        left_dist = np.hypot(*(nose[:2] - left_wrist[:2]))
+        right_dist = np.hypot(*(nose[:2] - right_wrist[:2]))
         
         # If either hand is within threshold distance
         threshold = 0.2  # Normalized coordinates
-        return left_dist < threshold or right_dist < threshold
+        return bool(left_dist < threshold or right_dist < threshold)
     
     def _calculate_movement(self) -> float:
         """Calculate movement score from pose history."""
         if len(self.pose_history) < 2:
             return 0.0
         
-        # Compare current pose to previous poses
-        total_movement = 0.0
-        current = self.pose_history[-1]
-        
-        for prev in self.pose_history[:-1]:
-            # Calculate average landmark displacement
-            displacement = sum(
-                np.sqrt(
-                    (c.x - p.x)**2 + 
-                    (c.y - p.y)**2 + 
-                    (c.z - p.z)**2
-                )
-                for c, p in zip(current, prev)
-            ) / len(current)
-            
-            total_movement += displacement
+        # Average landmark displacement from each previous pose
+        current = self.pose_history[-1][:, :3]
+        previous = np.stack(self.pose_history[:-1])[:, :, :3]
+        total_movement = float(np.linalg.norm(previous - current, axis=2).mean(axis=1).sum())
         
         # Normalize
         movement_score = min(total_movement / len(self.pose_history), 1.0)
@@ -272,7 +248,7 @@ class PostureAnalyzer:
         else:
             return "normal"
     
-    def visualize(self, frame: np.ndarray, result: Dict) -> np.ndarray:
+    def visualize(self, frame: np.ndarray, result: PostureResult) -> np.ndarray:
         """
         Draw posture analysis results on frame.
         
@@ -289,11 +265,16 @@ class PostureAnalyzer:
             return frame_copy
         
         # Draw pose landmarks
-        self.mp_drawing.draw_landmarks(
-            frame_copy,
-            result['landmarks'],
-            self.mp_pose.POSE_CONNECTIONS
-        )
+        landmarks = result['landmarks']
+        if landmarks is not None:
+            h, w = frame_copy.shape[:2]
+            points = (landmarks[:, :2] * (w, h)).astype(int)
+            visible = landmarks[:, 3] > 0.5
+            for start, end in self.mp_pose.POSE_CONNECTIONS:
+                if visible[start] and visible[end]:
+                    cv2.line(frame_copy, tuple(points[start]), tuple(points[end]), (255, 255, 255), 2)
+            for point in points[visible]:
+                cv2.circle(frame_copy, tuple(point), 3, (0, 0, 255), -1)
         
         # Draw posture state
         metrics = result['metrics']
@@ -334,20 +315,19 @@ class MockPostureAnalyzer:
     def __init__(self, *args, **kwargs):
         logger.warning("Using MockPostureAnalyzer - install mediapipe for real detection")
     
-    def analyze(self, frame: np.ndarray) -> Dict:
-        return {
-            'pose_detected': True,
-            'metrics': PostureMetrics(
+    def analyze(self, frame: np.ndarray) -> PostureResult:
+        return PostureResult(
+            pose_detected=True,
+            posture_state='normal',
+            metrics=PostureMetrics(
                 shoulder_slope=0.0,
                 head_tilt=0.0,
                 spine_angle=0.0,
                 head_in_hands=False,
                 is_slouching=False,
                 movement_score=0.1
-            ),
-            'landmarks': None,
-            'posture_state': 'normal'
-        }
+            )
+        )
     
     def visualize(self, frame: np.ndarray, result: Dict) -> np.ndarray:
         return frame
@@ -14,6 +14,7 @@ import time
 from .face_emotion import FaceEmotionDetector, MockFaceEmotionDetector
 from .posture_analyzer import PostureAnalyzer, MockPostureAnalyzer
 from .gaze_tracker import GazeTracker, MockGazeTracker
+from models.results import FaceResult, PostureResult, GazeResult, VisualState, VideoResult
 from utils.helpers import timeit, LatencyTracker
 
 
@@ -127,7 +128,7 @@ class VideoPipeline:
         self, 
         frame: np.ndarray, 
         timestamp: Optional[float] = None
-    ) -> Dict[str, any]:
+    ) -> VideoResult:
         """
         Process a single video frame through all vision models.
         
@@ -136,7 +137,7 @@ class VideoPipeline:
             timestamp: Frame timestamp in seconds
             
         Returns:
-            Dictionary containing:
+            VideoResult (dict-compatible) containing:
             - face_emotion: Facial expression results
             - posture: Posture analysis results
             - gaze: Gaze tracking results
@@ -181,19 +182,19 @@ class VideoPipeline:
             processing_time = (time.perf_counter() - start_time) * 1000
             self.latency_tracker.record('video_pipeline', processing_time)
             
-            return {
-                'face_emotion': face_result,
-                'posture': posture_result,
-                'gaze': gaze_result,
-                'visual_state': visual_state,
-                'processing_time_ms': processing_time
-            }
+            return VideoResult(
+                face_emotion=face_result,
+                posture=posture_result,
+                gaze=gaze_result,
+                visual_state=visual_state,
+                processing_time_ms=processing_time
+            )
             
         except Exception as e:
             logger.error(f"Error in video pipeline: {e}")
             return self._empty_result()
     
-    async def _run_face_detection(self, frame: np.ndarray) -> Dict:
+    async def _run_face_detection(self, frame: np.ndarray) -> FaceResult:
         """Run face emotion detection."""
         try:
             loop = asyncio.get_event_loop()
@@ -203,35 +204,29 @@ class VideoPipeline:
                 frame
             )
             # Log for debugging
-            if result.get('face_detected'):
-                logger.debug(f"Face detected: {result.get('primary_emotion')} (conf: {result.get('confidence', 0):.2f})")
+            if result.face_detected:
+                logger.debug(f"Face detected: {result.primary_emotion} (conf: {result.confidence:.2f})")
             return result
         except Exception as e:
             logger.error(f"Face detection error: {e}")
-            return {
-                'face_detected': False,
-                'primary_emotion': 'unknown',
-                'confidence': 0.0,
-                'valence': 0.0,
-                'arousal': 0.0
-            }
+            return FaceResult(face_detected=False)
     
-    async def _run_posture_analysis(self, frame: np.ndarray) -> Dict:
+    async def _run_posture_analysis(self, frame: np.ndarray) -> PostureResult:
         """Run posture analysis (async wrapper)."""
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, self.posture_analyzer.analyze, frame)
     
-    async def _run_gaze_tracking(self, frame: np.ndarray, timestamp: float) -> Dict:
+    async def _run_gaze_tracking(self, frame: np.ndarray, timestamp: float) -> GazeResult:
         """Run gaze tracking (async wrapper)."""
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, self.gaze_tracker.track, frame, timestamp)
     
     def _aggregate_results(
         self, 
-        face: Dict, 
-        posture: Dict, 
-        gaze: Dict
-    ) -> Dict:
+        face: FaceResult, 
+        posture: PostureResult, 
+        gaze: GazeResult
+    ) -> VisualState:
         """
         Aggregate vision results into unified emotional state.
         
@@ -239,13 +234,13 @@ class VideoPipeline:
         a holistic visual emotional assessment.
         """
         # Extract primary signals
-        primary_emotion = face.get('primary_emotion', 'unknown')
-        face_confidence = face.get('confidence', 0.0)
-        posture_state = posture.get('posture_state', 'unknown')
-        gaze_pattern = gaze.get('gaze_pattern', 'unknown')
+        primary_emotion = face.primary_emotion
+        face_confidence = face.confidence
+        posture_state = posture.posture_state
+        gaze_pattern = gaze.gaze_pattern
         
         # Calculate valence and arousal
-        if face.get('face_detected', False) and primary_emotion != 'unknown':
+        if face.face_detected and primary_emotion != 'unknown':
             valence, arousal = self.face_detector.get_emotion_valence_arousal(primary_emotion)
         else:
             valence, arousal = 0.0, 0.0
@@ -277,15 +272,15 @@ class VideoPipeline:
             primary_emotion, posture_state, gaze_pattern, valence, arousal
         )
         
-        return {
-            'primary_emotion': primary_emotion,
-            'emotion_confidence': face_confidence,
-            'posture_state': posture_state,
-            'gaze_pattern': gaze_pattern,
-            'valence': valence,
-            'arousal': arousal,
-            'overall_state': overall_state
-        }
+        return VisualState(
+            primary_emotion=primary_emotion,
+            emotion_confidence=face_confidence,
+            posture_state=posture_state,
+            gaze_pattern=gaze_pattern,
+            valence=valence,
+            arousal=arousal,
+            overall_state=overall_state
+        )
     
     def _classify_overall_state(
         self,
@@ -323,20 +318,14 @@ class VideoPipeline:
         else:
             return 'neutral'
     
-    def _empty_result(self) -> Dict:
+    def _empty_result(self) -> VideoResult:
         """Return empty result for skipped/failed frames."""
-        return {
-            'face_emotion': {'face_detected': False},
-            'posture': {'pose_detected': False},
-            'gaze': {'face_detected': False},
-            'visual_state': {
-                'primary_emotion': 'unknown',
-                'overall_state': 'unknown',
-                'valence': 0.0,
-                'arousal': 0.0
-            },
-            'processing_time_ms': 0.0
-        }
+        return VideoResult(
+            face_emotion=FaceResult(face_detected=False),
+            posture=PostureResult(pose_detected=False),
+            gaze=GazeResult(face_detected=False),
+            visual_state=VisualState()
+        )
     
     def visualize(self, frame: np.ndarray, result: Dict) -> np.ndarray:
         """
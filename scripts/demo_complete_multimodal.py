@@ -99,7 +99,7 @@ class MultimodalDemo:
         if self.tts and self.tts_enabled:
             greeting = "Hello! I'm your empathy agent. I can see and hear you."
             print(f"\n🔊 {greeting}")
-            self.tts.synthesize(greeting)
+            sd.play(self.tts.synthesize(greeting), self.tts.sample_rate)
     
     async def process_frame(self) -> Optional[dict]:
         """Process one video frame."""
@@ -178,7 +178,8 @@ class MultimodalDemo:
         # Speak response
         if self.tts and self.tts_enabled and response:
             emotion = fused_state.get('overall_emotion', None)
-            self.tts.synthesize(response, emotion_override=emotion)
+            audio = await asyncio.wrap_future(self.tts.submit(response, emotion_override=emotion))
+            sd.play(audio, self.tts.sample_rate)
         
         return response
     
@@ -96,14 +96,13 @@ async def main():
                         transcription_buffer.append(transcribed)
                         print(f"\n📝 Transcribed: \"{transcribed}\"")
                         
-                        # Generate response
-                        response_text, response_audio = await agent.handle_user_speech(transcribed)
-                        print(f"🤖 Response: \"{response_text}\"")
-                        
-                        # Play response
-                        if sd:
-                            sd.play(response_audio, agent.tts.sample_rate)
-                            sd.wait()
+                        # Play each sentence as soon as it is synthesized
+                        loop = asyncio.get_running_loop()
+                        async for segment, segment_audio in agent.stream_response(user_text=transcribed):
+                            print(f"🤖 Response: \"{segment}\"")
+                            if sd:
+                                sd.play(segment_audio, agent.tts.sample_rate)
+                                await loop.run_in_executor(None, sd.wait)
                 
                 await asyncio.sleep(0.01)
     
@@ -112,6 +111,7 @@ async def main():
         nonlocal frame_count
         
         intervention_check_counter = 0
+        fused_state = None
         
         while True:
             ret, frame = cap.read()
@@ -123,15 +123,18 @@ async def main():
             
             # Process video
             timestamp = frame_count / 30.0
-            visual_state = await agent.process_video_frame(frame_rgb, timestamp)
+            await agent.process_video_frame(frame_rgb, timestamp)
             
             # Get latest audio state (from background thread)
             # For demo simplicity, create dummy audio
             dummy_audio = np.random.randn(chunk_samples).astype(np.float32) * 0.01
-            audio_result = await agent.process_audio_chunk(dummy_audio, timestamp)
+            await agent.process_audio_chunk(dummy_audio, timestamp)
             
-            # Fuse
-            fused_state = await agent.process_multimodal(visual_state, audio_result)
+            # Fuse at the scheduler's rate; between fusions keep the last state
+            fused_state = await agent.fuse_scheduled(timestamp) or fused_state
+            if fused_state is None:
+                frame_count += 1
+                continue
             
             # Display info every 30 frames
             if frame_count % 30 == 0:
@@ -1,22 +1,32 @@
 """Test suite for main agent."""
 
+import time
 import pytest
 import asyncio
 import numpy as np
+from collections.abc import Mapping
 from pathlib import Path
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from agents import EmpathyAgent
+from models.results import AudioState, VisualState
+from models.fusion import TemporalSmoother
 from config import config
+from memory.profile_store import SQLiteProfileStore
 
 
 @pytest.fixture
-def agent():
-    """Create test agent."""
+def agent(tmp_path, monkeypatch):
+    """Create test agent with its profile storage under tmp_path."""
+    monkeypatch.setitem(config.memory['user_profile'], 'db_path', str(tmp_path / 'profiles.db'))
+    monkeypatch.setitem(config.memory, 'user_profiles_path', str(tmp_path / 'profiles'))
+    monkeypatch.setattr(SQLiteProfileStore, '_shared', None)
     agent = EmpathyAgent('test_user', persona='remote_worker', use_mock=True)
-    return agent
+    yield agent
+    if SQLiteProfileStore._shared is not None:
+        SQLiteProfileStore._shared.close()
 
 
 @pytest.fixture
@@ -56,7 +66,7 @@ async def test_process_video_frame(agent, test_frame):
     
     visual_state = await agent.process_video_frame(test_frame, timestamp=0.0)
     
-    assert isinstance(visual_state, dict)
+    assert isinstance(visual_state, Mapping)
     assert 'valence' in visual_state
     assert 'arousal' in visual_state
 
@@ -68,7 +78,7 @@ async def test_process_audio_chunk(agent, test_audio):
     
     audio_result = await agent.process_audio_chunk(test_audio, timestamp=0.0)
     
-    assert isinstance(audio_result, dict)
+    assert isinstance(audio_result, Mapping)
     assert 'audio_state' in audio_result
 
 
@@ -91,6 +101,97 @@ async def test_multimodal_fusion(agent, test_frame, test_audio):
     assert 'authenticity_score' in fused_state
 
 
+@pytest.mark.asyncio
+async def test_scheduled_fusion(agent, test_frame, test_audio):
+    """Test fusion scheduled from buffered, timestamped inputs."""
+    await agent.start_session('test_session')
+    
+    # Nothing buffered yet
+    assert await agent.fuse_scheduled() is None
+    
+    await agent.process_video_frame(test_frame, timestamp=0.0)
+    await agent.process_audio_chunk(test_audio, timestamp=0.0)
+    
+    fused_state = await agent.fuse_scheduled(now=0.2)
+    assert fused_state is not None
+    assert 'primary_emotion' in fused_state
+    assert 'visual_staleness' in fused_state
+    assert 'audio_staleness' in fused_state
+    
+    # Same inputs again: not fused twice
+    assert await agent.fuse_scheduled(now=0.5) is None
+
+
+@pytest.mark.asyncio
+async def test_repeated_fusion_reuses_result(agent, test_frame, test_audio):
+    """Test identical inputs skip the fusion forward pass."""
+    await agent.start_session('test_session')
+    
+    visual_state = await agent.process_video_frame(test_frame, timestamp=0.0)
+    audio_result = await agent.process_audio_chunk(test_audio, timestamp=0.0)
+    
+    first = await agent.process_multimodal(visual_state, audio_result)
+    second = await agent.process_multimodal(visual_state, audio_result)
+    
+    # Smoothing still runs, so the steady state matches up to rounding
+    assert second == pytest.approx(first)
+    stats = agent.get_fusion_stats()
+    assert stats['cache_hits'] == 1
+    assert stats['cache_misses'] == 1
+
+
+@pytest.mark.asyncio
+async def test_smoothing_advances_on_fusion_cache_hits(agent):
+    """Test a reused fusion result still moves the smoothed state."""
+    await agent.start_session('test_session')
+    audio_result = {'audio_state': AudioState()}
+    
+    neutral = VisualState(valence=0.0, primary_emotion='neutral')
+    sad = VisualState(valence=-0.8, arousal=0.3, primary_emotion='sad')
+    await agent.process_multimodal(neutral, audio_result)
+    for _ in range(30):
+        state = await agent.process_multimodal(sad, audio_result)
+    assert agent.get_fusion_stats()['cache_hits'] == 29
+    
+    # Same as smoothing every fused result
+    reference = TemporalSmoother(window_size=30, alpha=0.2)
+    reference.smooth(agent.fusion_engine.fuse(neutral, audio_result['audio_state']))
+    sad_fused = agent.fusion_engine.fuse(sad, audio_result['audio_state'])
+    for _ in range(30):
+        expected = reference.smooth(sad_fused)
+    assert state['valence'] == pytest.approx(expected.valence, abs=1e-9)
+    assert state['emotion_stability'] == pytest.approx(expected.emotion_stability, abs=1e-9)
+
+
+@pytest.mark.asyncio
+async def test_smoothing_batched_across_agents(agent, monkeypatch):
+    """Test sessions fused in the same loop iteration share one smoothing batch."""
+    other = EmpathyAgent('other_user', persona='remote_worker', use_mock=True, llm_service=agent.llm_service)
+    assert other.smoother_bank is agent.smoother_bank
+    
+    batches = []
+    smooth_batch = agent.smoother_bank.smooth_batch
+    
+    def recording_smooth_batch(emotions):
+        batches.append(sorted(emotions))
+        return smooth_batch(emotions)
+    
+    monkeypatch.setattr(agent.smoother_bank, 'smooth_batch', recording_smooth_batch)
+    audio_result = {'audio_state': AudioState(arousal=0.4)}
+    
+    for _ in range(3):
+        states = await asyncio.gather(
+            agent.process_multimodal(VisualState(valence=0.5, primary_emotion='happy'), audio_result),
+            other.process_multimodal(VisualState(valence=-0.5, primary_emotion='sad'), audio_result)
+        )
+        assert states == [agent.current_emotional_state, other.current_emotional_state]
+    
+    assert batches == [sorted([agent._smoother_key, other._smoother_key])] * 3
+    bank = agent.smoother_bank
+    assert bank.count[bank._slots[agent._smoother_key]] == bank.count[bank._slots[other._smoother_key]] == 3
+    await other.cleanup()
+
+
 @pytest.mark.asyncio
 async def test_generate_response(agent, test_frame, test_audio):
     """Test response generation."""
@@ -142,6 +243,210 @@ async def test_handle_user_speech(agent, test_frame, test_audio):
     assert isinstance(response_audio, np.ndarray)
 
 
+@pytest.mark.asyncio
+async def test_handle_user_speech_synthesizes_while_generating(agent, monkeypatch):
+    """Test the first sentence is synthesized before the reply finishes generating."""
+    events = []
+    
+    def slow_stream(prompt, **kwargs):
+        for i in range(3):
+            time.sleep(0.1)
+            events.append(f'token {i}')
+            yield f"This is sentence {i}. "
+    
+    def synthesize(text):
+        events.append(text)
+        return np.zeros(160, dtype=np.float32)
+    
+    monkeypatch.setattr(agent.llm, 'generate_stream', slow_stream)
+    monkeypatch.setattr(agent, '_synthesize_blocking', synthesize)
+    await agent.start_session('test_session')
+    agent.current_emotional_state = {'valence': 0.0, 'arousal': 0.5, 'primary_emotion': 'neutral'}
+    
+    text, audio = await agent.handle_user_speech("Hello")
+    
+    assert text == "This is sentence 0. This is sentence 1. This is sentence 2."
+    assert len(audio) == 3 * 160
+    assert events.index("This is sentence 0.") < events.index('token 2')
+
+
+@pytest.mark.asyncio
+async def test_stream_response(agent, test_frame, test_audio):
+    """Test streamed generation yields synthesized segments in order."""
+    await agent.start_session('test_session')
+    
+    visual_state = await agent.process_video_frame(test_frame, timestamp=0.0)
+    audio_result = await agent.process_audio_chunk(test_audio, timestamp=0.0)
+    await agent.process_multimodal(visual_state, audio_result)
+    
+    segments = []
+    async for text, audio in agent.stream_response(user_text="Hello"):
+        assert isinstance(audio, np.ndarray)
+        segments.append(text)
+    
+    assert len(segments) > 0
+    assert " ".join(segments) == "I'm here to support you."
+    
+    # Response recorded in history like generate_response
+    history = agent.prompt_builder.conversation_history
+    assert history[-2]['content'] == "Hello"
+    assert history[-1]['content'] == "I'm here to support you."
+
+
+@pytest.mark.asyncio
+async def test_synthesis_serialized_across_responses(agent, monkeypatch):
+    """Test overlapping responses never run the TTS model concurrently."""
+    import threading
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    
+    def synthesize(text):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return np.zeros(160, dtype=np.float32)
+    
+    monkeypatch.setattr(agent, '_synthesize_blocking', synthesize)
+    
+    async def consume():
+        return [text async for text, _ in agent.stream_response(user_text="Hello")]
+    
+    await agent.start_session('test_session')
+    agent.current_emotional_state = {'valence': 0.0, 'arousal': 0.5, 'primary_emotion': 'neutral'}
+    await asyncio.gather(consume(), *(agent.synthesize_speech(f"Line {i}.") for i in range(4)))
+    assert peak == 1
+
+
+@pytest.mark.asyncio
+async def test_history_summarized_in_background(agent, test_frame, test_audio):
+    """Test older turns are folded into a summary after responses."""
+    await agent.start_session('test_session')
+    
+    visual_state = await agent.process_video_frame(test_frame, timestamp=0.0)
+    audio_result = await agent.process_audio_chunk(test_audio, timestamp=0.0)
+    await agent.process_multimodal(visual_state, audio_result)
+    
+    for i in range(4):
+        await agent.generate_response(user_text=f"Message {i}")
+    await agent._summary_task
+    
+    builder = agent.prompt_builder
+    assert builder.conversation_summary
+    assert len(builder.conversation_history) < 8
+    assert agent.summarizer.summaries == 1
+
+
+@pytest.mark.asyncio
+async def test_early_prefill_on_speech_start(agent, test_frame, test_audio, monkeypatch):
+    """Test speech start prefills the reply prompt head."""
+    await agent.start_session('test_session')
+    
+    visual_state = await agent.process_video_frame(test_frame, timestamp=0.0)
+    audio_result = await agent.process_audio_chunk(test_audio, timestamp=0.0)
+    await agent.process_multimodal(visual_state, audio_result)
+    
+    prefilled = []
+    monkeypatch.setattr(agent.llm, 'prefill', lambda text, prefix=None: prefilled.append(text))
+    
+    agent._start_early_prefill()
+    await agent._prefill_task
+    
+    assert len(prefilled) == 1
+    prompt = agent._build_response_prompt("Hello", None)
+    assert prompt.startswith(prefilled[0].split("Emotional Context")[0])
+
+
+@pytest.mark.asyncio
+async def test_early_prefill_keeps_running_response(agent, test_frame, test_audio, monkeypatch):
+    """Test speech start with barge-in off neither supersedes nor cuts the reply."""
+    await agent.start_session('test_session')
+    
+    visual_state = await agent.process_video_frame(test_frame, timestamp=0.0)
+    audio_result = await agent.process_audio_chunk(test_audio, timestamp=0.0)
+    await agent.process_multimodal(visual_state, audio_result)
+    
+    def slow_stream(prompt, **kwargs):
+        for i in range(3):
+            time.sleep(0.02)
+            yield f"This is sentence {i}. "
+    
+    prefilled = []
+    monkeypatch.setattr(agent.llm, 'generate_stream', slow_stream)
+    monkeypatch.setattr(agent.llm, 'prefill', lambda text, prefix=None: prefilled.append(text))
+    monkeypatch.setattr(agent, 'barge_in_enabled', False)
+    superseded_before = agent.llm_service.get_stats()['superseded']
+    
+    stream = agent.stream_response(user_text="Hello")
+    segments = [(await stream.__anext__())[0]]
+    
+    process_audio = agent.audio_pipeline.process_audio
+    
+    async def speech_start(audio, timestamp):
+        result = await process_audio(audio, timestamp)
+        result['vad'] = dict(result['vad'], event='start')
+        return result
+    
+    monkeypatch.setattr(agent.audio_pipeline, 'process_audio', speech_start)
+    result = await agent.process_audio_chunk(test_audio, timestamp=1.0)
+    assert 'barge_in' not in result
+    
+    segments += [text async for text, _ in stream]
+    assert segments == [f"This is sentence {i}." for i in range(3)]
+    await agent._prefill_task
+    assert len(prefilled) == 1
+    assert agent.llm_service.get_stats()['superseded'] == superseded_before
+
+
+@pytest.mark.asyncio
+async def test_barge_in_interrupts_response(agent, test_frame, test_audio, monkeypatch):
+    """Test speech start cancels generation and queued synthesis and reports it."""
+    await agent.start_session('test_session')
+    
+    visual_state = await agent.process_video_frame(test_frame, timestamp=0.0)
+    audio_result = await agent.process_audio_chunk(test_audio, timestamp=0.0)
+    await agent.process_multimodal(visual_state, audio_result)
+    
+    def slow_stream(prompt, **kwargs):
+        for i in range(50):
+            time.sleep(0.02)
+            yield f"This is sentence {i}. "
+    
+    monkeypatch.setattr(agent.llm, 'generate_stream', slow_stream)
+    interrupted_before = agent.llm_service.get_stats()['interrupted']
+    
+    stream = agent.stream_response(user_text="Hello")
+    text, audio = await stream.__anext__()
+    assert text == "This is sentence 0."
+    
+    process_audio = agent.audio_pipeline.process_audio
+    
+    async def speech_start(audio, timestamp):
+        result = await process_audio(audio, timestamp)
+        result['vad'] = dict(result['vad'], event='start')
+        return result
+    
+    monkeypatch.setattr(agent.audio_pipeline, 'process_audio', speech_start)
+    result = await agent.process_audio_chunk(test_audio, timestamp=1.0)
+    
+    event = result['barge_in']
+    assert event['response_cancelled'] and event['llm_cancelled'] and event['stop_playback']
+    assert [segment async for segment in stream] == []
+    assert agent.llm_service.get_stats()['interrupted'] == interrupted_before + 1
+    assert agent.barge_ins == 1
+    
+    # Interrupted response is not recorded; nothing left to interrupt
+    assert not agent.prompt_builder.conversation_history
+    result = await agent.process_audio_chunk(test_audio, timestamp=2.0)
+    assert 'barge_in' not in result
+    if agent._prefill_task is not None:
+        await agent._prefill_task
+
+
 @pytest.mark.asyncio
 async def test_intervention_check(agent, test_frame, test_audio):
     """Test intervention trigger checking."""
@@ -160,6 +465,87 @@ async def test_intervention_check(agent, test_frame, test_audio):
     assert intervention_type is None or isinstance(intervention_type, str)
 
 
+@pytest.mark.asyncio
+async def test_declining_trend_summary_off_loop(agent, monkeypatch):
+    """Test the declining-trend check reads the session summary in the executor."""
+    import threading
+    await agent.start_session('test_session')
+    agent.current_emotional_state = {'authenticity_score': 1.0, 'valence': 0.0, 'trend': 'declining'}
+    
+    threads = []
+    def summary(window_minutes=30):
+        threads.append(threading.get_ident())
+        return {'avg_valence': -0.5}
+    monkeypatch.setattr(agent.session_memory, 'get_emotional_summary', summary)
+    monkeypatch.setattr(agent.user_profile, 'should_intervene', lambda trigger: True)
+    
+    assert await agent.check_intervention_triggers() == 'declining_mood'
+    assert threads and threads[0] != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_proactive_intervention_cache(agent, test_frame, test_audio, monkeypatch):
+    """Test interventions are served from the response cache once warm."""
+    from memory import InterventionResponseCache
+    await agent.start_session('test_session')
+    
+    visual_state = await agent.process_video_frame(test_frame, timestamp=0.0)
+    audio_result = await agent.process_audio_chunk(test_audio, timestamp=0.0)
+    await agent.process_multimodal(visual_state, audio_result)
+    
+    async def trigger():
+        return 'declining_mood'
+    agent.check_intervention_triggers = trigger
+    agent.response_cache = InterventionResponseCache(variants_per_key=1)
+    
+    # Cached responses are shared across users: no conversation in the prompt
+    agent.prompt_builder.add_to_history('user', 'My password is hunter2')
+    agent.prompt_builder.conversation_summary = 'User talked about a private matter'
+    prompts = []
+    generate = agent.llm_service.generate
+    
+    async def recording_generate(session_id, prompt, *args, **kwargs):
+        prompts.append(prompt)
+        return await generate(session_id, prompt, *args, **kwargs)
+    monkeypatch.setattr(agent.llm_service, 'generate', recording_generate)
+    
+    text, audio = await agent.proactive_intervention()
+    assert agent.response_cache.get_stats()['misses'] == 1
+    assert 'hunter2' not in prompts[0]
+    assert 'private matter' not in prompts[0]
+    
+    cached_text, cached_audio = await agent.proactive_intervention()
+    assert cached_text == text
+    assert np.array_equal(cached_audio, audio)
+    assert agent.response_cache.get_stats()['hits'] == 1
+    assert len(agent.session_memory.interventions) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_intervention_is_dropped(agent, monkeypatch):
+    """Test a superseded intervention is neither synthesized, played nor cached."""
+    from llm import RequestCancelled
+    from memory import InterventionResponseCache
+    await agent.start_session('test_session')
+    agent.current_emotional_state = {'valence': -0.5, 'arousal': 0.5, 'primary_emotion': 'sad'}
+    
+    async def trigger():
+        return 'declining_mood'
+    
+    async def cancelled(*args, **kwargs):
+        raise RequestCancelled('superseded')
+    
+    agent.check_intervention_triggers = trigger
+    agent.response_cache = InterventionResponseCache(variants_per_key=1)
+    monkeypatch.setattr(agent.llm_service, 'generate', cancelled)
+    monkeypatch.setattr(agent, '_synthesize_blocking', lambda text: pytest.fail("synthesized"))
+    
+    assert await agent.proactive_intervention() is None
+    assert agent._playback_until == 0.0
+    assert agent.response_cache.get_stats()['entries'] == 0
+    assert agent.session_memory.interventions == []
+
+
 @pytest.mark.asyncio
 async def test_session_summary(agent, test_frame, test_audio):
     """Test session summary generation."""
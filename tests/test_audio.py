@@ -200,6 +200,26 @@ async def test_audio_pipeline_speech_buffering(audio_pipeline, test_audio):
     assert result3 is not None
 
 
+@pytest.mark.asyncio
+async def test_audio_pipeline_result_types(audio_pipeline, test_audio):
+    """Test results are slotted objects with dict-style access."""
+    result = await audio_pipeline.process_audio(test_audio, timestamp=0.0)
+    
+    assert not hasattr(result, '__dict__')
+    assert not hasattr(result['audio_state'], '__dict__')
+    assert 'barge_in' not in result
+    
+    result['barge_in'] = {'type': 'barge_in'}
+    assert result['barge_in'] == {'type': 'barge_in'}
+    assert 'barge_in' in result.keys()
+    with pytest.raises(KeyError):
+        result['unknown'] = 1
+    
+    assert len(result) == len(result.keys())
+    assert dict(result) == result
+    assert dict(result['audio_state']) == result['audio_state'].to_dict()
+
+
 def test_audio_pipeline_reset(audio_pipeline):
     """Test pipeline reset."""
     audio_pipeline.reset()
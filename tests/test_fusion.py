@@ -13,7 +13,9 @@ from models.fusion import (
     MockFusionEngine,
     FusedEmotion,
     TemporalSmoother,
-    SmoothedEmotion
+    SmoothedEmotion,
+    TemporalSmootherBank,
+    FusionScheduler
 )
 
 
@@ -111,6 +113,28 @@ def test_conflict_detection(visual_state, conflicting_audio):
     assert isinstance(result.authenticity_score, float)
 
 
+def test_fusion_skips_unchanged_inputs(visual_state, audio_state):
+    """Test the forward pass is skipped when features are unchanged."""
+    engine = FusionEngine(device='cpu')
+    
+    first = engine.fuse(visual_state, audio_state)
+    second = engine.fuse(dict(visual_state), dict(audio_state))
+    
+    assert second is first
+    assert engine.last_cache_hit
+    
+    # Material change runs the model again
+    changed = dict(visual_state, valence=-0.5)
+    third = engine.fuse(changed, audio_state)
+    assert third is not first
+    assert not engine.last_cache_hit
+    
+    stats = engine.get_cache_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+    assert stats['hit_rate'] == pytest.approx(1 / 3)
+
+
 # Temporal Smoother Tests
 def test_temporal_smoother_initialization():
     """Test smoother initialization."""
@@ -256,5 +280,231 @@ def test_smoother_reset():
     assert len(smoother.valence_history) == 0
 
 
+def test_incremental_statistics_match_full_window():
+    """Test running statistics agree with recomputing over the window."""
+    smoother = TemporalSmoother(window_size=12, alpha=0.3)
+    rng = np.random.default_rng(0)
+    
+    valences, arousals, labels = [], [], []
+    for i in range(60):
+        valence = float(rng.uniform(-1, 1))
+        arousal = float(rng.uniform(0, 1))
+        label = ['happy', 'sad', 'neutral'][i % 3] if i < 30 else 'happy'
+        smoother.smooth(FusedEmotion(
+            valence=valence, arousal=arousal, dominance=0.0,
+            primary_emotion=label, confidence=0.8, authenticity_score=1.0,
+            visual_weight=0.5, audio_weight=0.5
+        ))
+        valences.append(valence)
+        arousals.append(arousal)
+        labels.append(label)
+        
+        assert smoother._valence_stats.variance == pytest.approx(np.var(valences[-12:]))
+        assert smoother._arousal_stats.variance == pytest.approx(np.var(arousals[-12:]))
+        if len(valences) >= 10:
+            expected_slope = np.polyfit(np.arange(10), valences[-10:], 1)[0]
+            assert smoother._valence_slope.slope == pytest.approx(expected_slope)
+    
+    assert smoother._get_majority_emotion() == 'happy'
+    assert smoother.get_sustained_emotion(duration_frames=10) == 'happy'
+
+
+def test_kalman_filter_mode():
+    """Test Kalman filtering converges on a constant signal."""
+    smoother = TemporalSmoother(window_size=10, filter_type='kalman')
+    
+    for i in range(20):
+        smoothed = smoother.smooth(FusedEmotion(
+            valence=0.4, arousal=0.6, dominance=0.1,
+            primary_emotion='happy', confidence=0.8, authenticity_score=1.0,
+            visual_weight=0.5, audio_weight=0.5
+        ))
+    
+    assert smoothed.valence == pytest.approx(0.4)
+    assert smoothed.arousal == pytest.approx(0.6)
+    
+    with pytest.raises(ValueError):
+        TemporalSmoother(filter_type='median')
+
+
+# Smoother Bank Tests
+def test_smoother_bank_matches_single_smoother():
+    """Test batched smoothing matches per-session TemporalSmoother."""
+    bank = TemporalSmootherBank(window_size=12, alpha=0.3, initial_capacity=2)
+    smoothers = {f'session_{i}': TemporalSmoother(window_size=12, alpha=0.3) for i in range(4)}
+    rng = np.random.default_rng(1)
+    
+    for step in range(40):
+        batch = {}
+        for session_id in smoothers:
+            if rng.random() < 0.7:
+                batch[session_id] = FusedEmotion(
+                    valence=float(rng.uniform(-1, 1)), arousal=float(rng.uniform(0, 1)),
+                    dominance=0.0, primary_emotion=str(rng.choice(['sad', 'happy', 'neutral'])),
+                    confidence=0.8,
+                    authenticity_score=float(rng.uniform(0, 1)),
+                    visual_weight=0.5, audio_weight=0.5
+                )
+        
+        results = bank.smooth_batch(batch)
+        assert set(results) == set(batch)
+        
+        for session_id, fused in batch.items():
+            expected = smoothers[session_id].smooth(fused)
+            actual = results[session_id]
+            assert isinstance(actual, SmoothedEmotion)
+            assert actual.valence == pytest.approx(expected.valence)
+            assert actual.emotion_stability == pytest.approx(expected.emotion_stability)
+            assert actual.authenticity_score == pytest.approx(expected.authenticity_score)
+            assert actual.trend == expected.trend
+            assert actual.primary_emotion == expected.primary_emotion
+    
+    # Capacity grows past the initial allocation
+    assert len(bank) == 4
+    assert bank.capacity >= 4
+
+
+def test_smoother_majority_ties_go_to_latest_label():
+    """Test both smoothers break majority ties the same way."""
+    bank = TemporalSmootherBank(window_size=4)
+    smoother = TemporalSmoother(window_size=4)
+    
+    for label in ['happy', 'sad', 'sad', 'happy']:
+        fused = FusedEmotion(
+            valence=0.0, arousal=0.5, dominance=0.0, primary_emotion=label,
+            confidence=0.8, authenticity_score=1.0, visual_weight=0.5, audio_weight=0.5
+        )
+        expected = smoother.smooth(fused)
+        actual = bank.smooth('a', fused)
+        assert actual.primary_emotion == expected.primary_emotion == label
+
+
+def test_smoother_bank_variance_precision():
+    """Test windowed variance stays accurate for small spreads around a large mean."""
+    bank = TemporalSmootherBank(window_size=30)
+    rng = np.random.default_rng(3)
+    values = 0.9 + rng.normal(0, 1e-7, 5000)
+    
+    for value in values:
+        bank.smooth('a', FusedEmotion(
+            valence=float(value), arousal=0.5, dominance=0.0, primary_emotion='neutral',
+            confidence=0.8, authenticity_score=1.0, visual_weight=0.5, audio_weight=0.5
+        ))
+    
+    slot = bank._slots['a']
+    variance = bank.valence_m2[slot] / bank.count[slot]
+    assert variance == pytest.approx(np.var(values[-30:]), rel=1e-3)
+
+
+@pytest.mark.asyncio
+async def test_smoother_bank_batches_submissions():
+    """Test results submitted in one loop iteration are smoothed together, in order."""
+    import asyncio
+    
+    bank = TemporalSmootherBank(window_size=10)
+    reference = {sid: TemporalSmoother(window_size=10) for sid in ('a', 'b')}
+    calls = []
+    smooth_batch = bank.smooth_batch
+    bank.smooth_batch = lambda emotions: calls.append(list(emotions)) or smooth_batch(emotions)
+    
+    def fused(valence):
+        return FusedEmotion(
+            valence=valence, arousal=0.5, dominance=0.0, primary_emotion='neutral',
+            confidence=0.8, authenticity_score=1.0, visual_weight=0.5, audio_weight=0.5
+        )
+    
+    submitted = [('a', 0.1), ('b', -0.4), ('a', 0.6)]
+    results = await asyncio.gather(*(bank.submit(sid, fused(v)) for sid, v in submitted))
+    
+    # A repeated session goes into a second batch, after its first result
+    assert calls == [['a', 'b'], ['a']]
+    for (sid, valence), result in zip(submitted, results):
+        assert result.valence == pytest.approx(reference[sid].smooth(fused(valence)).valence)
+
+
+def test_smoother_bank_shared_per_settings():
+    """Test the worker-wide bank is keyed by its window and alpha."""
+    class StubConfig:
+        def __init__(self, values):
+            self.values = values
+        
+        def get(self, path, default=None):
+            return self.values.get(path, default)
+    
+    first = TemporalSmootherBank.shared(StubConfig({'models.fusion.temporal_window': 7}))
+    assert TemporalSmootherBank.shared(StubConfig({'models.fusion.temporal_window': 7})) is first
+    second = TemporalSmootherBank.shared(StubConfig({'models.fusion.temporal_window': 9}))
+    assert (first.window_size, second.window_size) == (7, 9)
+
+
+def test_smoother_bank_session_lifecycle():
+    """Test adding, resetting and removing sessions."""
+    bank = TemporalSmootherBank(window_size=10)
+    fused = FusedEmotion(
+        valence=0.5, arousal=0.5, dominance=0.0, primary_emotion='happy',
+        confidence=0.8, authenticity_score=1.0, visual_weight=0.5, audio_weight=0.5
+    )
+    
+    for i in range(10):
+        bank.smooth('a', fused)
+    assert bank.get_sustained_emotion('a', duration_frames=10) == 'happy'
+    
+    bank.reset_session('a')
+    assert bank.get_sustained_emotion('a', duration_frames=10) is None
+    
+    bank.remove_session('a')
+    assert 'a' not in bank
+    assert bank.get_sustained_emotion('a') is None
+
+
+# Fusion Scheduler Tests
+def test_fusion_scheduler_rate_limit():
+    """Test fusion is capped at the configured rate."""
+    scheduler = FusionScheduler(rate_hz=10, jitter_delay_ms=0)
+    
+    fusions = 0
+    # 30 fps video for one second
+    for i in range(30):
+        t = i / 30
+        scheduler.push_visual({'valence': 0.5}, t)
+        if scheduler.poll(t) is not None:
+            fusions += 1
+    
+    assert fusions <= 10
+    assert scheduler.get_stats()['skipped_not_due'] > 0
+
+
+def test_fusion_scheduler_no_new_input():
+    """Test nothing is fused when no new input arrived."""
+    scheduler = FusionScheduler(rate_hz=10, jitter_delay_ms=0)
+    scheduler.push_visual({'valence': 0.5}, 0.0)
+    
+    assert scheduler.poll(0.0) is not None
+    assert scheduler.poll(1.0) is None
+    assert scheduler.get_stats()['skipped_no_input'] == 1
+
+
+def test_fusion_scheduler_alignment_and_staleness():
+    """Test interpolation of numeric fields and staleness marking."""
+    scheduler = FusionScheduler(rate_hz=10, jitter_delay_ms=100, max_staleness_ms=1000)
+    
+    scheduler.push_visual({'valence': 0.0, 'primary_emotion': 'neutral'}, 0.0)
+    scheduler.push_visual({'valence': 1.0, 'primary_emotion': 'happy'}, 0.2)
+    scheduler.push_audio({'valence': -0.5, 'audio_emotion': 'sad'}, -2.0)
+    
+    aligned = scheduler.poll(now=0.2)
+    
+    # Aligned to t=0.1, halfway between the two visual samples
+    assert aligned.timestamp == pytest.approx(0.1)
+    assert aligned.visual_state['valence'] == pytest.approx(0.5)
+    assert aligned.visual_state['primary_emotion'] == 'neutral'
+    assert not aligned.visual_stale
+    
+    # Audio is 2.1s old: marked stale and dropped
+    assert aligned.audio_staleness == pytest.approx(2.1)
+    assert aligned.audio_stale
+    assert aligned.audio_state == {}
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
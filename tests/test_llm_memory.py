@@ -1,15 +1,30 @@
 """Test suite for LLM and memory modules."""
 
+import json
+import time
+import shutil
+import socket
+import sqlite3
+import subprocess
+import threading
 import pytest
+import numpy as np
 from pathlib import Path
 import sys
 from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from llm import LlamaClient, MockLlamaClient, PromptBuilder
-from memory import SessionMemory, UserProfile, UserPreferences
+from llm import LlamaClient, MockLlamaClient, PromptBuilder, AsyncLlamaClient
+from llm import LLMService, RequestCancelled, ContextBudget, ConversationSummarizer
+from llm import LlamaServerClient
+from llm.llm_service import PRIORITY_USER_REPLY, PRIORITY_INTERVENTION
+from memory import SessionMemory, UserProfile, UserPreferences, InterventionResponseCache, EmotionTimeline, SQLiteProfileStore
+from memory import RedisStore
+from memory.storage import profile_store_from_config, session_store_from_config
 from config import config
+from utils.text_segmenter import SentenceSegmenter, SentenceLimiter, split_sentences
 
 
 # LLM Tests
@@ -40,7 +55,648 @@ def test_token_counting():
     assert count > 0
 
 
+class FakeLlama:
+    """Minimal stand-in for llama_cpp.Llama (one token per character)."""
+    
+    def __init__(self, *args, **kwargs):
+        self.input_ids = []
+        self.n_tokens = 0
+        self.evaluated = 0
+        self.draft_model = kwargs.get('draft_model')
+    
+    def tokenize(self, text, add_bos=True, special=True):
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        return list(text)
+    
+    def reset(self):
+        self.n_tokens = 0
+    
+    def eval(self, tokens):
+        self.input_ids = self.input_ids[:self.n_tokens] + list(tokens)
+        self.n_tokens = len(self.input_ids)
+        self.evaluated += len(tokens)
+    
+    def save_state(self):
+        return list(self.input_ids[:self.n_tokens])
+    
+    def load_state(self, state):
+        self.input_ids = list(state)
+        self.n_tokens = len(state)
+    
+    def __call__(self, prompt, **kwargs):
+        tokens = self.tokenize(prompt)
+        common = 0
+        for a, b in zip(self.input_ids[:self.n_tokens], tokens):
+            if a != b:
+                break
+            common += 1
+        self.n_tokens = min(common, len(tokens) - 1)
+        self.eval(tokens[self.n_tokens:])
+        if self.draft_model is not None:
+            self.draft_model(np.array([ord(c) for c in tokens], dtype=np.intc))
+        return {'choices': [{'text': ' Sounds good.'}], 'usage': {'completion_tokens': 3}}
+
+
+class FakePromptLookupDecoding:
+    """Stand-in for llama_cpp's prompt lookup drafter."""
+    
+    def __init__(self, max_ngram_size=2, num_pred_tokens=10):
+        self.num_pred_tokens = num_pred_tokens
+    
+    def __call__(self, input_ids, **kwargs):
+        return input_ids[-self.num_pred_tokens:]
+
+
+@pytest.fixture
+def fake_llama(monkeypatch):
+    """Install a fake llama_cpp module."""
+    import types
+    module = types.ModuleType('llama_cpp')
+    module.Llama = FakeLlama
+    speculative = types.ModuleType('llama_cpp.llama_speculative')
+    speculative.LlamaDraftModel = object
+    speculative.LlamaPromptLookupDecoding = FakePromptLookupDecoding
+    module.llama_speculative = speculative
+    monkeypatch.setitem(sys.modules, 'llama_cpp', module)
+    monkeypatch.setitem(sys.modules, 'llama_cpp.llama_speculative', speculative)
+    monkeypatch.delitem(sys.modules, 'llm.speculative', raising=False)
+    return module
+
+
+def test_prefix_state_reuse(fake_llama):
+    """Test the static persona prefix is prefilled once and restored."""
+    client = LlamaClient(model_path='fake.gguf')
+    builder = PromptBuilder(persona='student')
+    prefix = builder.get_static_prefix()
+    
+    client.warm_prefix(prefix)
+    evaluated_after_warmup = client.model.evaluated
+    
+    # Unrelated prompt replaces the model state
+    client.generate("Something else entirely")
+    
+    prompt = builder.build_prompt({'primary_emotion': 'sad'}, user_text="I'm tired")
+    before = client.model.evaluated
+    assert client.generate(prompt, prefix=prefix) == "Sounds good."
+    
+    # Only the dynamic suffix was evaluated
+    assert client.model.evaluated - before == len(prompt) - len(prefix)
+    assert evaluated_after_warmup == len(prefix)
+    
+    stats = client.get_prefix_cache_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['cached_prefixes'] == 1
+    assert stats['reused_tokens'] >= len(prefix)
+
+
+def test_speculative_decoding_stats(fake_llama):
+    """Test the draft model is wired in and acceptance is reported."""
+    client = LlamaClient(model_path='fake.gguf', speculative='prompt_lookup', num_draft_tokens=4)
+    assert client.model.draft_model is client.draft_model
+    
+    assert client.generate("Hello there") == "Sounds good."
+    
+    stats = client.get_speculative_stats()
+    assert stats['mode'] == 'prompt_lookup'
+    assert stats['draft_calls'] == 1
+    assert stats['drafted_tokens'] == 4
+    # 3 tokens generated: 1 from the prompt, 1 sampled, 1 accepted draft
+    assert stats['accepted_tokens'] == 1
+    assert stats['acceptance_rate'] == pytest.approx(0.25)
+    
+    # Unknown modes fall back to normal decoding
+    client = LlamaClient(model_path='fake.gguf', speculative='unknown')
+    assert client.draft_model is None
+    assert client.get_speculative_stats()['mode'] == 'off'
+
+
+def test_early_prefill_of_reply_head(fake_llama):
+    """Test a prefilled reply head leaves only the user text to evaluate."""
+    client = LlamaClient(model_path='fake.gguf')
+    builder = PromptBuilder(persona='remote_worker')
+    builder.add_to_history('user', 'Long day today.')
+    state = {'primary_emotion': 'sad', 'confidence': 0.7, 'valence': -0.4}
+    now = datetime(2024, 1, 1, 15)
+    prefix = builder.get_static_prefix()
+    
+    head = builder.get_reply_head(state, time_of_day=now)
+    prompt = builder.build_prompt(state, user_text="I'm exhausted", time_of_day=now)
+    assert prompt.startswith(head)
+    assert head.startswith(prefix)
+    
+    client.prefill(head, prefix=prefix)
+    before = client.model.evaluated
+    client.generate(prompt, prefix=prefix)
+    
+    assert client.model.evaluated - before == len(prompt) - len(head)
+    assert client.get_prefix_cache_stats()['early_prefill_tokens'] == len(head) - len(prefix)
+
+
+def test_prompt_starts_with_static_prefix():
+    """Test every prompt begins with the persona's static prefix."""
+    builder = PromptBuilder(persona='young_professional')
+    builder.add_to_history('user', 'Hello')
+    
+    prefix = builder.get_static_prefix()
+    for kwargs in ({'user_text': 'Hi'}, {'intervention_type': 'declining_mood'}, {}):
+        prompt = builder.build_prompt({'primary_emotion': 'neutral'}, **kwargs)
+        assert prompt.startswith(prefix)
+        assert 'confidence coach' in prefix
+
+
+class SlowStreamClient:
+    """Blocking client that decodes one token every 20ms."""
+    
+    def __init__(self):
+        self.tokens_produced = 0
+    
+    def generate_stream(self, prompt, **kwargs):
+        import time
+        for i in range(100):
+            time.sleep(0.02)
+            self.tokens_produced += 1
+            yield f"tok{i} "
+
+
+@pytest.mark.asyncio
+async def test_async_client_generate():
+    """Test async generation through the inference thread."""
+    client = AsyncLlamaClient(MockLlamaClient())
+    
+    response = await client.generate("Hello")
+    assert response == "I'm here to support you."
+    
+    tokens = [t async for t in client.stream("Hello")]
+    assert "".join(tokens).strip() == response
+    client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_async_client_does_not_block_loop():
+    """Test the event loop keeps running during generation, and cancellation."""
+    import asyncio
+    slow = SlowStreamClient()
+    client = AsyncLlamaClient(slow)
+    
+    ticks = 0
+    
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+    
+    ticker_task = asyncio.create_task(ticker())
+    generation = asyncio.create_task(client.generate("Hello"))
+    await asyncio.sleep(0.2)
+    
+    # Loop stayed responsive while decoding
+    assert ticks >= 5
+    assert client.busy
+    
+    generation.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await generation
+    ticker_task.cancel()
+    
+    # Decoding stops at the next token
+    produced = slow.tokens_produced
+    await asyncio.sleep(0.1)
+    assert slow.tokens_produced <= produced + 1
+    assert not client.busy
+    client.shutdown()
+
+
+class RecordingClient:
+    """Blocking client that records the order prompts are served in."""
+    
+    def __init__(self, tokens_per_prompt=5):
+        self.served = []
+        self.tokens_per_prompt = tokens_per_prompt
+    
+    def generate_stream(self, prompt, **kwargs):
+        import time
+        self.served.append(prompt)
+        for i in range(self.tokens_per_prompt):
+            time.sleep(0.02)
+            yield f"{prompt}{i} "
+
+
+@pytest.mark.asyncio
+async def test_llm_service_priority_order():
+    """Test user replies are served before queued interventions."""
+    import asyncio
+    client = RecordingClient()
+    service = LLMService(client)
+    
+    first = asyncio.create_task(service.generate('s0', 'u0'))
+    await asyncio.sleep(0.03)
+    intervention = asyncio.create_task(
+        service.generate('s1', 'i1', priority=PRIORITY_INTERVENTION, preemptible=False)
+    )
+    await asyncio.sleep(0)
+    reply = asyncio.create_task(service.generate('s2', 'u2', priority=PRIORITY_USER_REPLY))
+    
+    results = await asyncio.gather(first, intervention, reply)
+    assert client.served == ['u0', 'u2', 'i1']
+    assert results[2] == "u20 u21 u22 u23 u24"
+    assert service.get_stats()['completed'] == 3
+    service.shutdown()
+
+
+class PrefillRecordingClient(RecordingClient):
+    """Recording client that also records prefills."""
+    
+    def prefill(self, text, prefix=None):
+        self.served.append(f"prefill:{text}")
+
+
+@pytest.mark.asyncio
+async def test_llm_service_prefill():
+    """Test prefills run in order on the inference thread and are superseded."""
+    import asyncio
+    client = PrefillRecordingClient()
+    service = LLMService(client)
+    
+    await service.prefill('s0', 'head')
+    assert client.served == ['prefill:head']
+    
+    # A prefill still queued behind other work is dropped for the reply
+    busy = asyncio.create_task(service.generate('s1', 'other'))
+    await asyncio.sleep(0.01)
+    prefill = asyncio.create_task(service.prefill('s0', 'stale head'))
+    await asyncio.sleep(0)
+    reply = asyncio.create_task(service.generate('s0', 'reply'))
+    
+    with pytest.raises(RequestCancelled):
+        await prefill
+    await asyncio.gather(busy, reply)
+    assert client.served == ['prefill:head', 'other', 'reply']
+    service.shutdown()
+
+
+def test_llm_service_warm_prefix_on_inference_thread():
+    """Test prefix warm-up runs on the inference thread, not the caller's."""
+    import threading
+    
+    class WarmRecordingClient(RecordingClient):
+        def warm_prefix(self, prefix):
+            self.served.append((prefix, threading.current_thread().name))
+    
+    client = WarmRecordingClient()
+    service = LLMService(client)
+    service.warm_prefix('system').result(timeout=5)
+    
+    prefix, thread_name = client.served[0]
+    assert prefix == 'system'
+    assert thread_name.startswith('llm-inference')
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_llm_service_supersede_and_preempt():
+    """Test newer session requests supersede, and replies preempt interventions."""
+    import asyncio
+    client = RecordingClient(tokens_per_prompt=20)
+    service = LLMService(client)
+    
+    # Same session: the older request is cancelled
+    old = asyncio.create_task(service.generate('s0', 'old'))
+    await asyncio.sleep(0.05)
+    new = asyncio.create_task(service.generate('s0', 'new'))
+    with pytest.raises(RequestCancelled) as exc:
+        await old
+    assert exc.value.reason == 'superseded'
+    assert (await new).startswith('new0')
+    
+    # Other session: a user reply preempts a running intervention
+    intervention = asyncio.create_task(
+        service.generate('s1', 'checkin', priority=PRIORITY_INTERVENTION)
+    )
+    await asyncio.sleep(0.05)
+    reply = asyncio.create_task(service.generate('s2', 'reply'))
+    with pytest.raises(RequestCancelled) as exc:
+        await intervention
+    assert exc.value.reason == 'preempted'
+    assert (await reply).startswith('reply0')
+    
+    stats = service.get_stats()
+    assert stats['superseded'] == 1
+    assert stats['preempted'] == 1
+    assert stats['running'] == 0
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_llm_service_counts_failures():
+    """Test model errors reach the caller and are counted as failures, not abandonment."""
+    class FailingClient(RecordingClient):
+        def generate_stream(self, prompt, **kwargs):
+            yield 'partial'
+            raise RuntimeError("decode failed")
+    
+    service = LLMService(FailingClient())
+    with pytest.raises(RuntimeError, match="decode failed"):
+        await service.generate('s0', 'prompt')
+    
+    stats = service.get_stats()
+    assert stats['failed'] == 1
+    assert stats['abandoned'] == 0
+    assert stats['completed'] == 0
+    service.shutdown()
+
+
+# Text Segmenter Tests
+def test_sentence_segmenter_streaming():
+    """Test segments are emitted as soon as a sentence completes."""
+    segmenter = SentenceSegmenter()
+    
+    emitted = []
+    for token in ["That ", "sounds ", "really ", "hard.", " I'm ", "here ", "for ", "you."]:
+        emitted.extend(segmenter.feed(token))
+        if token == " I'm ":
+            assert emitted == ["That sounds really hard."]
+    
+    assert segmenter.flush() == "I'm here for you."
+
+
+def test_split_sentences_clause_fallback():
+    """Test long sentences are cut at clause boundaries."""
+    text = ("When everything piles up at once, it helps to pick one small task, "
+            "finish it, and then take a short break before the next one")
+    segments = split_sentences(text, max_chars=60)
+    
+    assert len(segments) > 1
+    assert " ".join(segments) == text
+
+
 # Prompt Builder Tests
+def test_sentence_limiter():
+    """Test text is cut after the sentence budget, mid-token if needed."""
+    limiter = SentenceLimiter(max_sentences=2)
+    passed = []
+    for token in ["I hear", " you.", " That sounds", " really hard.", " Maybe", " rest."]:
+        text, done = limiter.feed(token)
+        passed.append(text)
+        if done:
+            break
+    
+    assert "".join(passed) == "I hear you. That sounds really hard."
+    assert limiter.feed(" More.") == ("", True)
+    
+    # Several sentences in one chunk
+    limiter = SentenceLimiter(max_sentences=1)
+    assert limiter.feed("Take a deep breath. Then relax. ") == ("Take a deep breath.", True)
+
+
+class SentenceStreamClient:
+    """Blocking client that keeps producing sentences until closed."""
+    
+    def __init__(self):
+        self.tokens_produced = 0
+    
+    def generate_stream(self, prompt, **kwargs):
+        for i in range(50):
+            for token in ["This is", f" sentence {i}.", " "]:
+                self.tokens_produced += 1
+                yield token
+
+
+@pytest.mark.asyncio
+async def test_async_client_sentence_budget():
+    """Test decoding stops once the sentence budget is used up."""
+    source = SentenceStreamClient()
+    client = AsyncLlamaClient(source)
+    
+    response = await client.generate("Hello", max_sentences=2)
+    
+    assert response == "This is sentence 0. This is sentence 1."
+    assert source.tokens_produced <= 7
+    assert client.early_stops == 1
+    client.shutdown()
+
+
+def test_count_tokens_uses_tokenizer(fake_llama):
+    """Test token counts come from the model's tokenizer."""
+    client = LlamaClient(model_path="fake.gguf")
+    assert client.count_tokens("hello world") == len("hello world")
+
+
+class FakeCompletionServer(BaseHTTPRequestHandler):
+    """llama-server stand-in recording which client connection made each request."""
+    
+    protocol_version = "HTTP/1.1"
+    client_ports = []
+    delay = 0.0  # Seconds spent "decoding" each completion
+    
+    def log_message(self, *args):
+        pass
+    
+    def _send(self, body, content_type='application/json'):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_POST(self):
+        self.client_ports.append(self.client_address[1])
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        
+        time.sleep(self.delay)
+        usage = {'prompt_tokens': 10, 'completion_tokens': 3}
+        timings = {'prompt_n': 4}
+        if not request['stream']:
+            self._send(json.dumps({
+                'choices': [{'text': ' Hello there.'}], 'usage': usage, 'timings': timings
+            }).encode())
+            return
+        
+        events = [{'choices': [{'text': token}]} for token in ("Hello", " there", ".")]
+        events.append({'choices': [], 'usage': usage, 'timings': timings})
+        body = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+        self._send(body.encode(), content_type='text/event-stream')
+
+
+@pytest.fixture
+def completion_server():
+    FakeCompletionServer.client_ports = []
+    FakeCompletionServer.delay = 0.0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeCompletionServer)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def test_server_client_generate_and_stream(completion_server):
+    """Test the HTTP backend over a pooled keep-alive connection."""
+    client = LlamaServerClient(base_url=completion_server, pool_size=2)
+    
+    assert client.generate("Hi") == "Hello there."
+    assert "".join(client.generate_stream("Hi")) == "Hello there."
+    
+    # Sequential requests reuse one connection
+    assert len(FakeCompletionServer.client_ports) == 2
+    assert len(set(FakeCompletionServer.client_ports)) == 1
+    
+    stats = client.get_prefix_cache_stats()
+    assert stats['prompt_tokens'] == 20
+    assert stats['reused_tokens'] == 12
+    assert client.get_speculative_stats()['tokens'] == 6
+    client.close()
+
+
+def test_server_client_counts_tokens_locally(completion_server):
+    """Test token counts are estimated without requests, calibrated by reported usage."""
+    client = LlamaServerClient(base_url=completion_server)
+    assert client.count_tokens("abcdefgh") == 2  # ~4 characters per token
+    assert FakeCompletionServer.client_ports == []
+    
+    # The server reports 10 prompt tokens for this 50-character prompt
+    client.generate("word " * 10)
+    assert client.count_tokens("a" * 50) == 10
+    assert len(FakeCompletionServer.client_ports) == 1
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_llm_service_parallel_server_requests(completion_server):
+    """Test a server backend decodes requests in parallel, one thread per slot."""
+    import asyncio
+    FakeCompletionServer.delay = 0.3
+    service = LLMService(LlamaServerClient(base_url=completion_server, pool_size=4), max_concurrency=4)
+    
+    started = time.perf_counter()
+    results = await asyncio.gather(*(service.generate(f's{i}', 'Hi') for i in range(4)))
+    elapsed = time.perf_counter() - started
+    
+    assert results == ["Hello there."] * 4
+    assert elapsed < 0.9  # One at a time would take 1.2s
+    service.shutdown()
+    
+    # In-process models stay on a single inference thread
+    assert LLMService(MockLlamaClient(), max_concurrency=4).max_concurrency == 1
+
+
+def test_server_client_unreachable():
+    """Test the HTTP backend degrades like the local client."""
+    client = LlamaServerClient(base_url="http://127.0.0.1:9/v1", timeout=1)
+    assert client.generate("Hi") == ""
+    assert client.count_tokens("abcdefgh") == 2
+    client.close()
+
+
+def test_context_budget_truncation():
+    """Test sections are trimmed to their budgets, lowest priority first."""
+    counter_calls = []
+    
+    def count_words(text):
+        counter_calls.append(text)
+        return len(text.split())
+    
+    budget = ContextBudget(count_words, max_prompt_tokens=40, history_tokens=12,
+                           context_tokens=8, user_tokens=10)
+    
+    history = [f"User: turn {i} four words" for i in range(6)]
+    context = "Emotional Context: one two three four five six seven eight nine"
+    user_text = "please " * 20 + "help me now"
+    
+    fitted_history, fitted_context, fitted_user = budget.fit("fixed " * 10, history, context, user_text)
+    
+    # Per-section budgets: newest turns kept, context head, user text tail
+    assert fitted_history == history[-2:]
+    assert fitted_context.startswith("Emotional Context:") and fitted_context.endswith("…")
+    assert count_words(fitted_context) <= 8
+    assert fitted_user.endswith("help me now")
+    assert count_words(fitted_user) <= 10
+    
+    # Total budget: history goes before anything else
+    fitted_history, fitted_context, fitted_user = budget.fit("fixed " * 20, history, context, user_text)
+    assert fitted_history == []
+    total = 20 + count_words(fitted_context) + count_words(fitted_user)
+    assert total <= 40
+    assert fitted_user.endswith("help me now")
+    
+    # Stable segments are counted once
+    calls = len(counter_calls)
+    budget.count(history[-1])
+    assert len(counter_calls) == calls
+    assert budget.get_stats()['cache_hits'] > 0
+
+
+def test_context_budget_truncation_counts():
+    """Test truncation estimates the cut and builds don't cache whole prompts."""
+    counter_calls = []
+    
+    def count_chars(text):
+        counter_calls.append(text)
+        return len(text) // 4
+    
+    budget = ContextBudget(count_chars, max_prompt_tokens=300, user_tokens=40, cache_size=8)
+    text = " ".join(f"word{i}" for i in range(400))
+    
+    shortened = budget.truncate(text, 40)
+    assert count_chars(shortened) <= 40
+    assert count_chars(shortened) >= 30  # Close to the budget, not over-trimmed
+    assert len(counter_calls) <= 4  # Full text, estimate (+ shrink), not a binary search
+    assert list(budget._cache) == [text]
+    
+    builder = PromptBuilder(persona='remote_worker', budget=budget)
+    emotional_state = {'primary_emotion': 'sad', 'confidence': 0.8, 'valence': -0.5, 'arousal': 0.4}
+    prompts = [builder.build_prompt(emotional_state, user_text=f"Message {i}") for i in range(3)]
+    assert builder.last_prompt_tokens == count_chars(prompts[-1])
+    assert not set(prompts) & set(budget._cache)
+
+
+def test_build_prompt_within_budget():
+    """Test long history and user text are bounded by the prompt budget."""
+    budget = ContextBudget(lambda text: len(text) // 4, max_prompt_tokens=300,
+                           history_tokens=60, user_tokens=40)
+    builder = PromptBuilder(persona='remote_worker', budget=budget)
+    for i in range(10):
+        builder.add_to_history('user', f"A long message number {i} " * 10)
+    
+    emotional_state = {'primary_emotion': 'sad', 'confidence': 0.8, 'valence': -0.5, 'arousal': 0.4}
+    prompt = builder.build_prompt(emotional_state, user_text="I feel tired " * 50)
+    
+    assert prompt.startswith(builder.get_static_prefix())
+    assert builder.last_prompt_tokens <= 300
+    assert "I feel tired" in prompt
+
+
+@pytest.mark.asyncio
+async def test_conversation_summarizer():
+    """Test aged-out turns are folded into a rolling summary."""
+    builder = PromptBuilder(persona='remote_worker')
+    summarizer = ConversationSummarizer(keep_recent_turns=2, min_turns=4, max_words=5)
+    prompts = []
+    
+    async def generate(prompt):
+        prompts.append(prompt)
+        return "User is stressed about a deadline and slept badly"
+    
+    for i in range(5):
+        builder.add_to_history('user', f"message {i}")
+    assert not await summarizer.summarize(builder, generate)
+    
+    builder.add_to_history('assistant', "reply")
+    assert await summarizer.summarize(builder, generate)
+    
+    # Four oldest turns folded, recent ones kept verbatim, summary capped
+    assert "User: message 0" in prompts[0]
+    assert [turn['content'] for turn in builder.conversation_history] == ["message 4", "reply"]
+    assert builder.conversation_summary == "User is stressed about a"
+    
+    emotional_state = {'primary_emotion': 'sad', 'confidence': 0.8, 'valence': -0.5, 'arousal': 0.4}
+    prompt = builder.build_prompt(emotional_state, user_text="Hi")
+    assert "Earlier in this session: User is stressed about a" in prompt
+    assert "message 0" not in prompt
+
+
 def test_prompt_builder_initialization():
     """Test prompt builder initialization."""
     builder = PromptBuilder(persona='remote_worker')
@@ -180,6 +836,276 @@ def test_get_emotional_summary():
     assert summary['dominant_emotion'] == 'happy'
 
 
+def test_timeline_windowed_summary_matches_scan():
+    """Test prefix-sum summaries agree with a direct scan, across compactions."""
+    rng = np.random.default_rng(0)
+    timeline = EmotionTimeline(capacity=50)
+    labels = ['happy', 'sad', 'neutral']
+    snapshots = []
+    
+    for t in range(237):
+        snapshot = (float(t), labels[rng.integers(3)], float(rng.uniform(-1, 1)), float(rng.uniform(0, 1)))
+        timeline.append(*snapshot)
+        snapshots.append(snapshot)
+    
+    assert len(timeline) == 50
+    assert timeline[0].valence == pytest.approx(snapshots[-50][2], abs=1e-6)
+    
+    # Windows older than the raw snapshots are served by the 1s rollup
+    for since in (0.0, 200.0, 230.5):
+        recent = [s for s in snapshots if s[0] >= since]
+        summary = timeline.summary(since)
+        assert summary['num_snapshots'] == len(recent)
+        assert summary['avg_valence'] == pytest.approx(np.mean([s[2] for s in recent]), abs=1e-5)
+        assert summary['avg_arousal'] == pytest.approx(np.mean([s[3] for s in recent]), abs=1e-5)
+        counts = {label: sum(s[1] == label for s in recent) for label in labels}
+        assert counts[summary['dominant_emotion']] == max(counts.values())
+    
+    # Empty window falls back to the last snapshots
+    assert timeline.summary(1000.0, fallback_count=10)['num_snapshots'] == 10
+
+
+def test_summary_trend():
+    """Test trend compares the later half of the window to the earlier half."""
+    memory = SessionMemory()
+    memory.start_session('s1', 'u1')
+    
+    for valence in (-0.6, -0.5, -0.6, 0.2, 0.3, 0.2):
+        memory.add_emotional_snapshot('neutral', valence=valence, arousal=0.5)
+    
+    summary = memory.get_emotional_summary(window_minutes=15)
+    assert summary['trend'] == 'improving'
+    assert summary['num_snapshots'] == 6
+    assert memory.emotional_timeline[-1].valence == pytest.approx(0.2)
+
+
+def test_timeline_rollups_cover_long_session():
+    """Test windows beyond the raw snapshots are summarized from rollups."""
+    rng = np.random.default_rng(1)
+    timeline = EmotionTimeline(capacity=1000, max_duration_seconds=3 * 3600)
+    
+    # Two hours at 10 Hz; valence rises over the session
+    times = np.arange(0, 7200, 0.1)
+    valences = np.clip(times / 7200 - 0.5 + rng.normal(0, 0.1, len(times)), -1, 1)
+    for t, valence in zip(times, valences):
+        timeline.append(float(t), 'calm' if valence > 0 else 'stressed', float(valence), 0.5)
+    
+    assert len(timeline) == 1000
+    
+    since = 7200 - 15 * 60
+    summary = timeline.summary(since)
+    recent = valences[times >= since]
+    assert summary['num_snapshots'] == len(recent)
+    assert summary['avg_valence'] == pytest.approx(recent.mean(), abs=1e-4)
+    assert summary['dominant_emotion'] == 'calm'
+    
+    whole = timeline.summary(0.0)
+    assert whole['num_snapshots'] == len(times)
+    assert whole['avg_valence'] == pytest.approx(valences.mean(), abs=1e-4)
+    assert whole['trend'] == 'improving'
+
+
+def test_timeline_falls_back_to_coarser_rollup():
+    """Test the 1min rollup serves windows the 1s rollup no longer holds."""
+    timeline = EmotionTimeline(capacity=10, rollups=((1.0, 120.0), (60.0, None)), max_duration_seconds=3600)
+    for t in range(600):
+        timeline.append(float(t), 'neutral', 0.5 if t < 300 else -0.5, 0.5)
+    
+    assert timeline.tiers[0].dropped
+    assert not timeline.tiers[1].dropped
+    
+    summary = timeline.summary(0.0)
+    assert summary['num_snapshots'] == 600
+    assert summary['avg_valence'] == pytest.approx(0.0)
+    assert summary['trend'] == 'declining'
+
+
+def test_timeline_spills_rollups_to_disk(tmp_path):
+    """Test rollups are memory-mapped files that clear() removes."""
+    timeline = EmotionTimeline(capacity=10, max_duration_seconds=3600, spill_dir=str(tmp_path))
+    for t in range(100):
+        timeline.append(float(t), 'happy', 0.3, 0.6)
+    
+    assert isinstance(timeline.tiers[0]._data, np.memmap)
+    assert len(list(tmp_path.iterdir())) == 2
+    assert timeline.summary(0.0)['num_snapshots'] == 100
+    
+    timeline.clear()
+    assert list(tmp_path.iterdir()) == []
+    assert timeline.summary(0.0) is None
+
+
+def test_timeline_spill_files_removed_without_reset(tmp_path):
+    """Test spill files go away on close() or when the timeline is collected."""
+    import gc
+    closed = EmotionTimeline(capacity=10, max_duration_seconds=3600, spill_dir=str(tmp_path))
+    dropped = EmotionTimeline(capacity=10, max_duration_seconds=3600, spill_dir=str(tmp_path))
+    for t in range(100):
+        closed.append(float(t), 'happy', 0.3, 0.6)
+        dropped.append(float(t), 'happy', 0.3, 0.6)
+    assert len(list(tmp_path.iterdir())) == 4
+    
+    closed.close()
+    assert len(list(tmp_path.iterdir())) == 2
+    
+    del dropped
+    gc.collect()
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.fixture
+def redis_server(tmp_path):
+    """Start a throwaway local Redis server (skips if none is installed)."""
+    pytest.importorskip('redis')
+    executable = shutil.which('redis-server')
+    if executable is None:
+        pytest.skip("redis-server not installed")
+    
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen(
+        [executable, '--port', str(port), '--bind', '127.0.0.1', '--save', '', '--dir', str(tmp_path)],
+        stdout=subprocess.DEVNULL
+    )
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    yield port
+    process.terminate()
+    process.wait(timeout=10)
+
+
+def test_redis_session_store_survives_restart(redis_server):
+    """Test pipelined timeline writes, windowed summaries and session resume."""
+    store = RedisStore(port=redis_server, flush_interval_seconds=0)
+    memory = SessionMemory(store=store)
+    memory.start_session('s1', 'u1')
+    
+    # One simulated hour at 1 Hz (minute-aligned), valence rising
+    now = time.time()
+    start = (now // 60) * 60 - 3600
+    queued = store.pending()
+    for i in range(3600):
+        valence = -0.5 if i < 1800 else 0.5
+        store.append_snapshot('s1', start + i, 'calm' if valence > 0 else 'tense', valence, 0.4, 1.0)
+    
+    # Appends are pre-aggregated: one rollup per minute, one pipelined flush
+    assert store.pending() == queued + 3600 + 60
+    memory.record_intervention('break_reminder', 'Take a break?', {'valence': np.float32(-0.5)})
+    store.flush()
+    assert store.flushes == 1
+    
+    summary = store.session_summary('s1', start)
+    assert summary['num_snapshots'] == 3600
+    assert summary['avg_valence'] == pytest.approx(0.0, abs=1e-6)
+    assert summary['dominant_emotion'] in ('calm', 'tense')
+    assert summary['trend'] == 'improving'
+    assert store.session_summary('s1', now - 600)['dominant_emotion'] == 'calm'
+    store.close()
+    
+    # A new worker resumes the session from Redis
+    restarted = SessionMemory(store=RedisStore(port=redis_server, flush_interval_seconds=0, max_snapshots=100))
+    restarted.start_session('s1', 'u1')
+    assert len(restarted.emotional_timeline) == 1000
+    assert restarted.interventions[0]['type'] == 'break_reminder'
+    assert restarted.get_emotional_summary(window_minutes=60)['num_snapshots'] == 3600
+    restarted.store.delete_session('s1')
+    restarted.store.close()
+
+
+def test_redis_profile_store(redis_server):
+    """Test profile updates round-trip through Redis."""
+    store = RedisStore(port=redis_server, flush_interval_seconds=0.05, max_interventions=2)
+    profile = UserProfile('u1', store=store)
+    profile.record_session_start()
+    profile.learn_pattern('evening_calm', 'User is calm in evenings')
+    for effective in (True, False, True):
+        profile.record_intervention('break_reminder', was_effective=effective)
+    
+    deadline = time.time() + 5
+    while store.pending() and time.time() < deadline:
+        time.sleep(0.02)
+    assert store.pending() == 0
+    store.close()
+    
+    loaded = UserProfile('u1', store=RedisStore(port=redis_server, flush_interval_seconds=0))
+    assert loaded.total_sessions == 1
+    assert loaded.emotional_patterns[0].pattern_type == 'evening_calm'
+    assert [i['effective'] for i in loaded.intervention_history] == [False, True]
+    loaded.store.close()
+
+
+def test_redis_store_outage(redis_server, monkeypatch):
+    """Test a Redis outage keeps the queue bounded, backs off and doesn't fail reads."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        closed_port = sock.getsockname()[1]
+    
+    store = RedisStore(port=redis_server, flush_interval_seconds=0.01, max_pending=10, max_queued=500)
+    memory = SessionMemory(store=store)
+    memory.start_session('s1', 'u1')
+    store.flush()
+    
+    attempts = []
+    flush = store.flush
+    monkeypatch.setattr(store, 'flush', lambda: attempts.append(1) or flush())
+    store.pool.connection_kwargs['port'] = closed_port
+    store.pool.reset()
+    
+    start = time.time()
+    for i in range(2000):
+        store.append_snapshot('s1', start + i, 'calm', 0.2, 0.4, 1.0)
+        if i % 100 == 0:
+            time.sleep(0.02)
+    time.sleep(0.2)
+    
+    # Backed off instead of retrying on every full queue; failed batches dropped past the cap
+    assert len(attempts) < 15
+    assert store.dropped > 0
+    assert store.pending() <= store.max_queued + 2000
+    assert SessionMemory(store=store).start_session('s1', 'u1') is None  # Load fails, logged
+    
+    # Reads still run when the flush before them fails
+    store.pool.connection_kwargs['port'] = redis_server
+    store.pool.reset()
+    monkeypatch.setattr(store, 'flush', lambda: 1 / 0)
+    assert store.load_session('s1')['user_id'] == 'u1'
+    assert store.load_profile('nobody') is None
+    monkeypatch.setattr(store, 'flush', flush)
+    store.close()
+
+
+def test_storage_falls_back_when_unavailable(monkeypatch):
+    """Test unreachable or unsupported backends leave memory in process."""
+    class StubConfig:
+        def __init__(self, values):
+            self.values = values
+        
+        def get(self, path, default=None):
+            return self.values.get(path, default)
+    
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        closed_port = sock.getsockname()[1]
+    
+    monkeypatch.setattr(RedisStore, '_connect_failed', None)
+    unreachable = StubConfig({'memory.storage.type': 'redis', 'memory.storage.redis.port': closed_port})
+    assert session_store_from_config(unreachable) is None
+    
+    # The failed connect is remembered instead of retried per session
+    monkeypatch.setattr(RedisStore, 'from_config', classmethod(lambda cls, config: pytest.fail("reconnected")))
+    assert session_store_from_config(unreachable) is None
+    assert profile_store_from_config(StubConfig({'memory.user_profile.backend': 'redis'})) is None
+    assert session_store_from_config(StubConfig({})) is None
+    assert session_store_from_config(StubConfig({'memory.storage.type': 'mongodb'})) is None
+    assert profile_store_from_config(StubConfig({})) is None
+
+
 def test_session_duration():
     """Test session duration tracking."""
     memory = SessionMemory()
@@ -275,5 +1201,116 @@ def test_profile_persistence(tmp_path):
     assert profile2.emotional_patterns[0].pattern_type == 'evening_calm'
 
 
+def test_profile_store_write_behind(tmp_path):
+    """Test profile changes are buffered, flushed as upserts and loaded lazily."""
+    db_path = tmp_path / 'profiles.db'
+    store = SQLiteProfileStore(str(db_path), flush_interval_seconds=0, max_interventions=2)
+    
+    profile = UserProfile('u1', store=store)
+    profile.record_session_start()
+    profile.learn_pattern('evening_calm', 'User is calm in evenings')
+    profile.learn_pattern('evening_calm', 'User is calm in evenings')
+    for effective in (True, False, True):
+        profile.record_intervention('break_reminder', was_effective=effective)
+    
+    # Repeated updates of a row coalesce; nothing is written yet
+    assert store.pending() == 5
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0] == 0
+    
+    profile.save()
+    assert store.pending() == 0
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert conn.execute("SELECT COUNT(*) FROM interventions").fetchone()[0] == 2
+    
+    loaded = UserProfile('u1', store=SQLiteProfileStore(str(db_path), flush_interval_seconds=0))
+    assert not loaded._loaded
+    assert loaded.total_sessions == 1
+    assert loaded.emotional_patterns[0].frequency == 2
+    assert [i['effective'] for i in loaded.intervention_history] == [False, True]
+    store.close()
+
+
+def test_profile_store_load_flushes_only_that_user(tmp_path):
+    """Test loading a profile writes that user's pending changes, not everyone's."""
+    store = SQLiteProfileStore(str(tmp_path / 'profiles.db'), flush_interval_seconds=0)
+    for user_id in ('u1', 'u2'):
+        profile = UserProfile(user_id, store=store)
+        profile.record_session_start()
+        profile.record_intervention('break_reminder', was_effective=True)
+    assert store.pending() == 4
+    
+    assert store.load_profile('u1')['total_sessions'] == 1
+    assert store.pending() == 2
+    assert store.load_profile('u2')['intervention_history'][0]['effective'] is True
+    assert store.pending() == 0
+    store.close()
+
+
+def test_profile_store_background_flush_and_json_import(tmp_path):
+    """Test the flush thread writes on its interval and JSON profiles are imported."""
+    legacy = UserProfile('u2', storage_path=str(tmp_path))
+    legacy.update_preferences(persona='student')
+    legacy.save()
+    
+    store = SQLiteProfileStore(str(tmp_path / 'profiles.db'), flush_interval_seconds=0.05)
+    profile = UserProfile('u2', storage_path=str(tmp_path), store=store)
+    assert profile.preferences.persona == 'student'
+    
+    deadline = time.time() + 5
+    while store.pending() and time.time() < deadline:
+        time.sleep(0.02)
+    assert store.pending() == 0 and store.flushes >= 1
+    
+    store.close()
+    assert UserProfile('u2', store=SQLiteProfileStore(str(tmp_path / 'profiles.db'), flush_interval_seconds=0)).preferences.persona == 'student'
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
+
+
+def test_response_cache_rotation_and_eviction():
+    """Test variants fill a key, then rotate; TTL and size bound the cache."""
+    import numpy as np
+    cache = InterventionResponseCache(variants_per_key=2, ttl_seconds=60, max_entries=3)
+    key = cache.make_key('student', 'declining_mood', -0.5, 0.8, datetime(2024, 1, 1, 9))
+    assert key == 'student|declining_mood|negative|high|morning'
+    
+    # Misses until the key holds enough variants
+    assert cache.get(key) is None
+    cache.put(key, "Take a short break.", np.zeros(10))
+    assert cache.get(key) is None
+    cache.put(key, "Take a short break.", np.zeros(10))  # Duplicate ignored
+    cache.put(key, "How about some water?", np.ones(10))
+    
+    served = [cache.get(key).text for _ in range(4)]
+    assert served == ["Take a short break.", "How about some water?"] * 2
+    
+    # Size: least recently used key is evicted
+    other = cache.make_key('student', 'emotional_masking', 0.0, 0.5, datetime(2024, 1, 1, 22))
+    cache.put(other, "I'm here if you want to talk.", np.zeros(10))
+    cache.put(other, "It's okay not to be okay.", np.zeros(10))
+    assert len(cache) == 2
+    assert cache.get(key) is None
+    
+    # TTL: expired variants are dropped
+    for variant in cache._entries[other]:
+        variant.created_at -= 120
+    assert cache.get(other) is None
+    assert len(cache) == 0
+
+
+def test_response_cache_persistence(tmp_path):
+    """Test cached text and audio survive a save/load round trip."""
+    import numpy as np
+    cache = InterventionResponseCache(variants_per_key=1, storage_path=str(tmp_path))
+    key = cache.make_key('remote_worker', 'declining_mood', -0.5, 0.5)
+    cache.put(key, "Let's take a breath together.", np.linspace(-1, 1, 100))
+    cache.save()
+    
+    loaded = InterventionResponseCache(variants_per_key=1, storage_path=str(tmp_path))
+    response = loaded.get(key)
+    assert response.text == "Let's take a breath together."
+    assert np.allclose(response.audio, np.linspace(-1, 1, 100))
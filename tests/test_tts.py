@@ -4,10 +4,15 @@ import pytest
 import numpy as np
 from pathlib import Path
 import sys
+import time
+import types
+import wave
+import threading
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from models.tts import CosyVoiceTTS, MockTTS
+from models.tts import CosyVoiceTTS, MockTTS, TTSAudioCache, WSOLAStretcher, time_stretch
+from models.tts import pyttsx3_wrapper
 
 
 # TTS Tests
@@ -77,5 +82,283 @@ def test_audio_duration():
     assert len(audio_long) > len(audio_short)
 
 
+class FakeCoquiTTS:
+    """Stand-in for TTS.api.TTS producing 100 samples of 1.0 per character."""
+    
+    def __init__(self, model_name=None):
+        self.calls = []
+        self.delay = 0.0
+    
+    def to(self, device):
+        return self
+    
+    def tts(self, text, speaker=None, language=None, **kwargs):
+        self.calls.append(text)
+        time.sleep(self.delay)
+        return np.ones(len(text) * 100, dtype=np.float32)
+
+
+@pytest.fixture
+def fake_coqui(monkeypatch):
+    api = types.ModuleType('TTS.api')
+    api.TTS = FakeCoquiTTS
+    monkeypatch.setitem(sys.modules, 'TTS', types.ModuleType('TTS'))
+    monkeypatch.setitem(sys.modules, 'TTS.api', api)
+
+
+def test_sentence_streaming_synthesis(fake_coqui):
+    """Test sentences are synthesized incrementally and crossfaded."""
+    tts = CosyVoiceTTS(device='cpu', crossfade_ms=10)
+    sentences = ["This is the first sentence.", "Here is another one.", "And a third to finish."]
+    
+    stream = tts.synthesize_stream(" ".join(sentences), chunk_size=1024)
+    first = next(stream)
+    assert len(first) == 1024
+    assert tts.tts.calls[0] == sentences[0]
+    
+    audio = np.concatenate([first] + list(stream))
+    fade = int(tts.sample_rate * 0.01)
+    assert tts.tts.calls == sentences
+    assert len(audio) == sum(len(s) * 100 for s in sentences) - 2 * fade
+    # Constant-level input stays constant through the crossfades
+    assert np.allclose(audio, 1.0, atol=1e-5)
+
+
+def test_sentence_streaming_stops_when_closed(fake_coqui):
+    """Test closing the stream stops synthesizing further sentences."""
+    tts = CosyVoiceTTS(device='cpu')
+    tts.tts.delay = 0.01
+    text = " ".join(f"This is sentence number {i}." for i in range(50))
+    
+    stream = tts.synthesize_stream(text)
+    next(stream)
+    stream.close()
+    
+    assert len(tts.tts.calls) < 50
+
+
+def test_audio_cache_keys_and_memory_budget():
+    """Test normalized keys and LRU eviction by bytes."""
+    key = TTSAudioCache.make_key("I’m here  for you.", "voice")
+    assert key == TTSAudioCache.make_key("i'm here for you.", "voice")
+    assert key != TTSAudioCache.make_key("I'm here for you.", "voice", emotion='sad')
+    assert key != TTSAudioCache.make_key("I'm here for you.", "voice", speed=1.1)
+    
+    cache = TTSAudioCache(max_memory_bytes=3 * 4000)
+    for name in "abcd":
+        cache.put(name, np.zeros(1000))
+    
+    assert cache.get('a') is None
+    audio = cache.get('d')
+    assert audio.dtype == np.float32
+    assert not audio.flags.writeable
+    assert cache.get_stats()['memory_bytes'] == 3 * 4000
+
+
+def test_audio_cache_disk_tier(tmp_path):
+    """Test clips persist to disk and are memory-mapped on reload."""
+    cache = TTSAudioCache(storage_path=str(tmp_path))
+    cache.put('clip', np.arange(500, dtype=np.float32))
+    
+    reloaded = TTSAudioCache(storage_path=str(tmp_path))
+    audio = reloaded.get('clip')
+    
+    assert isinstance(audio, np.memmap)
+    assert np.array_equal(audio, np.arange(500))
+    assert reloaded.get_stats()['disk_hits'] == 1
+    assert reloaded.get('clip') is audio  # Promoted to memory
+
+
+def test_audio_cache_disk_budget(tmp_path):
+    """Test the disk tier evicts least recently used clips over its budget."""
+    import os
+    clip = np.zeros(1000, dtype=np.float32)
+    cache = TTSAudioCache(storage_path=str(tmp_path))
+    for i, key in enumerate(['a', 'b', 'c']):
+        cache.put(key, clip)
+        os.utime(tmp_path / f"{key}.npy", (1000 + i, 1000 + i))
+    clip_bytes = (tmp_path / 'a.npy').stat().st_size
+    
+    # A disk hit marks 'a' as recently used
+    cache = TTSAudioCache(storage_path=str(tmp_path), max_disk_bytes=3 * clip_bytes + 100)
+    assert cache.get_stats()['disk_bytes'] == 3 * clip_bytes
+    assert cache.get('a') is not None
+    
+    cache.put('d', clip)
+    assert sorted(p.stem for p in tmp_path.glob('*.npy')) == ['a', 'd']
+    stats = cache.get_stats()
+    assert stats['disk_evictions'] == 2
+    assert stats['disk_bytes'] == 2 * clip_bytes
+
+
+def test_cached_synthesis_and_warm_up(fake_coqui):
+    """Test repeated phrases are synthesized once."""
+    tts = CosyVoiceTTS(device='cpu', cache=TTSAudioCache())
+    
+    assert tts.warm_up(["I'm here for you.", "Take a deep breath."]) == 2
+    assert tts.warm_up(["I'm here for you."]) == 0
+    
+    audio = tts.synthesize("I'm here  for you.")
+    assert len(audio) == len("I'm here for you.") * 100
+    assert tts.tts.calls == ["I'm here for you.", "Take a deep breath."]
+    
+    tts.synthesize("I'm here for you.", emotion='sad', speed=0.9)
+    assert len(tts.tts.calls) == 3
+
+
+def test_cache_ignores_unrendered_emotion(fake_coqui):
+    """Test emotion only splits cache entries when the engine renders it."""
+    tts = CosyVoiceTTS(device='cpu', cache=TTSAudioCache())
+    tts.warm_up(["I'm here for you."])
+    for emotion in ('happy', 'sad', None):
+        tts.synthesize("I'm here for you.", emotion=emotion)
+    assert len(tts.tts.calls) == 1
+    
+    tts = CosyVoiceTTS(device='cpu', cache=TTSAudioCache(), native_emotion=True)
+    for emotion in ('happy', 'sad', 'happy'):
+        tts.synthesize("I'm here for you.", emotion=emotion)
+    assert len(tts.tts.calls) == 2
+
+
+@pytest.mark.parametrize("rate", [0.8, 1.25])
+def test_wsola_time_stretch(rate):
+    """Test WSOLA changes duration but not pitch, chunked or not."""
+    sr = 22050
+    t = np.arange(sr) / sr
+    audio = (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    
+    stretched = time_stretch(audio, rate, sr)
+    assert len(stretched) == round(len(audio) / rate)
+    peak_hz = np.argmax(np.abs(np.fft.rfft(stretched))) * sr / len(stretched)
+    assert abs(peak_hz - 220) < 2
+    assert abs(np.abs(stretched[1000:-1000]).max() - 0.5) < 0.01
+    
+    stretcher = WSOLAStretcher(rate, sr)
+    chunks = [stretcher.process(audio[i:i + 700]) for i in range(0, len(audio), 700)]
+    assert np.allclose(np.concatenate(chunks + [stretcher.flush()]), stretched, atol=1e-6)
+
+
+class NativeSpeedCoquiTTS(FakeCoquiTTS):
+    """Engine that applies speed itself."""
+    
+    def tts(self, text, speaker=None, language=None, speed=1.0):
+        self.calls.append((text, speed))
+        return np.ones(int(len(text) * 100 / speed), dtype=np.float32)
+
+
+class IgnoredProsodyCoquiTTS(FakeCoquiTTS):
+    """Engine that accepts speed/emotion (like Coqui's TTS.tts) but ignores them."""
+    
+    def tts(self, text, speaker=None, language=None, emotion=None, speed=None):
+        self.calls.append((text, emotion, speed))
+        return np.ones(len(text) * 100, dtype=np.float32)
+
+
+def test_native_speed_skips_time_stretch(fake_coqui, monkeypatch):
+    """Test speed goes to the engine when enabled, else to WSOLA."""
+    monkeypatch.setattr(sys.modules['TTS.api'], 'TTS', NativeSpeedCoquiTTS)
+    tts = CosyVoiceTTS(device='cpu', native_speed=True)
+    monkeypatch.setattr(tts, '_time_stretch', lambda *args: pytest.fail("post-processed"))
+    
+    audio = tts.synthesize("Slow down a little.", speed=0.9)
+    assert tts.tts.calls == [("Slow down a little.", 0.9)]
+    assert len(audio) == int(len("Slow down a little.") * 100 / 0.9)
+    
+    monkeypatch.setattr(sys.modules['TTS.api'], 'TTS', FakeCoquiTTS)
+    tts = CosyVoiceTTS(device='cpu')
+    audio = tts.synthesize("Slow down a little.", speed=0.9)
+    assert tts.tts.calls == ["Slow down a little."]
+    assert len(audio) == round(len("Slow down a little.") * 100 / 0.9)
+
+
+def test_accepted_but_ignored_prosody_uses_time_stretch(fake_coqui, monkeypatch):
+    """Test a speed/emotion keyword in the engine signature is not trusted."""
+    monkeypatch.setattr(sys.modules['TTS.api'], 'TTS', IgnoredProsodyCoquiTTS)
+    tts = CosyVoiceTTS(device='cpu')
+    
+    audio = tts.synthesize("Slow down a little.", emotion='sad', speed=0.9)
+    assert tts.tts.calls == [("Slow down a little.", None, None)]
+    assert len(audio) == round(len("Slow down a little.") * 100 / 0.9)
+
+
+class FakePyttsx3Engine:
+    """pyttsx3 engine stand-in rendering 16-bit 11025 Hz WAVs (rate samples per word)."""
+    
+    def __init__(self):
+        self.properties = {'voices': [], 'rate': 200}
+        self.threads = set()
+        self.rendered = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self._pending = None
+    
+    def getProperty(self, name):
+        return self.properties.get(name)
+    
+    def setProperty(self, name, value):
+        self.threads.add(threading.get_ident())
+        self.properties[name] = value
+    
+    def save_to_file(self, text, path):
+        self._pending = (text, path)
+    
+    def runAndWait(self):
+        self.threads.add(threading.get_ident())
+        self.gate.wait()
+        text, path = self._pending
+        self.rendered.append((text, self.properties['rate']))
+        samples = np.full(len(text.split()) * self.properties['rate'], 16384, dtype=np.int16)
+        with wave.open(path, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(11025)
+            wav.writeframes(samples.tobytes())
+    
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def fake_pyttsx3(monkeypatch):
+    engine = FakePyttsx3Engine()
+    monkeypatch.setattr(pyttsx3_wrapper, 'pyttsx3', types.SimpleNamespace(init=lambda: engine), raising=False)
+    monkeypatch.setattr(pyttsx3_wrapper, 'PYTTSX3_AVAILABLE', True)
+    return engine
+
+
+def test_pyttsx3_returns_audio_from_engine_thread(fake_pyttsx3):
+    """Test synthesis returns resampled samples rendered off the caller's thread."""
+    tts = pyttsx3_wrapper.Pyttsx3TTS(rate=170)
+    
+    audio = tts.synthesize("Hello there friend", emotion_override='happy')
+    assert audio.dtype == np.float32
+    assert len(audio) == 3 * 190 * 2  # 11025 Hz resampled to 22050 Hz
+    assert np.allclose(audio, 0.5)
+    
+    tts.synthesize("Hello again")
+    assert fake_pyttsx3.rendered == [("Hello there friend", 190), ("Hello again", 170)]
+    assert threading.get_ident() not in fake_pyttsx3.threads
+    tts.shutdown()
+
+
+def test_pyttsx3_jobs_cancellable(fake_pyttsx3):
+    """Test queued jobs can be cancelled before rendering."""
+    tts = pyttsx3_wrapper.Pyttsx3TTS()
+    fake_pyttsx3.gate.clear()
+    
+    first = tts.submit("First sentence.")
+    queued = [tts.submit(f"Queued sentence {i}.") for i in range(3)]
+    time.sleep(0.05)  # Let the engine pick up the first job
+    
+    assert tts.cancel_pending() == 3
+    assert all(future.cancelled() for future in queued)
+    
+    fake_pyttsx3.gate.set()
+    assert len(first.result(timeout=5)) > 0
+    tts.flush()
+    assert [text for text, _ in fake_pyttsx3.rendered] == ["First sentence."]
+    tts.shutdown()
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
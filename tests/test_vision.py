@@ -17,6 +17,7 @@ from models.vision import (
     MockPostureAnalyzer,
     MockGazeTracker
 )
+from models.results import EMOTION_LABELS, FaceResult, json_default
 from config import config
 
 
@@ -140,6 +141,54 @@ async def test_video_pipeline_visual_state(video_pipeline, test_frame):
     assert 0.0 <= visual_state['arousal'] <= 1.0
 
 
+@pytest.mark.asyncio
+async def test_video_pipeline_result_types(video_pipeline, test_frame):
+    """Test results are slotted objects with dict-style access."""
+    skipped = await video_pipeline.process_frame(test_frame, timestamp=0.0)
+    result = await video_pipeline.process_frame(test_frame, timestamp=0.1)
+    
+    assert skipped['visual_state']['overall_state'] == 'unknown'
+    assert not hasattr(result, '__dict__')
+    assert result['visual_state'] is result.visual_state
+    assert result.get('missing', 'default') == 'default'
+    with pytest.raises(KeyError):
+        result['missing']
+    
+    face = result['face_emotion']
+    assert face.scores.dtype == np.float32
+    assert len(face.scores) == len(EMOTION_LABELS)
+    assert face['all_emotions']['neutral'] == pytest.approx(70.0)
+    assert EMOTION_LABELS[int(np.argmax(face.scores))] == face['primary_emotion']
+    
+    plain = result.to_dict()
+    assert isinstance(plain['visual_state'], dict)
+    assert plain['face_emotion']['scores'] == pytest.approx(face.scores.tolist())
+    assert FaceResult(face_detected=False)['emotions'] == {}
+
+
+@pytest.mark.asyncio
+async def test_video_result_mapping_protocol(video_pipeline, test_frame):
+    """Test results behave like the dicts they replaced."""
+    import json
+    from collections.abc import Mapping
+    
+    await video_pipeline.process_frame(test_frame, timestamp=0.0)
+    result = await video_pipeline.process_frame(test_frame, timestamp=0.1)
+    face = result['face_emotion']
+    
+    assert isinstance(result, Mapping)
+    assert len(result) == len(result.keys()) == 5
+    assert len(face) == len(dict(face))
+    assert dict(face) == face and face == dict(face)
+    assert face == FaceResult(**{k: face[k] for k in ('face_detected', 'primary_emotion', 'confidence',
+                                                      'valence', 'arousal', 'scores', 'face_box')})
+    assert face != FaceResult(face_detected=False)
+    
+    encoded = json.loads(json.dumps(result, default=json_default))
+    assert encoded['visual_state'] == result['visual_state']
+    assert json.loads(json.dumps(result.to_dict(), default=json_default)) == encoded
+
+
 @pytest.mark.asyncio
 async def test_video_pipeline_parallel_processing(video_pipeline, test_frame):
     """Test that pipeline processes models in parallel."""
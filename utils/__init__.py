@@ -2,5 +2,9 @@
 
 from .logger import setup_logger, get_logger
 from .helpers import timeit, retry, LatencyTracker
+from .text_segmenter import SentenceSegmenter, SentenceLimiter, split_sentences
 
-__all__ = ['setup_logger', 'get_logger', 'timeit', 'retry', 'LatencyTracker']
+__all__ = [
+    'setup_logger', 'get_logger', 'timeit', 'retry', 'LatencyTracker',
+    'SentenceSegmenter', 'SentenceLimiter', 'split_sentences'
+]
@@ -0,0 +1,157 @@
+"""Incremental sentence/clause segmentation for streamed text.
+
+Cuts a stream of LLM tokens into speakable segments so that speech
+synthesis can start before the full response has been generated.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+
+# Sentence end: terminal punctuation (optionally closing quote/bracket) + space
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s')
+# Clause end: comma, semicolon, colon or dash followed by whitespace
+_CLAUSE_END = re.compile(r'[,;:—]\s')
+
+
+class SentenceSegmenter:
+    """
+    Accumulates streamed text and emits complete segments.
+    
+    Sentences are emitted as soon as their terminal punctuation is
+    followed by whitespace. Long runs without a sentence end are cut at
+    a clause boundary once they exceed ``max_chars`` characters.
+    """
+    
+    def __init__(self, min_chars: int = 12, max_chars: int = 120):
+        """
+        Initialize segmenter.
+        
+        Args:
+            min_chars: Minimum segment length (avoids cutting at "Dr. " etc.)
+            max_chars: Length after which a clause boundary is accepted
+        """
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.buffer = ""
+    
+    def feed(self, text: str) -> List[str]:
+        """
+        Add streamed text.
+        
+        Args:
+            text: Next token(s)
+        
+        Returns:
+            Completed segments (possibly empty)
+        """
+        self.buffer += text
+        segments = []
+        
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            segment = self.buffer[:cut].strip()
+            self.buffer = self.buffer[cut:]
+            if segment:
+                segments.append(segment)
+        
+        return segments
+    
+    def _find_cut(self) -> Optional[int]:
+        """Find the end index of the next complete segment."""
+        for match in _SENTENCE_END.finditer(self.buffer):
+            if match.end() >= self.min_chars:
+                return match.end()
+        
+        if len(self.buffer) > self.max_chars:
+            cut = None
+            for match in _CLAUSE_END.finditer(self.buffer):
+                if match.end() >= self.min_chars:
+                    cut = match.end()
+            return cut
+        
+        return None
+    
+    def flush(self) -> Optional[str]:
+        """Return any remaining text as a final segment."""
+        segment = self.buffer.strip()
+        self.buffer = ""
+        return segment or None
+    
+    def reset(self):
+        """Discard buffered text."""
+        self.buffer = ""
+
+
+class SentenceLimiter:
+    """
+    Passes streamed text through until a sentence budget is used up.
+    
+    Used to stop decoding as soon as the response has as many complete
+    sentences as will be spoken, instead of at the token limit.
+    """
+    
+    def __init__(self, max_sentences: int, min_chars: int = 12):
+        """
+        Initialize limiter.
+        
+        Args:
+            max_sentences: Complete sentences to let through
+            min_chars: Minimum sentence length (as in SentenceSegmenter)
+        """
+        self.max_sentences = max_sentences
+        self.min_chars = min_chars
+        self.text = ""
+        self.sentences = 0
+        self.done = False
+        self._sentence_start = 0
+    
+    def feed(self, text: str) -> Tuple[str, bool]:
+        """
+        Add streamed text.
+        
+        Args:
+            text: Next token(s)
+        
+        Returns:
+            (part of ``text`` within the budget, whether the budget is used up)
+        """
+        if self.done:
+            return "", True
+        
+        offset = len(self.text)
+        self.text += text
+        
+        for match in _SENTENCE_END.finditer(self.text, self._sentence_start):
+            if match.end() - self._sentence_start < self.min_chars:
+                continue
+            self.sentences += 1
+            self._sentence_start = match.end()
+            if self.sentences >= self.max_sentences:
+                # Keep this token only up to the end of the last sentence
+                self.done = True
+                return text[:max(0, match.end() - offset)].rstrip(), True
+        
+        return text, False
+
+
+def split_sentences(text: str, min_chars: int = 12, max_chars: int = 120) -> List[str]:
+    """
+    Split complete text into speakable segments.
+    
+    Args:
+        text: Text to split
+        min_chars: Minimum segment length
+        max_chars: Length after which clause boundaries are used
+    
+    Returns:
+        List of segments
+    """
+    segmenter = SentenceSegmenter(min_chars=min_chars, max_chars=max_chars)
+    segments = segmenter.feed(text)
+    tail = segmenter.flush()
+    if tail:
+        segments.append(tail)
+    return segments